@@ -0,0 +1,49 @@
+"""
+Runs the benchmark suite, writing results as JSON and optionally comparing them with a
+baseline from an earlier run on the same machine, e.g.
+
+    python -m benchmarks --output results.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks --output results.json --baseline benchmarks/baseline.json
+
+Exits with status 1 if any benchmark regressed by more than the tolerance.
+"""
+import argparse
+import re
+import sys
+
+from benchmarks.harness import run_benchmarks, write_results, read_results, compare_to_baseline
+from benchmarks.suite import benchmark_suite
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--output", help="JSON file to write results to")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", help="Also write results here, as a future baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Fractional increase in time or memory counted as a regression")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--filter", help="Only run benchmarks whose names match this regex")
+    parser.add_argument("--quick", action="store_true", help="Small sizes, for smoke testing")
+    options = parser.parse_args(args)
+
+    benchmarks = benchmark_suite(options.quick)
+    if options.filter:
+        benchmarks = [b for b in benchmarks if re.search(options.filter, b.name)]
+    results = run_benchmarks(benchmarks, options.repeats)
+    for path in [options.output, options.save_baseline]:
+        if path:
+            write_results(path, results)
+
+    if options.baseline:
+        regressions = compare_to_baseline(results, read_results(options.baseline), options.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {options.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
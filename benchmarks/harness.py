@@ -0,0 +1,110 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+
+class Benchmark:
+    """
+    A named piece of work, run by calling `setup()` to get a zero argument callable, which is
+    then timed. `n_items` is the number of items (options, paths, ...) each call processes, so
+    throughput can be reported in `unit`s per second.
+    """
+    def __init__(self, name: str, setup: Callable[[], Callable[[], object]], params: dict,
+                 n_items: Optional[int] = None, unit: Optional[str] = None):
+        self.name: str = name
+        self.setup: Callable[[], Callable[[], object]] = setup
+        self.params: dict = params
+        self.n_items: Optional[int] = n_items
+        self.unit: Optional[str] = unit
+
+    def run(self, repeats: int) -> dict:
+        work = self.setup()
+        work()      # warm up - imports, caches and first touch of memory
+
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            work()
+            timings.append(time.perf_counter() - t0)
+
+        # Measured separately, as tracing slows allocation heavy code
+        tracemalloc.start()
+        try:
+            work()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            "params": self.params,
+            "repeats": repeats,
+            "seconds_min": min(timings),
+            "seconds_median": statistics.median(timings),
+            "peak_memory_bytes": peak_memory,
+        }
+        if self.n_items is not None:
+            result["throughput"] = self.n_items / statistics.median(timings)
+            result["unit"] = f"{self.unit}/s"
+        return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(benchmarks: list[Benchmark], repeats: int, log: Callable[[str], None] = print) -> dict:
+    results = {}
+    for benchmark in benchmarks:
+        result = benchmark.run(repeats)
+        log(f"{benchmark.name:<60} {result['seconds_median'] * 1000:10.2f} ms "
+            f"{result['peak_memory_bytes'] / 2 ** 20:10.1f} MiB")
+        results[benchmark.name] = result
+    return {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+
+
+def write_results(path: Union[Path, str], results: dict):
+    with open(path, "wt") as f:
+        json.dump(results, f, indent=2)
+
+
+def read_results(path: Union[Path, str]) -> dict:
+    with open(path, "rt") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Regressions of `results` against `baseline` - benchmarks whose median time or peak memory
+    grew by more than `tolerance` (a fraction). Benchmarks missing from either are ignored.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for key in ["seconds_median", "peak_memory_bytes"]:
+            if base[key] > 0 and result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {base[key]:.4g} -> {result[key]:.4g} "
+                                   f"(+{result[key] / base[key] - 1:.0%})")
+    return regressions
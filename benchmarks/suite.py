@@ -0,0 +1,139 @@
+import numpy as np
+from tp_maths.brownians.uniform_generator import PseudoUniformGenerator
+from tp_quantity.quantity import Qty
+from tp_quantity.uom import MT, USD, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+
+from benchmarks.harness import Benchmark
+from put_call_parity.models import BlackScholes, VectorBlackScholes, CALL
+from put_call_parity.portfolio.option_book import OptionBook
+from put_call_parity.portfolio.option_with_fx_replication import OptionWithFXReplication
+from put_call_parity.portfolio.tradeable import OptionTrade
+from put_call_parity.process.vector_path_builder import BrownianPathBuilder, CorrelatedNormalPathsBuilder, \
+    LognormalPathsBuilder
+from put_call_parity.ref_data.commodity import WTI
+from put_call_parity.replicator.vanilla_option_replicator import VanillaOptionPortfolio, VanillaOptionReplicator
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+SEED = 12345
+
+RHO_MATRIX = np.asarray([[1.0, -0.5], [-0.5, 1.0]])
+
+
+def _black_scholes_benchmarks(n_scalar: int, n_vector: int) -> list[Benchmark]:
+    def scalar_setup():
+        rng = np.random.default_rng(SEED)
+        Fs = rng.uniform(80, 120, n_scalar).tolist()
+
+        def work():
+            for F in Fs:
+                BlackScholes(CALL, F, 100.0, 0.3, 1.0).value
+        return work
+
+    def vector_setup():
+        rng = np.random.default_rng(SEED)
+        F, vols, T = rng.uniform(80, 120, n_vector), rng.uniform(0.1, 0.5, n_vector), rng.uniform(0.1, 2.0, n_vector)
+        return lambda: VectorBlackScholes(CALL, F, 100.0, vols, T).greeks
+
+    return [
+        Benchmark(f"black_scholes_scalar_value[n={n_scalar}]", scalar_setup, {"n": n_scalar}, n_scalar, "options"),
+        Benchmark(f"vector_black_scholes_greeks[n={n_vector}]", vector_setup, {"n": n_vector}, n_vector, "options"),
+    ]
+
+
+def _option_book_benchmarks(n_options: int) -> list[Benchmark]:
+    def setup():
+        rng = np.random.default_rng(SEED)
+        book = OptionBook([WTI], np.zeros(n_options, dtype=np.int32), rng.uniform(-100, 100, n_options),
+                          rng.uniform(size=n_options) < 0.5, rng.uniform(80, 120, n_options),
+                          rng.uniform(0.1, 2.0, n_options))
+
+        def work():
+            # A fresh context each call, so the book's greeks cache doesn't hide the pricing
+            vc = ValuationContext(USD, time=0.0, commodity_prices={WTI: Qty(100, USD / MT)},
+                                  commodity_vols={WTI: Qty(0.3, SCALAR)})
+            return book.value(vc), book.delta(vc, WTI)
+        return work
+
+    return [Benchmark(f"option_book_value[n={n_options}]", setup, {"n": n_options}, n_options, "options")]
+
+
+def _path_builder_benchmarks(sizes: list[tuple[int, int]]) -> list[Benchmark]:
+    def builders(times):
+        return {
+            "brownian_paths": BrownianPathBuilder(times, n_factors=2),
+            "correlated_normal_paths": CorrelatedNormalPathsBuilder(times, RHO_MATRIX),
+            "lognormal_paths": LognormalPathsBuilder(prices=np.asarray([100.0, 1.1]), times=times,
+                                                     rho_matrix=RHO_MATRIX, drifts=np.zeros(2),
+                                                     vols=np.asarray([0.3, 0.2])),
+        }
+
+    benchmarks = []
+    for n_paths, n_time_steps in sizes:
+        for name in builders(np.zeros(1)):
+            def setup(name=name, n_paths=n_paths, n_time_steps=n_time_steps):
+                bldr = builders(np.linspace(0.0, 1.0, n_time_steps + 1))[name]
+                rng = RandomNumberGenerator(seed=SEED)
+                return lambda: bldr.build(rng, n_paths)
+            benchmarks.append(Benchmark(
+                f"{name}[paths={n_paths},steps={n_time_steps}]", setup,
+                {"n_paths": n_paths, "n_time_steps": n_time_steps}, n_paths, "paths"
+            ))
+    return benchmarks
+
+
+def _replication_benchmarks(fx_sizes: list[tuple[int, int]], vanilla_sizes: list[tuple[int, int]]) -> list[Benchmark]:
+    benchmarks = []
+    for n_paths, n_time_steps in fx_sizes:
+        def fx_setup(n_paths=n_paths, n_time_steps=n_time_steps):
+            replication = OptionWithFXReplication(CALL, 110.0, 100.0, 1.1, 0.3, 0.2, -0.5, 0.5)
+            rng = RandomNumberGenerator(seed=SEED)
+            return lambda: replication.simulation(rng, n_time_steps=n_time_steps, n_paths=n_paths)
+        benchmarks.append(Benchmark(
+            f"option_with_fx_replication_simulation[paths={n_paths},steps={n_time_steps}]", fx_setup,
+            {"n_paths": n_paths, "n_time_steps": n_time_steps}, n_paths, "paths"
+        ))
+
+    for n_paths, n_time_steps in vanilla_sizes:
+        for method in ["replicate", "replicate_batch"]:
+            def vanilla_setup(n_paths=n_paths, n_time_steps=n_time_steps, method=method):
+                replicator = _vanilla_option_replicator(n_paths, n_time_steps)
+                if method == "replicate":
+                    return lambda: replicator.replicate(PseudoUniformGenerator(seed=SEED), n_time_steps, n_paths)
+                return lambda: replicator.replicate_batch(n_time_steps)
+            benchmarks.append(Benchmark(
+                f"vanilla_option_replicator_{method}[paths={n_paths},steps={n_time_steps}]", vanilla_setup,
+                {"n_paths": n_paths, "n_time_steps": n_time_steps}, n_paths, "paths"
+            ))
+    return benchmarks
+
+
+def _vanilla_option_replicator(n_paths: int, n_time_steps: int) -> VanillaOptionReplicator:
+    option = OptionTrade(WTI, Qty(100, MT), CALL, Qty(100, USD / MT), 1.0)
+    vc = ValuationContext(USD, time=0.0, commodity_prices={WTI: Qty(100, USD / MT)},
+                          commodity_vols={WTI: Qty(0.3, SCALAR)})
+    times = np.linspace(0.0, option.expiry_time, n_time_steps + 1)
+    paths = LognormalPathsBuilder(prices=np.asarray([100.0]), times=times, rho_matrix=np.identity(1),
+                                  drifts=np.zeros(1), vols=np.asarray([0.3])).build(RandomNumberGenerator(seed=SEED),
+                                                                                      n_paths)
+    return VanillaOptionReplicator(VanillaOptionPortfolio(option).rehedge(vc), vc, paths)
+
+
+def benchmark_suite(quick: bool = False) -> list[Benchmark]:
+    """
+    Every benchmark, at sizes chosen to take seconds rather than minutes in total. `quick`
+    shrinks them for smoke testing. Results for different sizes have different names, so
+    only like is ever compared with like.
+    """
+    if quick:
+        return _black_scholes_benchmarks(n_scalar=1_000, n_vector=10_000) + \
+            _option_book_benchmarks(10_000) + \
+            _path_builder_benchmarks([(1_000, 10)]) + \
+            _replication_benchmarks(fx_sizes=[(1_000, 10)], vanilla_sizes=[(20, 10)])
+    return _black_scholes_benchmarks(n_scalar=20_000, n_vector=1_000_000) + \
+        _option_book_benchmarks(1_000_000) + \
+        _path_builder_benchmarks([(10_000, 50), (100_000, 50), (10_000, 500)]) + \
+        _replication_benchmarks(
+            fx_sizes=[(10_000, 50), (100_000, 50), (10_000, 500)],
+            vanilla_sizes=[(100, 50), (1_000, 50)]
+        )
@@ -1,2 +1,4 @@
 from .option_right import *
 from .black_scholes import *
+from .vector_black_scholes import *
+from .implied_vol import *
@@ -1,9 +1,11 @@
+from functools import cached_property
 from numbers import Number
 import numpy as np
 from scipy.stats import norm
 
 __all__ = [
-    "BlackScholes"
+    "BlackScholes",
+    "BlackScholesGreeks",
 ]
 
 from tp_utils.type_utils import checked_type
@@ -11,6 +13,25 @@ from tp_utils.type_utils import checked_type
 from put_call_parity.models import OptionRight, CALL
 
 
+# noinspection PyPep8Naming
+class BlackScholesGreeks:
+    """
+    Value and sensitivities from a single Black-Scholes evaluation. Fields are floats
+    when produced by BlackScholes and arrays when produced by VectorBlackScholes.
+    """
+    def __init__(self, value, delta, gamma, theta, vega, N1, N2):
+        self.value = value
+        self.delta = delta
+        self.gamma = gamma
+        self.theta = theta
+        self.vega = vega
+        self.N1 = N1
+        self.N2 = N2
+
+    def __str__(self):
+        return f"Greeks(value={self.value}, delta={self.delta}, gamma={self.gamma}, theta={self.theta}, vega={self.vega})"
+
+
 # noinspection PyPep8Naming
 class BlackScholes:
     def __init__(self, right: OptionRight, F: Number, K: Number, vol: Number, T: Number):
@@ -20,42 +41,44 @@ class BlackScholes:
         self.vol: float = checked_type(vol, Number)
         self.T: float = checked_type(T, Number)
 
-    @property
+    @cached_property
     def d1(self) -> float:
         return (np.log(self.F / self.K) + self.vol * self.vol / 2 * self.T) / (self.vol * np.sqrt(self.T))
 
-    @property
+    @cached_property
     def d2(self) -> float:
         return self.d1 - self.vol * np.sqrt(self.T)
 
-    @property
+    @cached_property
     def N1(self) -> float:
         return norm.cdf(self.d1)
 
+    @cached_property
+    def _pdf_d1(self) -> float:
+        return norm.pdf(self.d1)
+
     @property
     def delta(self) -> float:
         if self._is_worth_intrinsic:
-            intrinsic = self.right.intrinsic(self.F, self.K)
-            if intrinsic > 0:
-                return 1.0
-            if intrinsic < 0:
-                return 1.0
-            return 0.0
-        return self.N1
+            call_delta = 1.0 if self.F > self.K else 0.0
+        else:
+            call_delta = self.N1
+        # Put-call parity - a call less a put is a forward, with delta 1
+        return call_delta if self.right == CALL else call_delta - 1.0
 
     @property
     def gamma(self) -> float:
         if self._is_worth_intrinsic:
             return 0.0
-        return norm.pdf(self.d1) / (self.F * self.vol * np.sqrt(self.T))
+        return self._pdf_d1 / (self.F * self.vol * np.sqrt(self.T))
 
     @property
     def theta(self) -> float:
         if self._is_worth_intrinsic:
             return 0.0
-        return -self.F * norm.pdf(self.d1) * self.vol / (2 * np.sqrt(self.T))
+        return -self.F * self._pdf_d1 * self.vol / (2 * np.sqrt(self.T))
 
-    @property
+    @cached_property
     def N2(self) -> float:
         return norm.cdf(self.d2)
 
@@ -63,7 +86,7 @@ class BlackScholes:
     def intrinsic(self) -> float:
         return self.right.intrinsic(self.F, self.K)
 
-    @property
+    @cached_property
     def _is_worth_intrinsic(self) -> bool:
         return self.vol * self.T < 1e-5
 
@@ -80,4 +103,27 @@ class BlackScholes:
 
     @property
     def vega(self) -> float:
-        return self.F * np.sqrt(self.T) * norm.pdf(self.d1) * 0.01
+        return self.F * np.sqrt(self.T) * self._pdf_d1 * 0.01
+
+    @property
+    def greeks(self) -> BlackScholesGreeks:
+        if self._is_worth_intrinsic:
+            in_the_money_call = 1.0 if self.F > self.K else 0.0
+            return BlackScholesGreeks(
+                value=self.value,
+                delta=self.delta,
+                gamma=0.0,
+                theta=0.0,
+                vega=0.0,
+                N1=in_the_money_call,
+                N2=in_the_money_call,
+            )
+        return BlackScholesGreeks(
+            value=self.value,
+            delta=self.delta,
+            gamma=self.gamma,
+            theta=self.theta,
+            vega=self.vega,
+            N1=self.N1,
+            N2=self.N2,
+        )
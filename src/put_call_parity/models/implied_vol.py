@@ -0,0 +1,93 @@
+import numpy as np
+from numpy import ndarray
+from numpy.typing import ArrayLike
+from scipy.special import ndtr
+
+__all__ = [
+    "implied_vol",
+]
+
+from tp_utils.type_utils import checked_type
+
+from put_call_parity.models.option_right import OptionRight, CALL
+from put_call_parity.models.vector_black_scholes import INTRINSIC_VOL_TIME
+
+_SQRT_2_PI = np.sqrt(2 * np.pi)
+
+
+def _initial_std_devs(F: ndarray, K: ndarray, call_prices: ndarray) -> ndarray:
+    """Corrado-Miller approximation to the total std dev vol * sqrt(T) of undiscounted calls"""
+    half_moneyness = (F - K) / 2
+    excess = call_prices - half_moneyness
+    discriminant = np.maximum(excess * excess - 4 * half_moneyness * half_moneyness / np.pi, 0.0)
+    return np.maximum(_SQRT_2_PI / (F + K) * (excess + np.sqrt(discriminant)), 1e-3)
+
+
+# noinspection PyPep8Naming
+def _solve_std_devs(F: ndarray, K: ndarray, call_prices: ndarray, tolerance: float,
+                    max_iterations: int) -> ndarray:
+    """
+    Halley's method on std dev, the undiscounted call price's only unknown, safeguarded by a
+    bracket that each iteration narrows - steps leaving it bisect it instead, or double the
+    std dev while there is no upper bound. Unconverged elements are NaN.
+    """
+    log_moneyness = np.log(F / K)
+    std_devs = _initial_std_devs(F, K, call_prices)
+    lower, upper = np.zeros_like(std_devs), np.full_like(std_devs, np.inf)
+    result = np.full_like(std_devs, np.nan)
+    active = np.arange(len(std_devs))
+    for _ in range(max_iterations):
+        d1 = log_moneyness / std_devs + std_devs / 2
+        d2 = d1 - std_devs
+        errors = F * ndtr(d1) - K * ndtr(d2) - call_prices
+        converged = np.abs(errors) <= tolerance * F
+        result[active[converged]] = std_devs[converged]
+        if converged.all():
+            return result
+
+        too_high = errors > 0
+        upper = np.where(too_high, std_devs, upper)
+        lower = np.where(too_high, lower, std_devs)
+        newton_steps = errors * _SQRT_2_PI / (F * np.exp(-0.5 * d1 * d1))
+        # vega'/vega = d1 d2 / std_dev
+        halley_steps = newton_steps / (1 - 0.5 * newton_steps * d1 * d2 / std_devs)
+        new_std_devs = std_devs - halley_steps
+        fallback = np.where(np.isinf(upper), std_devs * 2, (lower + upper) / 2)
+        in_bracket = (new_std_devs > lower) & (new_std_devs < upper)
+        new_std_devs = np.where(in_bracket, new_std_devs, fallback)
+
+        unconverged = ~converged
+        active = active[unconverged]
+        F, K, call_prices, log_moneyness = F[unconverged], K[unconverged], call_prices[unconverged], \
+            log_moneyness[unconverged]
+        std_devs, lower, upper = new_std_devs[unconverged], lower[unconverged], upper[unconverged]
+    return result
+
+
+# noinspection PyPep8Naming
+def implied_vol(right: OptionRight, price: ArrayLike, F: ArrayLike, K: ArrayLike, T: ArrayLike,
+                tolerance: float = 1e-12, max_iterations: int = 50) -> ndarray:
+    """
+    The vols at which VectorBlackScholes reproduces `price`, to within `tolerance` x F, for
+    mutually broadcastable array-likes. Puts are solved as calls via put-call parity.
+
+    Prices within tolerance of intrinsic give vol 0, which VectorBlackScholes values at
+    intrinsic. Prices no vol can produce are NaN - those below intrinsic or above the
+    underlying (or, for puts, the strike), and those with time value whose vol would fall
+    where VectorBlackScholes only values intrinsic (vol * T < INTRINSIC_VOL_TIME).
+    """
+    checked_type(right, OptionRight)
+    shape = np.broadcast_shapes(np.shape(price), np.shape(F), np.shape(K), np.shape(T))
+    price, F, K, T = (np.broadcast_to(np.asarray(x, dtype=float), shape).ravel() for x in (price, F, K, T))
+    call_prices = price if right == CALL else price + F - K
+    time_values = call_prices - np.maximum(F - K, 0.0)
+
+    vols = np.full(price.shape, np.nan)
+    at_intrinsic = (np.abs(time_values) <= tolerance * F) & (T >= 0)
+    vols[at_intrinsic] = 0.0
+    solvable = np.flatnonzero((time_values > tolerance * F) & (call_prices < F) & (T > 0))
+    std_devs = _solve_std_devs(F[solvable], K[solvable], call_prices[solvable], tolerance, max_iterations)
+    solved_vols = std_devs / np.sqrt(T[solvable])
+    solved_vols[solved_vols * T[solvable] < INTRINSIC_VOL_TIME] = np.nan
+    vols[solvable] = solved_vols
+    return vols.reshape(shape)
@@ -6,6 +6,8 @@ __all__ = [
 from abc import ABC, abstractmethod
 from numbers import Number
 
+import numpy as np
+
 
 class OptionRight(ABC):
     @abstractmethod
@@ -16,7 +18,7 @@ class OptionRight(ABC):
         return type(self) == type(other)
 
     def __hash__(self):
-        return type(self).__hash__()
+        return hash(type(self))
 
     def __repr__(self):
         return str(self)
@@ -24,14 +26,14 @@ class OptionRight(ABC):
 
 class _Call(OptionRight):
     def intrinsic(self, F: Number, K: Number) -> float:
-        return max(F - K, 0)
+        return np.maximum(F - K, 0)
 
     def __str__(self):
         return "Call"
 
 class _Put(OptionRight):
     def intrinsic(self, F: Number, K: Number) -> float:
-        return max(K - F, 0)
+        return np.maximum(K - F, 0)
 
     def __str__(self):
         return "Put"
@@ -0,0 +1,129 @@
+from functools import cached_property
+
+import numpy as np
+from numpy import ndarray
+from numpy.typing import ArrayLike
+from scipy.special import ndtr
+
+__all__ = [
+    "VectorBlackScholes"
+]
+
+from tp_utils.type_utils import checked_type
+
+from put_call_parity.models.black_scholes import BlackScholesGreeks
+from put_call_parity.models.option_right import OptionRight, CALL
+
+_SQRT_2_PI = np.sqrt(2 * np.pi)
+
+# Options with vol * T below this are worth intrinsic, as in BlackScholes
+INTRINSIC_VOL_TIME = 1e-5
+
+
+def _norm_pdf(x: ndarray) -> ndarray:
+    return np.exp(-0.5 * x * x) / _SQRT_2_PI
+
+
+# noinspection PyPep8Naming
+class VectorBlackScholes:
+    """
+    Array analogue of BlackScholes. F, K, vol and T may be any mutually broadcastable
+    array-likes, and every result has their broadcast shape. Elements for which
+    vol * T is negligible are worth intrinsic, exactly as in the scalar model.
+    """
+    def __init__(self, right: OptionRight, F: ArrayLike, K: ArrayLike, vol: ArrayLike, T: ArrayLike):
+        self.right: OptionRight = checked_type(right, OptionRight)
+        # Inputs are left unbroadcast so that, e.g., a per-time-step T of shape (time, 1) costs
+        # one sqrt per time step rather than one per (time, path) element
+        self.F: ndarray = np.asarray(F, dtype=float)
+        self.K: ndarray = np.asarray(K, dtype=float)
+        self.vol: ndarray = np.asarray(vol, dtype=float)
+        self.T: ndarray = np.asarray(T, dtype=float)
+        self.shape: tuple = np.broadcast_shapes(self.F.shape, self.K.shape, self.vol.shape, self.T.shape)
+
+    @cached_property
+    def _is_worth_intrinsic(self) -> ndarray:
+        return self.vol * self.T < INTRINSIC_VOL_TIME
+
+    @cached_property
+    def _sqrt_T(self) -> ndarray:
+        # Masked elements get a harmless placeholder so no warnings are raised evaluating them
+        return np.where(self._is_worth_intrinsic, 1.0, np.sqrt(np.maximum(self.T, 0.0)))
+
+    @cached_property
+    def _std_dev(self) -> ndarray:
+        return np.where(self._is_worth_intrinsic, 1.0, self.vol * self._sqrt_T)
+
+    @cached_property
+    def d1(self) -> ndarray:
+        return (np.log(self.F / self.K) + self._std_dev * self._std_dev / 2) / self._std_dev
+
+    @cached_property
+    def d2(self) -> ndarray:
+        return self.d1 - self._std_dev
+
+    @cached_property
+    def _pdf_d1(self) -> ndarray:
+        return _norm_pdf(self.d1)
+
+    @cached_property
+    def _in_the_money_call(self) -> ndarray:
+        return np.where(self.F > self.K, 1.0, 0.0)
+
+    @cached_property
+    def N1(self) -> ndarray:
+        return np.where(self._is_worth_intrinsic, self._in_the_money_call, ndtr(self.d1))
+
+    @cached_property
+    def N2(self) -> ndarray:
+        return np.where(self._is_worth_intrinsic, self._in_the_money_call, ndtr(self.d2))
+
+    @cached_property
+    def intrinsic(self) -> ndarray:
+        return self.right.intrinsic(self.F, self.K)
+
+    @property
+    def delta(self) -> ndarray:
+        # N1 is the call delta, including where worth intrinsic, and puts follow by put-call parity.
+        # A copy for calls, so callers may negate it in place without corrupting the cached N1
+        return self.N1.copy() if self.right == CALL else self.N1 - 1.0
+
+    @property
+    def gamma(self) -> ndarray:
+        return np.where(self._is_worth_intrinsic, 0.0, self._pdf_d1 / (self.F * self._std_dev))
+
+    @property
+    def theta(self) -> ndarray:
+        return np.where(self._is_worth_intrinsic, 0.0, -self.F * self._pdf_d1 * self.vol / (2 * self._sqrt_T))
+
+    @property
+    def vega(self) -> ndarray:
+        return np.where(self._is_worth_intrinsic, 0.0, self.F * self._sqrt_T * self._pdf_d1 * 0.01)
+
+    @property
+    def vanna(self) -> ndarray:
+        """Derivative of delta with respect to vol, per unit of vol"""
+        return np.where(self._is_worth_intrinsic, 0.0, -self._pdf_d1 * self.d2 / self.vol)
+
+    @property
+    def value(self) -> ndarray:
+        if self.right == CALL:
+            model_value = self.F * self.N1 - self.K * self.N2
+        else:
+            model_value = self.K * (1 - self.N2) - self.F * (1 - self.N1)
+        return np.where(self._is_worth_intrinsic, self.intrinsic, model_value)
+
+    def shift_vol(self, dV) -> 'VectorBlackScholes':
+        return VectorBlackScholes(self.right, self.F, self.K, self.vol + dV, self.T)
+
+    @property
+    def greeks(self) -> BlackScholesGreeks:
+        return BlackScholesGreeks(
+            value=self.value,
+            delta=self.delta,
+            gamma=self.gamma,
+            theta=self.theta,
+            vega=self.vega,
+            N1=self.N1,
+            N2=self.N2,
+        )
@@ -0,0 +1,190 @@
+from numbers import Number
+from typing import Callable, Iterable, Optional, Tuple
+
+import numpy as np
+from numpy import ndarray
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_utils.type_utils import checked_type, checked_optional_type
+
+from put_call_parity.models import OptionRight, VectorBlackScholes, CALL
+from put_call_parity.portfolio.hedging_strategy import HedgingStrategy, EveryStepStrategy, HedgeStep
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel
+from put_call_parity.process.vector_path_builder import VectorPathBuilder
+
+# Upper bound on (time step x path) elements priced at once, so temporaries stay bounded
+# however many paths are simulated
+MAX_BLOCK_ELEMENTS = 5_000_000
+
+
+# noinspection PyPep8Naming
+class DeltaHedgeState:
+    """
+    Hedge positions and cash for every path, part way through a simulation. The option is
+    replicated by holding -delta of the underlying, set up at the initial time and then
+    rebalanced at each observed time as the simulator's hedging strategy decides. Trades
+    are at mid, with any transaction costs paid from cash and also accumulated in `costs`.
+    """
+
+    def __init__(self, simulator: 'DeltaHedgeSimulator', time: float, prices: ndarray):
+        self.simulator: DeltaHedgeSimulator = simulator
+        self.time: float = time
+        self.prices: ndarray = prices
+        self.position: ndarray = simulator.deltas(prices, time) * -1
+        self.cash: ndarray = self.position * prices * -1
+        self.n_rehedges: ndarray = np.zeros(prices.shape, dtype=int)
+        self.costs: ndarray = np.zeros(prices.shape)
+        self._pay_costs(prices, self.position)
+
+    def _pay_costs(self, prices: ndarray, changes: ndarray):
+        cost_model = self.simulator.cost_model
+        if cost_model is None:
+            return
+        costs = cost_model.total_costs(prices, changes) if changes.ndim == 2 else cost_model.costs(prices, changes)
+        self.costs += costs
+        self.cash -= costs
+
+    def rehedge(self, times: ndarray, prices: ndarray):
+        """
+        Rehedge at each of `times` (shape (time,)) against `prices` (shape (time, path)).
+        """
+        if len(times) == 0:
+            return
+        strategy = self.simulator.strategy
+        dts = np.diff(times, prepend=self.time)
+        hedge_vols = np.broadcast_to(strategy.hedge_vol(self.simulator.vol, dts), dts.shape)
+        if strategy.rehedges_every_step:
+            self._rehedge_block(times, prices, hedge_vols)
+        else:
+            for i_time in range(len(times)):
+                self._rehedge_step(times[i_time], dts[i_time], prices[i_time], hedge_vols[i_time])
+
+    def _rehedge_block(self, times: ndarray, prices: ndarray, hedge_vols: ndarray):
+        bs = self.simulator.black_scholes(prices, times[:, np.newaxis], hedge_vols[:, np.newaxis])
+        positions = bs.delta
+        np.negative(positions, out=positions)
+        changes = np.diff(positions, axis=0, prepend=self.position[np.newaxis, :])
+        self.cash -= np.einsum("tp,tp->p", prices, changes)
+        self._pay_costs(prices, changes)
+        self.n_rehedges += np.count_nonzero(changes, axis=0)
+        self.position = positions[-1]
+        self.prices = prices[-1]
+        self.time = times[-1]
+
+    def _rehedge_step(self, time: float, dt: float, prices: ndarray, hedge_vol: float):
+        bs = self.simulator.black_scholes(prices, time, hedge_vol)
+        new_position = self.simulator.strategy.rehedge(HedgeStep(time, dt, prices, self.position, bs))
+        changes = new_position - self.position
+        self.cash -= prices * changes
+        self._pay_costs(prices, changes)
+        self.n_rehedges += changes != 0
+        self.position = new_position
+        self.prices = prices
+        self.time = time
+
+    def pnl(self) -> ndarray:
+        """Per path P&L, net of transaction costs"""
+        option_payoffs = self.simulator.right.intrinsic(self.prices, self.simulator.K)
+        underlying_value = self.prices * self.position
+        return underlying_value + self.cash + option_payoffs
+
+
+# noinspection PyPep8Naming
+class DeltaHedgeSimulator:
+    def __init__(self, right: OptionRight, K: float, vol: float, T: float, strategy: Optional[HedgingStrategy] = None,
+                 cost_model: Optional[TransactionCostModel] = None):
+        self.right: OptionRight = checked_type(right, OptionRight)
+        self.K: float = checked_type(K, Number)
+        self.vol: float = checked_type(vol, Number)
+        self.T: float = checked_type(T, Number)
+        self.strategy: HedgingStrategy = checked_optional_type(strategy, HedgingStrategy) or EveryStepStrategy()
+        self.cost_model: Optional[TransactionCostModel] = checked_optional_type(cost_model, TransactionCostModel)
+
+    def black_scholes(self, prices: ndarray, t, vol) -> VectorBlackScholes:
+        return VectorBlackScholes(self.right, prices, self.K, vol, self.T - t)
+
+    def deltas(self, prices: ndarray, t) -> ndarray:
+        return self.black_scholes(prices, t, self.vol).delta
+
+    def initial_state(self, time: float, prices: ndarray) -> DeltaHedgeState:
+        return DeltaHedgeState(self, time, prices)
+
+    def _blocks(self, times: ndarray, prices: ndarray) -> Iterable[tuple[ndarray, ndarray]]:
+        checked_type(prices, ndarray)
+        assert prices.ndim == 2 and prices.shape[0] == len(times), \
+            f"Expected prices of shape ({len(times)}, n_paths), got {prices.shape}"
+        n_paths = prices.shape[1]
+        steps_per_block = max(1, MAX_BLOCK_ELEMENTS // max(n_paths, 1))
+        return (
+            (times[i_start:i_start + steps_per_block], prices[i_start:i_start + steps_per_block])
+            for i_start in range(0, len(times), steps_per_block)
+        )
+
+    def simulate(self, times: ndarray, prices: ndarray) -> ndarray:
+        """
+        P&L per path of a delta hedged option, net of transaction costs, given `prices` with
+        shape (time, path).
+        """
+        return self.simulate_blocks(self._blocks(times, prices))
+
+    def simulate_with_costs(self, times: ndarray, prices: ndarray) -> Tuple[ndarray, ndarray]:
+        """As `simulate`, also returning the transaction costs paid on each path"""
+        state = self.final_state(self._blocks(times, prices))
+        return state.pnl(), state.costs
+
+    def simulate_blocks(self, blocks: Iterable[tuple[ndarray, ndarray]]) -> ndarray:
+        """
+        As `simulate`, but consuming consecutive (times, prices) blocks, prices of shape
+        (time, path), so the full price grid need never be held in memory.
+        """
+        return self.final_state(blocks).pnl()
+
+    def simulate_builder(self, bldr: VectorPathBuilder, rng: RandomNumberGenerator, n_paths: int,
+                         steps_per_block: int = 1,
+                         hedged_prices: Callable[[ndarray], ndarray] = lambda path: path[0]) -> ndarray:
+        """
+        As `simulate_blocks`, against paths generated `steps_per_block` time steps at a time by
+        `bldr`. `hedged_prices` maps each block of paths, shape (factor, time, path), to the
+        prices hedged, shape (time, path).
+        """
+        return self.simulate_blocks(
+            (block_times, hedged_prices(block))
+            for block_times, block in bldr.build_blocks(rng, n_paths, steps_per_block)
+        )
+
+    def final_state(self, blocks: Iterable[tuple[ndarray, ndarray]]) -> DeltaHedgeState:
+        """The hedge state after consuming every block"""
+        state = None
+        for times, prices in blocks:
+            if state is None:
+                state = self.initial_state(times[0], prices[0])
+                times, prices = times[1:], prices[1:]
+            state.rehedge(times, prices)
+        assert state is not None, "No prices to hedge against"
+        return state
+
+    def pathwise_sensitivities(self, times: ndarray, prices: ndarray) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        P&L per path, as `simulate`, together with its derivatives with respect to each price
+        on the path, shape (time, path), and with respect to the hedging vol, shape (path,).
+        The P&L is sum_i x_i (S_i+1 - S_i) + payoff(S_n), for positions x_i = -delta_i, so
+        these follow directly from the deltas, gammas and vannas along the path. Only defined
+        for hedging every step without transaction costs.
+        """
+        assert type(self.strategy) is EveryStepStrategy and self.cost_model is None, \
+            "Pathwise sensitivities need every step hedging without costs"
+        bs = self.black_scholes(prices, times[:, np.newaxis], self.vol)
+        positions = bs.delta[:-1]
+        np.negative(positions, out=positions)
+        moves = np.diff(prices, axis=0)
+        terminal_prices = prices[-1]
+        pnl = np.einsum("tp,tp->p", positions, moves) + self.right.intrinsic(terminal_prices, self.K)
+
+        price_derivatives = np.zeros_like(prices)
+        price_derivatives[1:] += positions
+        price_derivatives[:-1] -= positions
+        price_derivatives[:-1] -= bs.gamma[:-1] * moves
+        payoff_slope = 1.0 if self.right == CALL else -1.0
+        price_derivatives[-1] += np.where(self.right.intrinsic(terminal_prices, self.K) > 0, payoff_slope, 0.0)
+
+        vol_derivatives = -np.einsum("tp,tp->p", bs.vanna[:-1], moves)
+        return pnl, price_derivatives, vol_derivatives
@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from functools import cached_property
+from numbers import Number
+
+import numpy as np
+from numpy import ndarray
+from tp_utils.type_utils import checked_type
+
+from put_call_parity.models import VectorBlackScholes
+
+
+class HedgeStep:
+    """
+    What a hedging strategy sees at one rebalancing time, for every path at once. Positions
+    are units of the underlying held; the Black-Scholes hedge is -delta of the option amount.
+    """
+    def __init__(self, time: float, dt: float, prices: ndarray, positions: ndarray, bs: VectorBlackScholes,
+                 option_amount: float = 1.0):
+        self.time: float = time
+        self.dt: float = dt
+        self.prices: ndarray = prices
+        self.positions: ndarray = positions
+        self.bs: VectorBlackScholes = bs
+        self.option_amount: float = option_amount
+
+    @cached_property
+    def target_positions(self) -> ndarray:
+        return self.bs.delta * -self.option_amount
+
+    @cached_property
+    def gamma(self) -> ndarray:
+        return self.bs.gamma * self.option_amount
+
+    def rehedge_outside_band(self, band, to_edge: bool = False) -> ndarray:
+        """
+        New positions, rehedging those paths whose position is more than `band` from target -
+        either back to target or, if `to_edge`, only as far as the nearest edge of the band.
+        """
+        deviations = self.positions - self.target_positions
+        if to_edge:
+            return self.target_positions + np.clip(deviations, -band, band)
+        return np.where(np.abs(deviations) > band, self.target_positions, self.positions)
+
+
+class HedgingStrategy(ABC):
+    # Strategies that rehedge every path to target at every step let simulators
+    # price a whole block of steps at once
+    rehedges_every_step: bool = False
+
+    def hedge_vol(self, vol: float, dt):
+        """The vol used for hedge deltas, for a step of length `dt`"""
+        return vol
+
+    @abstractmethod
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        """New positions for every path"""
+        raise ValueError("implement 'rehedge'")
+
+
+class EveryStepStrategy(HedgingStrategy):
+    rehedges_every_step = True
+
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        return step.target_positions
+
+
+class TimeBasedStrategy(HedgingStrategy):
+    """Rehedges every path whenever time passes a multiple of `interval`"""
+    def __init__(self, interval: float):
+        self.interval: float = checked_type(interval, Number)
+        assert interval > 0, "interval must be positive"
+
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        crossed = np.floor(step.time / self.interval + 1e-9) > np.floor((step.time - step.dt) / self.interval + 1e-9)
+        return step.target_positions if crossed else step.positions
+
+
+class DeltaBandStrategy(HedgingStrategy):
+    """Rehedges a path when its position is more than `band` units from target"""
+    def __init__(self, band: float):
+        self.band: float = checked_type(band, Number)
+
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        return step.rehedge_outside_band(self.band)
+
+
+class GammaScaledBandStrategy(HedgingStrategy):
+    """
+    A delta band of `multiple` times the typical move in delta over the step,
+    |gamma| * price * vol * sqrt(dt), so bands are tight where delta is stable and wide where
+    it is moving quickly.
+    """
+    def __init__(self, multiple: float):
+        self.multiple: float = checked_type(multiple, Number)
+
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        typical_delta_move = np.abs(step.gamma) * step.prices * step.bs.vol * np.sqrt(step.dt)
+        return step.rehedge_outside_band(self.multiple * typical_delta_move)
+
+
+class WhalleyWilmottStrategy(HedgingStrategy):
+    """
+    The Whalley-Wilmott asymptotically optimal band for proportional transaction cost
+    `cost_rate` and exponential utility with risk aversion `risk_aversion`, of half width
+    (3 cost_rate price gamma^2 / (2 risk_aversion))^(1/3). Paths outside the band trade
+    only as far as its edge.
+    """
+    def __init__(self, cost_rate: float, risk_aversion: float):
+        self.cost_rate: float = checked_type(cost_rate, Number)
+        self.risk_aversion: float = checked_type(risk_aversion, Number)
+        assert risk_aversion > 0, "risk_aversion must be positive"
+
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        band = np.cbrt(1.5 * self.cost_rate * step.prices * step.gamma * step.gamma / self.risk_aversion)
+        return step.rehedge_outside_band(band, to_edge=True)
+
+
+class LelandStrategy(HedgingStrategy):
+    """
+    Rehedges every step to the delta at Leland's cost adjusted vol,
+    vol^2 (1 + sqrt(2 / pi) cost_rate / (vol sqrt(dt))), for proportional cost `cost_rate`
+    """
+    rehedges_every_step = True
+
+    def __init__(self, cost_rate: float):
+        self.cost_rate: float = checked_type(cost_rate, Number)
+
+    def hedge_vol(self, vol: float, dt):
+        assert np.all(np.asarray(dt) > 0), "Leland's hedge vol needs a positive time between rehedges"
+        leland_number = np.sqrt(2 / np.pi) * self.cost_rate / (vol * np.sqrt(dt))
+        return vol * np.sqrt(1 + leland_number)
+
+    def rehedge(self, step: HedgeStep) -> ndarray:
+        return step.target_positions
@@ -0,0 +1,142 @@
+import numpy as np
+from numpy import ndarray
+
+from put_call_parity.portfolio.delta_hedge_simulator import DeltaHedgeSimulator
+
+# Parameters of the two factor (commodity price, FX rate) hedge simulations
+F = "F"
+FX = "FX"
+F_VOL = "F_vol"
+FX_VOL = "FX_vol"
+RHO = "rho"
+PARAMETERS = [F, FX, F_VOL, FX_VOL, RHO]
+
+
+class MonteCarloGreeks:
+    """
+    Per path P&L of a simulation, with per path pathwise and likelihood ratio estimators of the
+    derivative of expected P&L with respect to each parameter. Each estimator is unbiased, so
+    its mean over paths estimates the greek; the two differ only in variance.
+    """
+    def __init__(self, pnl: ndarray, pathwise: dict[str, ndarray], likelihood_ratio: dict[str, ndarray]):
+        self.pnl: ndarray = pnl
+        self.pathwise: dict[str, ndarray] = pathwise
+        self.likelihood_ratio: dict[str, ndarray] = likelihood_ratio
+
+    def pathwise_greek(self, parameter: str) -> float:
+        return float(self.pathwise[parameter].mean())
+
+    def likelihood_ratio_greek(self, parameter: str) -> float:
+        return float(self.likelihood_ratio[parameter].mean())
+
+
+def lognormal_brownians(times: ndarray, paths: ndarray, drifts: ndarray, vols: ndarray) -> ndarray:
+    """
+    The correlated Brownians W, shape (factor, time, path), that generated lognormal `paths`
+    S(t) = S(0) exp((drift - vol^2 / 2) t + vol W(t)), given S(0) = paths[:, 0, :] at time 0.
+    """
+    log_drifts = drifts - 0.5 * vols * vols
+    W = np.log(paths / paths[:, :1, :])
+    W -= np.multiply.outer(log_drifts, times)[:, :, np.newaxis]
+    W /= vols[:, np.newaxis, np.newaxis]
+    return W
+
+
+# noinspection PyPep8Naming
+def _log_density_derivative(dts: ndarray, noises: ndarray, precision: ndarray, dSigma: ndarray,
+                            dLogDrift: ndarray) -> ndarray:
+    """
+    Derivative, per path, of the log density of a path of independent Gaussian log price
+    increments with mean log_drift dt and covariance Sigma dt, with respect to a parameter
+    moving Sigma by dSigma and log_drift by dLogDrift. `noises` are the increments less their
+    means, shape (factor, step, path), and `precision` is Sigma's inverse.
+    """
+    n_steps = len(dts)
+    A_noises = np.einsum("fg,gtp->ftp", precision, noises)
+    quadratic = np.einsum("ftp,fg,gtp->p", A_noises, dSigma, A_noises / dts[np.newaxis, :, np.newaxis])
+    linear = np.einsum("f,ftp->p", dLogDrift, A_noises)
+    return -0.5 * n_steps * np.trace(precision @ dSigma) + linear + 0.5 * quadratic
+
+
+# noinspection PyPep8Naming
+def fx_option_hedge_greeks(simulator: DeltaHedgeSimulator, times: ndarray, paths: ndarray, drifts: ndarray,
+                           F_vol: float, FX_vol: float, rho: float) -> MonteCarloGreeks:
+    """
+    Greeks of the P&L from delta hedging an option on the foreign price, F x FX, with respect
+    to the initial F and FX, their vols and their correlation, from `paths` of shape
+    (2, time, path) generated by a LognormalPathsBuilder from time 0. Both estimators allow
+    for the simulator's hedging vol being the combined vol of F x FX.
+
+    Pathwise estimators differentiate each path's P&L holding its uncorrelated Brownians
+    fixed, with correlation applied by Cholesky factor. Likelihood ratio estimators weight the
+    P&L by the derivative of the log density of the path's log price increments, plus the P&L's
+    direct dependence on the initial price and hedging vol.
+    """
+    assert times[0] == 0.0, "Expected paths starting at time 0"
+    assert abs(rho) < 1.0, "Greeks need |rho| < 1"
+    vols = np.asarray([F_vol, FX_vol])
+    initial_F, initial_FX = paths[0, 0, 0], paths[1, 0, 0]
+    foreign_prices = paths[0] * paths[1]    # (time, path)
+    pnl, price_derivatives, hedge_vol_derivatives = simulator.pathwise_sensitivities(times, foreign_prices)
+
+    combined_vol = simulator.vol
+    hedge_vol_sensitivities = {
+        F: 0.0,
+        FX: 0.0,
+        F_VOL: (F_vol + rho * FX_vol) / combined_vol,
+        FX_VOL: (FX_vol + rho * F_vol) / combined_vol,
+        RHO: F_vol * FX_vol / combined_vol,
+    }
+
+    # Pathwise - d foreign price / d parameter along each path, chained through dP&L / d price
+    W = lognormal_brownians(times, paths, drifts, vols)
+    uncorrelated_W_FX = (W[1] - rho * W[0]) / np.sqrt(1 - rho * rho)
+    price_sensitivities = {
+        F: foreign_prices / initial_F,
+        FX: foreign_prices / initial_FX,
+        F_VOL: foreign_prices * (W[0] - F_vol * times[:, np.newaxis]),
+        FX_VOL: foreign_prices * (W[1] - FX_vol * times[:, np.newaxis]),
+        RHO: foreign_prices * FX_vol * (W[0] - rho * uncorrelated_W_FX / np.sqrt(1 - rho * rho)),
+    }
+    pathwise = {
+        parameter: np.einsum("tp,tp->p", price_derivatives, price_sensitivities[parameter])
+        + hedge_vol_derivatives * hedge_vol_sensitivities[parameter]
+        for parameter in PARAMETERS
+    }
+
+    # Likelihood ratio - scores of the log price increments
+    dts = np.diff(times)
+    log_drifts = drifts - 0.5 * vols * vols
+    noises = np.diff(np.log(paths), axis=1)
+    noises -= np.multiply.outer(log_drifts, dts)[:, :, np.newaxis]
+    covariance = np.outer(vols, vols) * np.asarray([[1.0, rho], [rho, 1.0]])
+    precision = np.linalg.inv(covariance)
+    first_step_scores = precision @ noises[:, 0, :] / dts[0]    # d log density / d log initial price
+    scores = {
+        F: first_step_scores[0] / initial_F,
+        FX: first_step_scores[1] / initial_FX,
+        F_VOL: _log_density_derivative(
+            dts, noises, precision,
+            dSigma=np.asarray([[2 * F_vol, rho * FX_vol], [rho * FX_vol, 0.0]]),
+            dLogDrift=np.asarray([-F_vol, 0.0])
+        ),
+        FX_VOL: _log_density_derivative(
+            dts, noises, precision,
+            dSigma=np.asarray([[0.0, rho * F_vol], [rho * F_vol, 2 * FX_vol]]),
+            dLogDrift=np.asarray([0.0, -FX_vol])
+        ),
+        RHO: _log_density_derivative(
+            dts, noises, precision,
+            dSigma=np.asarray([[0.0, F_vol * FX_vol], [F_vol * FX_vol, 0.0]]),
+            dLogDrift=np.zeros(2)
+        ),
+    }
+    # With later prices held fixed, the initial price only affects the P&L through the initial hedge
+    initial_price_sensitivities = {F: initial_FX, FX: initial_F, F_VOL: 0.0, FX_VOL: 0.0, RHO: 0.0}
+    likelihood_ratio = {
+        parameter: pnl * scores[parameter]
+        + price_derivatives[0] * initial_price_sensitivities[parameter]
+        + hedge_vol_derivatives * hedge_vol_sensitivities[parameter]
+        for parameter in PARAMETERS
+    }
+    return MonteCarloGreeks(pnl, pathwise, likelihood_ratio)
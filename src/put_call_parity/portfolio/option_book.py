@@ -0,0 +1,123 @@
+import numpy as np
+from numpy import ndarray
+from numpy.typing import ArrayLike
+from tp_quantity.quantity import Qty
+from tp_utils.type_utils import checked_list_type
+
+from put_call_parity.models import BlackScholesGreeks, VectorBlackScholes, CALL, PUT
+from put_call_parity.portfolio.tradeable import OptionTrade
+from put_call_parity.ref_data.commodity import Commodity
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+
+class OptionBook:
+    """
+    Option trades held column-wise, for books too large to handle as OptionTrades. Row i is
+    an option on commodities[commodity_ids[i]], with its amount in that commodity's quantity
+    uom and its strike in its price uom. Against a ValuationContext the whole book is priced
+    by a single VectorBlackScholes evaluation, giving the same results as its trades - values
+    and thetas converted, as theirs are, into the valuation ccy.
+    """
+    def __init__(self, commodities: list[Commodity], commodity_ids: ArrayLike, amounts: ArrayLike,
+                 is_call: ArrayLike, strikes: ArrayLike, expiry_times: ArrayLike):
+        self.commodities: list[Commodity] = checked_list_type(commodities, Commodity)
+        self.commodity_ids: ndarray = np.asarray(commodity_ids, dtype=np.int32)
+        self.amounts: ndarray = np.asarray(amounts, dtype=float)
+        self.is_call: ndarray = np.asarray(is_call, dtype=bool)
+        self.strikes: ndarray = np.asarray(strikes, dtype=float)
+        self.expiry_times: ndarray = np.asarray(expiry_times, dtype=float)
+
+        columns = [self.commodity_ids, self.amounts, self.is_call, self.strikes, self.expiry_times]
+        assert all(column.shape == self.commodity_ids.shape for column in columns), "Mismatched column shapes"
+        assert self.commodity_ids.ndim == 1, "Expected one dimensional columns"
+        assert len(self) == 0 or 0 <= self.commodity_ids.min() <= self.commodity_ids.max() < len(commodities), \
+            "Commodity id out of range"
+
+    def __len__(self):
+        return len(self.commodity_ids)
+
+    @staticmethod
+    def from_trades(trades: list[OptionTrade]) -> 'OptionBook':
+        checked_list_type(trades, OptionTrade)
+        commodity_ids: dict[Commodity, int] = {}
+        for trade in trades:
+            commodity_ids.setdefault(trade.commodity, len(commodity_ids))
+        n = len(trades)
+        return OptionBook(
+            list(commodity_ids),
+            np.fromiter((commodity_ids[t.commodity] for t in trades), dtype=np.int32, count=n),
+            np.fromiter((t.amount.checked_value(t.commodity.quantity_uom) for t in trades), dtype=float, count=n),
+            np.fromiter((t.right == CALL for t in trades), dtype=bool, count=n),
+            np.fromiter((t.strike.checked_value(t.commodity.price_uom) for t in trades), dtype=float, count=n),
+            np.fromiter((t.expiry_time for t in trades), dtype=float, count=n),
+        )
+
+    def to_trades(self) -> list[OptionTrade]:
+        trades = []
+        for i_commodity, amount, is_call, strike, expiry_time in zip(
+                self.commodity_ids.tolist(), self.amounts.tolist(), self.is_call.tolist(), self.strikes.tolist(),
+                self.expiry_times.tolist()
+        ):
+            commodity = self.commodities[i_commodity]
+            trades.append(OptionTrade(
+                commodity,
+                Qty(amount, commodity.quantity_uom),
+                CALL if is_call else PUT,
+                Qty(strike, commodity.price_uom),
+                expiry_time
+            ))
+        return trades
+
+    def _per_commodity(self, market_data) -> ndarray:
+        return np.fromiter((market_data(c) for c in self.commodities), dtype=float, count=len(self.commodities))
+
+    def greeks(self, vc: ValuationContext) -> BlackScholesGreeks:
+        """Per row greeks, per unit of each option, in each commodity's units"""
+        F = self._per_commodity(lambda c: vc.price(c).checked_value(c.price_uom))[self.commodity_ids]
+        vol = self._per_commodity(lambda c: vc.vol(c).checked_scalar_value)[self.commodity_ids]
+        T = self.expiry_times - vc.time
+        K = self.strikes
+        calls = VectorBlackScholes(CALL, F, K, vol, T).greeks
+        # Every row is priced as a call, with puts following by put-call parity - a call less a
+        # put is a forward, so only their values and deltas differ from those of the calls
+        is_put = ~self.is_call
+        return BlackScholesGreeks(
+            value=np.where(is_put, calls.value - F + K, calls.value),
+            delta=np.where(is_put, calls.delta - 1.0, calls.delta),
+            gamma=calls.gamma,
+            theta=calls.theta,
+            vega=calls.vega,
+            N1=calls.N1,
+            N2=calls.N2,
+        )
+
+    def _fx_rates(self, vc: ValuationContext) -> ndarray:
+        """Per row rates from each commodity's ccy into the valuation ccy"""
+        return self._per_commodity(
+            lambda c: vc.conversion_rate(c.ccy, vc.valuation_ccy).checked_value(vc.valuation_ccy / c.ccy)
+        )[self.commodity_ids]
+
+    def values(self, vc: ValuationContext) -> ndarray:
+        """Per row values in the valuation ccy"""
+        return self.greeks(vc).value * self.amounts * self._fx_rates(vc)
+
+    def value(self, vc: ValuationContext) -> Qty:
+        return Qty(float(self.values(vc).sum()), vc.valuation_ccy)
+
+    def _commodity_total(self, commodity: Commodity, per_row: ndarray) -> float:
+        if commodity not in self.commodities:
+            return 0.0
+        i_commodity = self.commodities.index(commodity)
+        return float(np.bincount(self.commodity_ids, weights=per_row, minlength=len(self.commodities))[i_commodity])
+
+    def delta(self, vc: ValuationContext, commodity: Commodity) -> Qty:
+        total = self._commodity_total(commodity, self.greeks(vc).delta * self.amounts)
+        return Qty(total, commodity.quantity_uom)
+
+    def gamma(self, vc: ValuationContext, commodity: Commodity) -> Qty:
+        total = self._commodity_total(commodity, self.greeks(vc).gamma * self.amounts)
+        return Qty(total, commodity.quantity_uom / commodity.price_uom)
+
+    def theta(self, vc: ValuationContext) -> Qty:
+        thetas = self.greeks(vc).theta * self.amounts * self._fx_rates(vc)
+        return Qty(float(thetas.sum()), vc.valuation_ccy)
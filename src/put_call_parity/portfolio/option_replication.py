@@ -1,49 +1,67 @@
+import functools
 from numbers import Number
+from typing import Optional, Tuple
 
 import numpy as np
+from numpy import ndarray
 from tp_random_tests.random_number_generator import RandomNumberGenerator
 from tp_utils.type_utils import checked_type
 
 from put_call_parity.models import OptionRight, BlackScholes
+from put_call_parity.portfolio.delta_hedge_simulator import DeltaHedgeSimulator
+from put_call_parity.portfolio.hedging_strategy import HedgingStrategy
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel
+from put_call_parity.process.sharded_runner import Simulation
 from put_call_parity.process.vector_path_builder import LognormalPathsBuilder
 
 
 # noinspection PyPep8Naming
 class OptionReplication:
-    def __init__(self, right: OptionRight, K: float, F: float, vol: float, T: float):
+    def __init__(self, right: OptionRight, K: float, F: float, vol: float, T: float,
+                 strategy: Optional[HedgingStrategy] = None, cost_model: Optional[TransactionCostModel] = None):
         self.right: OptionRight = checked_type(right, OptionRight)
         self.K: float = checked_type(K, Number)
         self.F: float = checked_type(F, Number)
         self.vol: float = checked_type(vol, Number)
         self.T: float = checked_type(T, Number)
+        self.hedge_simulator = DeltaHedgeSimulator(right, K, vol, T, strategy, cost_model)
 
     def _delta(self, price: float, t: float):
         return BlackScholes(self.right, price, self.K, self.vol, self.T - t).delta
 
-    def simulation(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> np.ndarray:
+    def _builder(self, rng: RandomNumberGenerator, n_time_steps: int) -> LognormalPathsBuilder:
         times = rng.random_times(n_time_steps + 1, t0=0.0, T=self.T)
         drift = rng.uniform(-0.2, 0.2)
-        price_paths = VectorPath.brownian_paths(n_variables=2, times=times, n_paths=n_paths).correlated(
-            self.rho_matrix).scaled(self.vols).with_drifts(drifts).with_prices([self.F, self.FX])
-        # bldr = LognormalPathsBuilder(prices=np.asarray([self.F]), times=times, rho_matrix=np.identity(1),
-        #                              drifts=np.asarray([drift]), vols=np.asarray([self.vol]))
-        # price_paths = bldr.build(rng, n_paths)
-        underlying_position = np.ones(n_paths) * self._delta(self.F, t=0) * -1
-        cash_position = underlying_position * self.F * -1
-
-        for i_time_step in range(n_time_steps):
-            t1 = times[i_time_step + 1]
-            price1 = price_paths.factor_values(i_factor=0, i_time=i_time_step + 1)
-
-            position_at_end_of_time_step = np.asarray([self._delta(price, t1) * -1 for price in price1])
-            change_in_position = position_at_end_of_time_step - underlying_position
-            cost_of_position_change = np.einsum("p, p -> p", price1, change_in_position) * -1
-            cash_position = cash_position + cost_of_position_change
-            underlying_position = position_at_end_of_time_step
-
-        terminal_prices = price_paths.factor_values(i_factor=0, i_time=n_time_steps)
-        option_payoffs = np.asarray([max(p - self.K, 0) for p in terminal_prices])
-        underlying_value = np.einsum("p, p -> p", terminal_prices, underlying_position)
-        pnl = underlying_value + cash_position + option_payoffs
-
-        return pnl
+        return LognormalPathsBuilder(prices=np.asarray([self.F]), times=times, rho_matrix=np.identity(1),
+                                     drifts=np.asarray([drift]), vols=np.asarray([self.vol]))
+
+    def _prices(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> Tuple[ndarray, ndarray]:
+        bldr = self._builder(rng, n_time_steps)
+        return bldr.times, bldr.build(rng, n_paths).path[0]
+
+    def _simulate_paths(self, bldr: LognormalPathsBuilder, rng: RandomNumberGenerator, n_paths: int) -> ndarray:
+        return self.hedge_simulator.simulate(bldr.times, bldr.build(rng, n_paths).path[0])
+
+    def path_simulation(self, rng: RandomNumberGenerator, n_time_steps: int) -> Simulation:
+        """
+        `simulation` with its time grid and drift drawn once, from `rng`, leaving a
+        simulation(rng, n_paths=n) that draws only paths - so every shard of a
+        ShardedMonteCarloRunner simulates the same model
+        """
+        return functools.partial(self._simulate_paths, self._builder(rng, n_time_steps))
+
+    def simulation(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> np.ndarray:
+        return self.path_simulation(rng, n_time_steps)(rng, n_paths=n_paths)
+
+    def simulation_with_costs(self, rng: RandomNumberGenerator, n_time_steps: int,
+                              n_paths: int) -> Tuple[ndarray, ndarray]:
+        """P&L per path, net of transaction costs, and the costs paid on each path"""
+        return self.hedge_simulator.simulate_with_costs(*self._prices(rng, n_time_steps, n_paths))
+
+    def streaming_simulation(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int,
+                             steps_per_block: int = 1) -> np.ndarray:
+        """
+        As `simulation`, but generating and hedging `steps_per_block` time steps at a time,
+        so peak memory is independent of the number of time steps.
+        """
+        return self.hedge_simulator.simulate_builder(self._builder(rng, n_time_steps), rng, n_paths, steps_per_block)
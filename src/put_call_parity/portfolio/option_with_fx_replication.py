@@ -1,17 +1,26 @@
+import functools
 from numbers import Number
+from typing import Optional, Tuple
 
 import numpy as np
+from numpy import ndarray
 from tp_random_tests.random_number_generator import RandomNumberGenerator
 from tp_utils.type_utils import checked_type
 
 from put_call_parity.models import OptionRight, BlackScholes
+from put_call_parity.portfolio.delta_hedge_simulator import DeltaHedgeSimulator
+from put_call_parity.portfolio.hedging_strategy import HedgingStrategy
+from put_call_parity.portfolio.monte_carlo_greeks import MonteCarloGreeks, fx_option_hedge_greeks
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel
+from put_call_parity.process.sharded_runner import Simulation
 from put_call_parity.process.vector_path_builder import LognormalPathsBuilder
 
 
 # noinspection PyPep8Naming
 class OptionWithFXReplication:
     def __init__(self, right: OptionRight, K: float, F: float, FX: float, F_vol: float, FX_vol: float, rho: float,
-                 T: float):
+                 T: float, strategy: Optional[HedgingStrategy] = None,
+                 cost_model: Optional[TransactionCostModel] = None):
         self.right: OptionRight = checked_type(right, OptionRight)
         self.K: float = checked_type(K, Number)
         self.F: float = checked_type(F, Number)
@@ -30,6 +39,7 @@ class OptionWithFXReplication:
                 [rho, 1.0]
             ]
         )
+        self.hedge_simulator = DeltaHedgeSimulator(right, K, self.combined_vol, T, strategy, cost_model)
 
     def _delta(self, price: float, t: float):
         return BlackScholes(self.right, price, self.K, self.combined_vol, self.T - t).delta
@@ -37,33 +47,60 @@ class OptionWithFXReplication:
     def _n2(self, price: float, t: float):
         return BlackScholes(self.right, price, self.K, self.combined_vol, self.T - t).N2
 
-    def simulation(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> np.ndarray:
+    def _builder(self, rng: RandomNumberGenerator, n_time_steps: int) -> LognormalPathsBuilder:
+        """Builder of (F, FX) paths, with random drifts"""
         times = np.asarray([i * self.T / n_time_steps for i in range(n_time_steps + 1)])
         drifts = np.asarray([rng.uniform(-0.2, 0.2) for _ in range(2)])
-        bldr = LognormalPathsBuilder(prices=np.asarray([self.F, self.FX]), times=times, rho_matrix=self.rho_matrix,
+        return LognormalPathsBuilder(prices=np.asarray([self.F, self.FX]), times=times, rho_matrix=self.rho_matrix,
                                      drifts=drifts, vols=self.vols)
-        price_paths = bldr.build(rng, n_paths)
-        underlying_position = np.ones(n_paths) * self._delta(self.F, t=0) * -1
-        cash_position = underlying_position * self.F * self.FX * -1
-
-        def foreign_prices_at_time(i_time: int):
-            domestic_prices = price_paths.factor_values(i_factor=0, i_time=i_time)
-            fx = price_paths.factor_values(i_factor=1, i_time=i_time)
-            return np.einsum("p, p-> p", domestic_prices, fx)
-
-        for i_time_step in range(n_time_steps):
-            time_at_end_of_step = times[i_time_step + 1]
-            foreign_prices = foreign_prices_at_time(i_time_step + 1)
-
-            position_at_end_of_time_step = np.asarray([self._delta(price, time_at_end_of_step) * -1 for price in foreign_prices])
-            change_in_position = position_at_end_of_time_step - underlying_position
-            cost_of_position_change = np.einsum("p, p -> p", foreign_prices, change_in_position) * -1
-            cash_position = cash_position + cost_of_position_change
-            underlying_position = position_at_end_of_time_step
-
-        terminal_foreign_prices = foreign_prices_at_time(i_time=n_time_steps)
-        option_payoffs = np.asarray([max(p - self.K, 0) for p in terminal_foreign_prices])
-        underlying_value = np.einsum("p, p -> p", terminal_foreign_prices, underlying_position)
-        pnl = underlying_value + cash_position + option_payoffs
-
-        return pnl
+
+    def _price_paths(self, rng: RandomNumberGenerator, n_time_steps: int,
+                     n_paths: int) -> Tuple[ndarray, ndarray, ndarray]:
+        """Times, drifts and (F, FX) paths of shape (2, time, path)"""
+        bldr = self._builder(rng, n_time_steps)
+        return bldr.times, bldr.drifts, bldr.build(rng, n_paths).path
+
+    @staticmethod
+    def _hedged_prices(paths: ndarray) -> ndarray:
+        """F x FX, shape (time, path), from (F, FX) paths"""
+        return np.multiply(paths[0], paths[1])
+
+    def _foreign_prices(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> Tuple[ndarray, ndarray]:
+        times, _, paths = self._price_paths(rng, n_time_steps, n_paths)
+        return times, self._hedged_prices(paths)
+
+    def _simulate_paths(self, bldr: LognormalPathsBuilder, rng: RandomNumberGenerator, n_paths: int) -> ndarray:
+        return self.hedge_simulator.simulate(bldr.times, self._hedged_prices(bldr.build(rng, n_paths).path))
+
+    def path_simulation(self, rng: RandomNumberGenerator, n_time_steps: int) -> Simulation:
+        """
+        `simulation` with its drifts drawn once, from `rng`, leaving a simulation(rng, n_paths=n)
+        that draws only paths - so every shard of a ShardedMonteCarloRunner simulates the
+        same model
+        """
+        return functools.partial(self._simulate_paths, self._builder(rng, n_time_steps))
+
+    def simulation(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> np.ndarray:
+        return self.path_simulation(rng, n_time_steps)(rng, n_paths=n_paths)
+
+    def simulation_with_costs(self, rng: RandomNumberGenerator, n_time_steps: int,
+                              n_paths: int) -> Tuple[ndarray, ndarray]:
+        """P&L per path, net of transaction costs, and the costs paid on each path"""
+        return self.hedge_simulator.simulate_with_costs(*self._foreign_prices(rng, n_time_steps, n_paths))
+
+    def simulation_greeks(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int) -> MonteCarloGreeks:
+        """
+        As `simulation`, together with pathwise and likelihood ratio estimators of the P&L's
+        sensitivity to F, FX, F_vol, FX_vol and rho, from the same paths
+        """
+        times, drifts, paths = self._price_paths(rng, n_time_steps, n_paths)
+        return fx_option_hedge_greeks(self.hedge_simulator, times, paths, drifts, self.F_vol, self.FX_vol, self.rho)
+
+    def streaming_simulation(self, rng: RandomNumberGenerator, n_time_steps: int, n_paths: int,
+                             steps_per_block: int = 1) -> np.ndarray:
+        """
+        As `simulation`, but generating and hedging `steps_per_block` time steps at a time,
+        so peak memory is independent of the number of time steps.
+        """
+        return self.hedge_simulator.simulate_builder(self._builder(rng, n_time_steps), rng, n_paths, steps_per_block,
+                                                     self._hedged_prices)
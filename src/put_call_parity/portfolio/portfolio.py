@@ -1,38 +1,93 @@
-from typing import Optional
+from typing import Optional, Hashable, Iterable, Iterator
 
 from put_call_parity.valuation_context.valuation_context import ValuationContext
 from tp_quantity.quantity import Qty
-from tp_utils.list_utils import ListUtils
-from tp_utils.type_utils import checked_list_type
+from tp_utils.type_utils import checked_list_type, checked_type
 
-from put_call_parity.portfolio.tradeable import Tradeable
+from put_call_parity.portfolio.tradeable import Tradeable, CommodityTrade, OptionTrade, TradeRisk
+from put_call_parity.ref_data.commodity import Commodity
 from put_call_parity.ref_data.unit_of_account import UnitOfAccount
 
 
 class Portfolio:
+    """
+    Trades netted as they are added, indexed by netting key - the commodity for commodity
+    trades, the currency for cash and commodity, right, strike and expiry for options.
+    Adding a trade is a dict lookup and at most one trade addition, in place for `+=` and
+    add_all. `+` leaves this portfolio unchanged, copying its trades, so is O(n).
+    """
     def __init__(self, net_trades: list[Tradeable]):
-        self.net_trades: list[Tradeable] = checked_list_type(net_trades, Tradeable)
-
-    def __add__(self, other: Tradeable):
-        matching, rest = ListUtils.partition(self.net_trades, lambda tr: tr.unit_of_account == other.unit_of_account)
-        net_stuff = self.stuff.copy()
-        if other.unit_of_account in self.stuff:
-            net_tradeable = other + net_stuff[other.unit_of_account]
-            net_stuff[other.unit_of_account] = net_tradeable
+        self._trades: dict[Hashable, Tradeable] = {}
+        self._keys_by_commodity: dict[Commodity, list[Hashable]] = {}
+        self.add_all(checked_list_type(net_trades, Tradeable))
+
+    @property
+    def net_trades(self) -> list[Tradeable]:
+        return list(self._trades.values())
+
+    def __len__(self):
+        return len(self._trades)
+
+    def __iter__(self) -> Iterator[Tradeable]:
+        return iter(self.net_trades)
+
+    def add(self, trade: Tradeable):
+        key = checked_type(trade, Tradeable).netting_key
+        existing = self._trades.get(key)
+        if existing is None:
+            self._trades[key] = trade
+            if isinstance(trade, (CommodityTrade, OptionTrade)):
+                self._keys_by_commodity.setdefault(trade.commodity, []).append(key)
         else:
-            net_stuff[other.unit_of_account] = other
+            self._trades[key] = existing + trade
 
-        return Portfolio(net_stuff)
+    def add_all(self, trades: Iterable[Tradeable]):
+        for trade in trades:
+            self.add(trade)
+
+    def __iadd__(self, other: Tradeable) -> 'Portfolio':
+        self.add(other)
+        return self
+
+    def __add__(self, other: Tradeable) -> 'Portfolio':
+        portfolio = Portfolio.empty()
+        portfolio._trades = self._trades.copy()
+        portfolio._keys_by_commodity = {
+            commodity: keys.copy() for commodity, keys in self._keys_by_commodity.items()
+        }
+        portfolio.add(other)
+        return portfolio
 
     def volume(self, unit_of_account: UnitOfAccount) -> Optional[Qty]:
-        return self.stuff.get(unit_of_account)
+        """
+        The net amount of a commodity held outright, or of a Currency held as cash. None if
+        there has been no such trade.
+        """
+        trade = self._trades.get(unit_of_account)
+        return None if trade is None else trade.amount
+
+    def delta(self, vc: ValuationContext, commodity: Commodity) -> Qty:
+        return Qty.sum(
+            [self._trades[key].delta(vc, commodity) for key in self._keys_by_commodity.get(commodity, [])] or
+            [Qty(0, commodity.quantity_uom)]
+        )
+
+    def risk(self, vc: ValuationContext, commodity: Commodity) -> TradeRisk:
+        """Value, delta, gamma and theta together, pricing each trade once"""
+        zero = TradeRisk(
+            Qty(0, vc.valuation_ccy),
+            Qty(0, commodity.quantity_uom),
+            Qty(0, commodity.quantity_uom / commodity.price_uom),
+            Qty(0, vc.valuation_ccy),
+        )
+        return TradeRisk.sum([zero] + [t.risk(vc, commodity) for t in self._trades.values()])
 
     def value(self, vc: ValuationContext) -> Qty:
         v = Qty(0, vc.valuation_ccy)
-        for t in self.net_trades:
+        for t in self._trades.values():
             v += t.value(vc)
         return v
 
     @staticmethod
     def empty():
-        return Portfolio([])
\ No newline at end of file
+        return Portfolio([])
@@ -0,0 +1,155 @@
+from typing import Optional
+
+import numpy as np
+from numpy import ndarray
+from tp_quantity.quantity import Qty
+from tp_quantity.uom import SCALAR
+from tp_utils.type_utils import checked_list_type, checked_optional_type
+
+from put_call_parity.portfolio.tradeable import Tradeable
+from put_call_parity.ref_data.commodity import Commodity
+from put_call_parity.valuation_context.batch_valuation_context import BatchValuationContext
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+BASE = "base"
+PRICE_UP = "price_up"
+PRICE_DOWN = "price_down"
+VOL_UP = "vol_up"
+TIME = "time"
+CROSS = "cross"
+
+
+class RiskScenarios:
+    """
+    Every bumped context needed for numeric risk, built once as a single BatchValuationContext
+    whose scenarios are, in order: the unshifted context; up and down price bumps for each
+    commodity; a vol bump for each commodity with a vol; a time shift, if `dt` is given; and
+    a joint up bump for each pair of commodities, if `cross_gammas`.
+    """
+    def __init__(self, vc: ValuationContext, commodities: list[Commodity], dPs: dict[Commodity, Qty], dVol: Qty,
+                 dt: Optional[float], cross_gammas: bool):
+        self.vc: ValuationContext = vc
+        self.commodities: list[Commodity] = commodities
+        self.dPs: dict[Commodity, Qty] = dPs
+        self.dVol: Qty = dVol
+        self.dt: Optional[float] = dt
+
+        vega_commodities = [c for c in commodities if c in vc.commodity_vols]
+        keys = [(BASE,)]
+        for commodity in commodities:
+            keys += [(PRICE_UP, commodity), (PRICE_DOWN, commodity)]
+        keys += [(VOL_UP, commodity) for commodity in vega_commodities]
+        if dt is not None:
+            keys.append((TIME,))
+        if cross_gammas:
+            keys += [(CROSS, c1, c2) for i, c1 in enumerate(commodities) for c2 in commodities[i + 1:]]
+        self.index: dict[tuple, int] = {key: i for i, key in enumerate(keys)}
+
+        base = BatchValuationContext.from_context(vc, len(keys))
+        prices = {commodity: np.array(base.price(commodity)) for commodity in commodities}
+        for commodity in commodities:
+            dP = self._dP(commodity)
+            prices[commodity][self.index[(PRICE_UP, commodity)]] += dP
+            prices[commodity][self.index[(PRICE_DOWN, commodity)]] -= dP
+        if cross_gammas:
+            for i, c1 in enumerate(commodities):
+                for c2 in commodities[i + 1:]:
+                    i_scenario = self.index[(CROSS, c1, c2)]
+                    prices[c1][i_scenario] += self._dP(c1)
+                    prices[c2][i_scenario] += self._dP(c2)
+        vols = {commodity: np.array(base.vol(commodity)) for commodity in vega_commodities}
+        for commodity in vega_commodities:
+            vols[commodity][self.index[(VOL_UP, commodity)]] += dVol.checked_scalar_value
+        times = np.array(base.time)
+        if dt is not None:
+            times[self.index[(TIME,)]] += dt
+        self.context: BatchValuationContext = base.copy(
+            time=times,
+            commodity_prices={**base.commodity_prices, **prices},
+            commodity_vols={**base.commodity_vols, **vols},
+        )
+
+    @property
+    def n_scenarios(self) -> int:
+        return len(self.index)
+
+    def _dP(self, commodity: Commodity) -> float:
+        return self.dPs[commodity].checked_value(commodity.price_uom)
+
+    def revalue(self, trades: list[Tradeable]) -> ndarray:
+        """Total value of `trades` in each scenario, in the valuation ccy - one batch valuation per trade"""
+        values = np.zeros(self.n_scenarios)
+        for trade in trades:
+            values += trade.value(self.context)
+        return values
+
+    def risk(self, trades: list[Tradeable]) -> 'NumericRisk':
+        return NumericRisk(self, self.revalue(trades))
+
+
+class NumericRisk:
+    """Risks of a portfolio, derived from its values under each of a RiskScenarios' contexts"""
+    def __init__(self, scenarios: RiskScenarios, values: ndarray):
+        self.scenarios: RiskScenarios = scenarios
+        self.values: ndarray = values
+        assert values.shape == (scenarios.n_scenarios,), f"Expected one value per scenario, got {values.shape}"
+
+    def _value(self, *key) -> Qty:
+        if key not in self.scenarios.index:
+            raise ValueError(f"No scenario {key}")
+        return Qty(self.values[self.scenarios.index[key]], self.scenarios.vc.valuation_ccy)
+
+    @property
+    def value(self) -> Qty:
+        return self._value(BASE)
+
+    def delta(self, commodity: Commodity) -> Qty:
+        dP = self.scenarios.dPs[commodity]
+        return (self._value(PRICE_UP, commodity) - self._value(PRICE_DOWN, commodity)) / (dP * 2)
+
+    def gamma(self, commodity: Commodity) -> Qty:
+        dP = self.scenarios.dPs[commodity]
+        up_value, dn_value = self._value(PRICE_UP, commodity), self._value(PRICE_DOWN, commodity)
+        return (up_value - self.value * 2 + dn_value) / (dP * dP)
+
+    def cross_gamma(self, c1: Commodity, c2: Commodity) -> Qty:
+        if c1 == c2:
+            return self.gamma(c1)
+        if (CROSS, c1, c2) not in self.scenarios.index:
+            c1, c2 = c2, c1
+        up_up_value = self._value(CROSS, c1, c2)
+        return (up_up_value - self._value(PRICE_UP, c1) - self._value(PRICE_UP, c2) + self.value) / \
+            (self.scenarios.dPs[c1] * self.scenarios.dPs[c2])
+
+    def vega(self, commodity: Commodity) -> Qty:
+        return (self._value(VOL_UP, commodity) - self.value) / self.scenarios.dVol
+
+    @property
+    def theta(self) -> Qty:
+        return (self._value(TIME) - self.value) / self.scenarios.dt
+
+
+class NumericRiskEngine:
+    """
+    Bump and revalue risk for whole portfolios. Each bumped context is built once, and each
+    trade valued once against all of them together, so full delta, gamma, vega and theta on
+    N commodities costs one batch valuation of 2N + 1 (plus vega and theta) scenarios per
+    trade, rather than several scalar valuations per trade and greek. Values are in the
+    context's valuation ccy.
+    """
+    def __init__(self, commodities: list[Commodity], dPs: Optional[dict[Commodity, Qty]] = None,
+                 dVol: Optional[Qty] = None, dt: Optional[float] = None, cross_gammas: bool = False):
+        self.commodities: list[Commodity] = checked_list_type(commodities, Commodity)
+        self.dPs: dict[Commodity, Qty] = {
+            commodity: (dPs or {}).get(commodity, commodity.default_dP)
+            for commodity in commodities
+        }
+        self.dVol: Qty = checked_optional_type(dVol, Qty) or Qty(0.01, SCALAR)
+        self.dt: Optional[float] = dt
+        self.cross_gammas: bool = cross_gammas
+
+    def scenarios(self, vc: ValuationContext) -> RiskScenarios:
+        return RiskScenarios(vc, self.commodities, self.dPs, self.dVol, self.dt, self.cross_gammas)
+
+    def risk(self, trades: list[Tradeable], vc: ValuationContext) -> NumericRisk:
+        return self.scenarios(vc).risk(trades)
@@ -0,0 +1,196 @@
+from abc import ABC, abstractmethod
+from functools import cached_property
+
+import numpy as np
+from numpy import ndarray
+from numpy.typing import ArrayLike
+from tp_utils.type_utils import checked_type, checked_list_type
+
+from put_call_parity.portfolio.tradeable import Tradeable
+from put_call_parity.ref_data.commodity import Commodity
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.valuation_context.batch_valuation_context import BatchValuationContext
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+
+class LabelledArray:
+    """An ndarray with a name and coordinate values for each of its dimensions"""
+    def __init__(self, values: ndarray, dims: list[str], coords: list[ndarray]):
+        self.values: ndarray = checked_type(values, ndarray)
+        self.dims: list[str] = dims
+        self.coords: list[ndarray] = coords
+        assert len(dims) == len(coords) == values.ndim, f"Expected {values.ndim} dims and coords"
+        assert values.shape == tuple(len(c) for c in coords), \
+            f"Shape {values.shape} doesn't match coords {[len(c) for c in coords]}"
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def coord(self, dim: str) -> ndarray:
+        return self.coords[self.dims.index(dim)]
+
+    def index(self, dim: str, coordinate: float) -> int:
+        matches = np.flatnonzero(np.isclose(self.coord(dim), coordinate))
+        if len(matches) == 0:
+            raise ValueError(f"No coordinate {coordinate} in {dim}")
+        return int(matches[0])
+
+    def sel(self, coordinates: dict[str, float]) -> 'LabelledArray':
+        """
+        The sub array at the given coordinates, keyed by dimension name, e.g.
+        sel({"time": 0.25}). Selected dimensions are dropped.
+        """
+        item = tuple(
+            self.index(dim, coordinates[dim]) if dim in coordinates else slice(None)
+            for dim in self.dims
+        )
+        kept = [i for i, dim in enumerate(self.dims) if dim not in coordinates]
+        return LabelledArray(self.values[item], [self.dims[i] for i in kept], [self.coords[i] for i in kept])
+
+
+class ScenarioAxis(ABC):
+    """Shifts to one market input, making up one dimension of a RiskLadder"""
+    def __init__(self, shifts: ArrayLike):
+        self.shifts: ndarray = np.asarray(shifts, dtype=float)
+        assert self.shifts.ndim == 1, "Expected a one dimensional array of shifts"
+
+    def __len__(self):
+        return len(self.shifts)
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        pass
+
+    @abstractmethod
+    def apply(self, base: BatchValuationContext, shifts: ndarray) -> BatchValuationContext:
+        """`base` with this axis' input shifted by `shifts`, one per scenario"""
+        pass
+
+
+class PriceShifts(ScenarioAxis):
+    """Additive shifts to a commodity price, in its price uom"""
+    def __init__(self, commodity: Commodity, shifts: ArrayLike):
+        super().__init__(shifts)
+        self.commodity: Commodity = checked_type(commodity, Commodity)
+
+    @property
+    def name(self) -> str:
+        return f"{self.commodity.name} price"
+
+    def apply(self, base: BatchValuationContext, shifts: ndarray) -> BatchValuationContext:
+        return base.with_prices(self.commodity, base.price(self.commodity) + shifts)
+
+
+class VolShifts(ScenarioAxis):
+    """Additive shifts to a commodity vol"""
+    def __init__(self, commodity: Commodity, shifts: ArrayLike):
+        super().__init__(shifts)
+        self.commodity: Commodity = checked_type(commodity, Commodity)
+
+    @property
+    def name(self) -> str:
+        return f"{self.commodity.name} vol"
+
+    def apply(self, base: BatchValuationContext, shifts: ndarray) -> BatchValuationContext:
+        return base.with_vols(self.commodity, base.vol(self.commodity) + shifts)
+
+
+class FxShifts(ScenarioAxis):
+    """Additive shifts to an FX rate, in the pair's uom"""
+    def __init__(self, pair: OrderedFxPair, shifts: ArrayLike):
+        super().__init__(shifts)
+        self.pair: OrderedFxPair = checked_type(pair, OrderedFxPair)
+
+    @property
+    def name(self) -> str:
+        return f"{self.pair} fx"
+
+    def apply(self, base: BatchValuationContext, shifts: ndarray) -> BatchValuationContext:
+        rates = base.fx_rate(self.pair) + shifts
+        if self.pair not in base.fx_rates and self.pair.inverse in base.fx_rates:
+            return base.with_fx_rates(self.pair.inverse, 1.0 / rates)
+        return base.with_fx_rates(self.pair, rates)
+
+
+class TimeShifts(ScenarioAxis):
+    """Shifts to the valuation time, i.e. future dates"""
+    @property
+    def name(self) -> str:
+        return "time"
+
+    def apply(self, base: BatchValuationContext, shifts: ndarray) -> BatchValuationContext:
+        return base.with_time(base.time + shifts)
+
+
+class ScenarioGrid:
+    """
+    A portfolio valued across every scenario of a RiskLadder at once. Results are
+    LabelledArrays with one dimension per axis - values and thetas in the valuation ccy,
+    deltas in the commodity's quantity uom and gammas per unit of its price.
+    """
+    def __init__(self, ladder: 'RiskLadder', trades: list[Tradeable], context: BatchValuationContext):
+        self.ladder: RiskLadder = ladder
+        self.trades: list[Tradeable] = trades
+        self.context: BatchValuationContext = context
+
+    def _labelled(self, flat_values: ndarray) -> LabelledArray:
+        return LabelledArray(
+            flat_values.reshape(self.ladder.shape),
+            [axis.name for axis in self.ladder.axes],
+            [axis.shifts for axis in self.ladder.axes]
+        )
+
+    def _total(self, risk) -> LabelledArray:
+        total = np.zeros(self.context.n_scenarios)
+        for trade in self.trades:
+            total += risk(trade)
+        return self._labelled(total)
+
+    @cached_property
+    def value(self) -> LabelledArray:
+        return self._total(lambda trade: trade.value(self.context))
+
+    def delta(self, commodity: Commodity) -> LabelledArray:
+        return self._total(lambda trade: trade.delta(self.context, commodity))
+
+    def gamma(self, commodity: Commodity) -> LabelledArray:
+        return self._total(lambda trade: trade.gamma(self.context, commodity))
+
+    @cached_property
+    def theta(self) -> LabelledArray:
+        return self._total(lambda trade: trade.theta(self.context))
+
+
+class RiskLadder:
+    """
+    The outer product of `axes` of shifts to prices, vols, FX rates and time. Every scenario
+    goes into one BatchValuationContext, in C order over the axes, so a portfolio is valued
+    across the whole grid with a single vectorised pricing call per trade.
+    """
+    def __init__(self, axes: list[ScenarioAxis]):
+        self.axes: list[ScenarioAxis] = checked_list_type(axes, ScenarioAxis)
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(len(axis) for axis in self.axes)
+
+    @property
+    def n_scenarios(self) -> int:
+        return int(np.prod(self.shape))
+
+    def context(self, vc: ValuationContext) -> BatchValuationContext:
+        batch = BatchValuationContext.from_context(vc, self.n_scenarios)
+        for i_axis, axis in enumerate(self.axes):
+            axis_shape = [1] * len(self.axes)
+            axis_shape[i_axis] = len(axis)
+            shifts = np.broadcast_to(axis.shifts.reshape(axis_shape), self.shape).ravel()
+            batch = axis.apply(batch, shifts)
+        return batch
+
+    def evaluate(self, trades: list[Tradeable], vc: ValuationContext) -> ScenarioGrid:
+        return ScenarioGrid(self, trades, self.context(vc))
@@ -1,18 +1,53 @@
 from abc import abstractmethod, ABC
 from numbers import Number
-from typing import Optional
+from typing import Optional, Hashable, Union
 
+import numpy as np
 from tp_quantity.quantity import Qty
 from tp_quantity.uom import SCALAR
 from tp_utils.type_utils import checked_type
 
-from put_call_parity.models import OptionRight, BlackScholes
+from put_call_parity.models import OptionRight, BlackScholes, BlackScholesGreeks, VectorBlackScholes
 from put_call_parity.ref_data.commodity import Commodity
-from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.ref_data.currency import Currency
+from put_call_parity.valuation_context.batch_valuation_context import BatchValuationContext
 from put_call_parity.valuation_context.valuation_context import ValuationContext
 
 
+class TradeRisk:
+    """
+    A trade's value, delta and gamma on one commodity, and theta, against one context - Qtys
+    for a ValuationContext, ndarrays per scenario for a BatchValuationContext
+    """
+    __slots__ = ("value", "delta", "gamma", "theta")
+
+    def __init__(self, value, delta, gamma, theta):
+        self.value = value
+        self.delta = delta
+        self.gamma = gamma
+        self.theta = theta
+
+    @staticmethod
+    def sum(risks: list['TradeRisk']) -> 'TradeRisk':
+        """Total of risks against the same ValuationContext and commodity"""
+        return TradeRisk(
+            Qty.sum([r.value for r in risks]),
+            Qty.sum([r.delta for r in risks]),
+            Qty.sum([r.gamma for r in risks]),
+            Qty.sum([r.theta for r in risks]),
+        )
+
+
 class Tradeable(ABC):
+    """
+    Valued against either a ValuationContext, returning Qtys, or a BatchValuationContext,
+    returning an ndarray per scenario - values and thetas in the valuation ccy, deltas in
+    the commodity's quantity uom and gammas per unit of its price.
+
+    Slotted, as replication and numeric risk create them in large numbers.
+    """
+    __slots__ = ()
+
     @abstractmethod
     def value(self, vc: ValuationContext):
         pass
@@ -29,6 +64,10 @@ class Tradeable(ABC):
     def theta(self, vc: ValuationContext):
         pass
 
+    def risk(self, vc: ValuationContext, commodity: Commodity) -> TradeRisk:
+        """Every analytic risk at once, for risk reports. Models override this to price just once"""
+        return TradeRisk(self.value(vc), self.delta(vc, commodity), self.gamma(vc, commodity), self.theta(vc))
+
     def numeric_delta(self, vc: ValuationContext, commodity: Commodity, dP: Optional[Qty] = None) -> Qty:
         dP = commodity.default_dP if dP is None else dP
         up_vc = vc.shift_price(commodity, dP)
@@ -66,8 +105,16 @@ class Tradeable(ABC):
     def is_nettable(self, other: 'Tradeable'):
         pass
 
+    @property
+    @abstractmethod
+    def netting_key(self) -> Hashable:
+        """Equal for exactly those trades that are nettable with this one"""
+        pass
+
 
 class Cash(Tradeable):
+    __slots__ = ("amount",)
+
     def __init__(self, amount: Qty):
         self.amount: Qty = checked_type(amount, Qty)
 
@@ -75,16 +122,24 @@ class Cash(Tradeable):
         return f"Cash: {self.amount}"
 
     def value(self, vc: ValuationContext):
-        fx_rate = vc.fx_rate(OrderedFxPair(self.amount.uom, vc.valuation_ccy))
+        fx_rate = vc.conversion_rate(self.amount.uom, vc.valuation_ccy)
+        if isinstance(vc, BatchValuationContext):
+            return fx_rate * self.amount.value
         return self.amount * fx_rate
 
     def delta(self, vc: ValuationContext, commodity: Commodity):
+        if isinstance(vc, BatchValuationContext):
+            return np.zeros(vc.n_scenarios)
         return Qty(0, vc.valuation_ccy / commodity.price_uom)
 
     def gamma(self, vc: ValuationContext, commodity: Commodity):
+        if isinstance(vc, BatchValuationContext):
+            return np.zeros(vc.n_scenarios)
         return Qty(0, vc.valuation_ccy / commodity.price_uom / commodity.price_uom)
 
     def theta(self, vc: ValuationContext):
+        if isinstance(vc, BatchValuationContext):
+            return np.zeros(vc.n_scenarios)
         return Qty(0, vc.valuation_ccy)
 
     def __add__(self, other):
@@ -94,8 +149,14 @@ class Cash(Tradeable):
     def is_nettable(self, other: Tradeable):
         return isinstance(other, Cash) and other.amount.uom == self.amount.uom
 
+    @property
+    def netting_key(self) -> Currency:
+        return Currency(self.amount.uom)
+
 
 class CommodityTrade(Tradeable):
+    __slots__ = ("commodity", "amount")
+
     def __init__(self, commodity: Commodity, amount: Qty):
         self.commodity: Commodity = commodity
         self.amount: Qty = checked_type(amount, Qty)
@@ -109,9 +170,12 @@ class CommodityTrade(Tradeable):
         return f"Commodity {self.name}: {self.amount}"
 
     def value(self, vc: ValuationContext):
+        if isinstance(vc, BatchValuationContext):
+            fx_rate = vc.conversion_rate(self.commodity.ccy, vc.valuation_ccy)
+            return vc.price(self.commodity) * fx_rate * self.amount.value
         price = vc.price(self.commodity)
         from_ccy = price.uom.numerator
-        fx_rate = vc.fx_rate(OrderedFxPair(from_ccy, vc.valuation_ccy))
+        fx_rate = vc.conversion_rate(from_ccy, vc.valuation_ccy)
         return self.amount * price * fx_rate
 
     def __add__(self, other):
@@ -121,18 +185,32 @@ class CommodityTrade(Tradeable):
     def is_nettable(self, other: Tradeable):
         return isinstance(other, CommodityTrade) and other.commodity == self.commodity
 
+    @property
+    def netting_key(self) -> Commodity:
+        return self.commodity
+
     def delta(self, vc: ValuationContext, commodity: Commodity):
+        if isinstance(vc, BatchValuationContext):
+            if commodity != self.commodity:
+                return np.zeros(vc.n_scenarios)
+            return np.full(vc.n_scenarios, self.amount.checked_value(commodity.quantity_uom))
         if commodity != self.commodity:
             return Qty(0, commodity.quantity_uom)
         return self.amount
 
     def gamma(self, vc: ValuationContext, commodity: Commodity):
+        if isinstance(vc, BatchValuationContext):
+            return np.zeros(vc.n_scenarios)
         return Qty(0, vc.valuation_ccy / commodity.price_uom / commodity.price_uom)
 
     def theta(self, vc: ValuationContext):
+        if isinstance(vc, BatchValuationContext):
+            return np.zeros(vc.n_scenarios)
         return Qty(0, vc.valuation_ccy)
 
 class OptionTrade(Tradeable):
+    __slots__ = ("commodity", "amount", "right", "strike", "expiry_time")
+
     def __init__(self, commodity: Commodity, amount: Qty, right: OptionRight, strike: Qty, expiry_time: Number):
         self.commodity: Commodity = checked_type(commodity, Commodity)
         self.amount: Qty = checked_type(amount, Qty)
@@ -145,8 +223,12 @@ class OptionTrade(Tradeable):
         return OptionTrade(self.commodity, self.amount + other.amount, self.right, self.strike, self.expiry_time)
 
     def is_nettable(self, other: Tradeable):
-        return isinstance(other, OptionTrade) and other.commodity == self.commodity and self.right == other.right and \
-            self.strike == other.strike and self.expiry_time == other.expiry_time
+        return isinstance(other, OptionTrade) and other.netting_key == self.netting_key
+
+    @property
+    def netting_key(self) -> tuple:
+        # The strike as a value in the commodity's price uom, as it's priced
+        return self.commodity, self.right, self.strike.checked_value(self.commodity.price_uom), self.expiry_time
 
     def _black_scholes(self, vc: ValuationContext) -> BlackScholes:
         F = vc.price(self.commodity).checked_value(self.commodity.price_uom)
@@ -155,26 +237,78 @@ class OptionTrade(Tradeable):
         T = self.expiry_time - vc.time
         return BlackScholes(self.right, F, K, vol, T)
 
+    def _vector_black_scholes(self, vc: BatchValuationContext) -> VectorBlackScholes:
+        F = vc.price(self.commodity)
+        K = self.strike.checked_value(self.commodity.price_uom)
+        vol = vc.vol(self.commodity)
+        T = self.expiry_time - vc.time
+        return VectorBlackScholes(self.right, F, K, vol, T)
+
+    def _model(self, vc: ValuationContext) -> Union[BlackScholes, VectorBlackScholes]:
+        """The pricer for `vc`, from which each risk computes only what it needs"""
+        if isinstance(vc, BatchValuationContext):
+            return self._vector_black_scholes(vc)
+        return self._black_scholes(vc)
+
+    def greeks(self, vc: ValuationContext) -> BlackScholesGreeks:
+        return self._model(vc).greeks
+
+    def risk(self, vc: ValuationContext, commodity: Commodity) -> TradeRisk:
+        """All four risks from a single Black-Scholes evaluation"""
+        greeks = self.greeks(vc)
+        return TradeRisk(
+            self._value(vc, greeks.value),
+            self._delta(vc, commodity, greeks.delta),
+            self._gamma(vc, commodity, greeks.gamma),
+            self._theta(vc, greeks.theta),
+        )
+
     def value(self, vc: ValuationContext):
-        bs = self._black_scholes(vc)
-        option_price = Qty(bs.value, self.commodity.price_uom)
-        return option_price * self.amount
+        return self._value(vc, self._model(vc).value)
 
     def delta(self, vc: ValuationContext, commodity: Commodity):
+        if commodity != self.commodity:
+            return self._delta(vc, commodity, None)
+        return self._delta(vc, commodity, self._model(vc).delta)
+
+    def gamma(self, vc: ValuationContext, commodity: Commodity):
+        if commodity != self.commodity:
+            return self._gamma(vc, commodity, None)
+        return self._gamma(vc, commodity, self._model(vc).gamma)
+
+    def theta(self, vc: ValuationContext):
+        return self._theta(vc, self._model(vc).theta)
+
+    # Risks from per unit greeks, shared by `risk` and the single risks above. The greek is
+    # ignored, and may be None, for commodities other than this option's
+
+    def _value(self, vc: ValuationContext, price):
+        fx_rate = vc.conversion_rate(self.commodity.ccy, vc.valuation_ccy)
+        if isinstance(vc, BatchValuationContext):
+            return price * fx_rate * self.amount.checked_value(self.commodity.quantity_uom)
+        option_price = Qty(price, self.commodity.price_uom)
+        return option_price * self.amount * fx_rate
+
+    def _delta(self, vc: ValuationContext, commodity: Commodity, price_delta):
+        if isinstance(vc, BatchValuationContext):
+            if commodity != self.commodity:
+                return np.zeros(vc.n_scenarios)
+            return price_delta * self.amount.checked_value(commodity.quantity_uom)
         if commodity != self.commodity:
             return Qty(0, vc.valuation_ccy / commodity.price_uom)
-        bs = self._black_scholes(vc)
-        price_delta = bs.delta
         return self.amount * price_delta
 
-    def gamma(self, vc: ValuationContext, commodity: Commodity):
+    def _gamma(self, vc: ValuationContext, commodity: Commodity, price_gamma):
+        if isinstance(vc, BatchValuationContext):
+            if commodity != self.commodity:
+                return np.zeros(vc.n_scenarios)
+            return price_gamma * self.amount.checked_value(commodity.quantity_uom)
         if commodity != self.commodity:
             return Qty(0, vc.valuation_ccy / commodity.price_uom / commodity.price_uom)
-        bs = self._black_scholes(vc)
-        price_gamma = bs.gamma
         return Qty(price_gamma, commodity.price_uom.inverse) * self.amount
 
-    def theta(self, vc: ValuationContext):
-        bs = self._black_scholes(vc)
-        price_theta = bs.theta
-        return Qty(price_theta, self.commodity.price_uom) * self.amount
+    def _theta(self, vc: ValuationContext, price_theta):
+        fx_rate = vc.conversion_rate(self.commodity.ccy, vc.valuation_ccy)
+        if isinstance(vc, BatchValuationContext):
+            return price_theta * fx_rate * self.amount.checked_value(self.commodity.quantity_uom)
+        return Qty(price_theta, self.commodity.price_uom) * self.amount * fx_rate
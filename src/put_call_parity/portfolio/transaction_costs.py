@@ -0,0 +1,62 @@
+from abc import ABC, abstractmethod
+from numbers import Number
+from typing import Optional
+
+import numpy as np
+from numpy import ndarray
+from tp_utils.type_utils import checked_type, checked_optional_type
+
+
+class ImpactModel(ABC):
+    @abstractmethod
+    def costs(self, prices: ndarray, abs_quantities: ndarray) -> ndarray:
+        """Market impact cost of trading `abs_quantities` units at `prices`, elementwise"""
+        raise ValueError("implement 'costs'")
+
+
+class LinearImpact(ImpactModel):
+    """Price moves against the trade by `coefficient` x price per unit traded"""
+    def __init__(self, coefficient: float):
+        self.coefficient: float = checked_type(coefficient, Number)
+
+    def costs(self, prices: ndarray, abs_quantities: ndarray) -> ndarray:
+        return self.coefficient * prices * abs_quantities * abs_quantities
+
+
+class SquareRootImpact(ImpactModel):
+    """Price moves against the trade by `coefficient` x price x sqrt(units traded)"""
+    def __init__(self, coefficient: float):
+        self.coefficient: float = checked_type(coefficient, Number)
+
+    def costs(self, prices: ndarray, abs_quantities: ndarray) -> ndarray:
+        return self.coefficient * prices * abs_quantities * np.sqrt(abs_quantities)
+
+
+class TransactionCostModel:
+    """
+    The cost of trading, relative to the mid price, of a trade of q units at price S:
+        proportional_rate |q| S + fixed_cost [q != 0] + spread / 2 |q| S + impact(|q|)
+    where `spread` is the bid/ask spread as a fraction of mid.
+    """
+    def __init__(self, proportional_rate: float = 0.0, fixed_cost: float = 0.0, spread: float = 0.0,
+                 impact: Optional[ImpactModel] = None):
+        self.proportional_rate: float = checked_type(proportional_rate, Number)
+        self.fixed_cost: float = checked_type(fixed_cost, Number)
+        self.spread: float = checked_type(spread, Number)
+        self.impact: Optional[ImpactModel] = checked_optional_type(impact, ImpactModel)
+        assert proportional_rate >= 0 and fixed_cost >= 0 and spread >= 0, "Costs must be non-negative"
+
+    def costs(self, prices: ndarray, quantities: ndarray) -> ndarray:
+        """Cost of trading signed `quantities` at mid `prices`, elementwise"""
+        abs_quantities = np.abs(quantities)
+        result = abs_quantities * prices
+        result *= self.proportional_rate + 0.5 * self.spread
+        if self.fixed_cost:
+            result += np.where(abs_quantities > 0, self.fixed_cost, 0.0)
+        if self.impact is not None:
+            result += self.impact.costs(prices, abs_quantities)
+        return result
+
+    def total_costs(self, prices: ndarray, quantities: ndarray) -> ndarray:
+        """Costs of (time, path) shaped trades, summed over time"""
+        return self.costs(prices, quantities).sum(axis=0)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+import numpy as np
+from numpy import ndarray
+from tp_utils.type_utils import checked_type
+
+
+def nearest_correlation_matrix(rho: ndarray, tolerance: float = 1e-10, max_iterations: int = 200) -> ndarray:
+    """
+    The nearest (Frobenius norm) positive semi-definite matrix with unit diagonal, by
+    Higham's alternating projections with Dykstra's correction.
+    """
+    Y = (rho + rho.T) / 2
+    dykstra_correction = np.zeros_like(Y)
+    for _ in range(max_iterations):
+        R = Y - dykstra_correction
+        eigenvalues, eigenvectors = np.linalg.eigh(R)
+        X = (eigenvectors * np.maximum(eigenvalues, 0.0)) @ eigenvectors.T
+        dykstra_correction = X - R
+        previous_Y = Y
+        Y = X.copy()
+        np.fill_diagonal(Y, 1.0)
+        if np.linalg.norm(Y - previous_Y) < tolerance * np.linalg.norm(Y):
+            break
+    return Y
+
+
+def left_correlating_matrix(rho: ndarray) -> ndarray:
+    """
+    A matrix L with L L^T = rho. Cholesky when rho is positive definite, otherwise a clipped
+    eigen decomposition - after first repairing rho if it isn't a valid correlation matrix.
+    """
+    try:
+        return np.linalg.cholesky(rho)
+    except np.linalg.LinAlgError:
+        pass
+    eigenvalues, eigenvectors = np.linalg.eigh(rho)
+    if eigenvalues.min() < -1e-10:
+        eigenvalues, eigenvectors = np.linalg.eigh(nearest_correlation_matrix(rho))
+    return eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))
+
+
+class CorrelationFactorisationCache:
+    """
+    Left correlating matrices keyed by the contents of the correlation matrix, with least
+    recently used eviction. Cached matrices are read-only as they are shared.
+    """
+    def __init__(self, max_size: int = 1024):
+        self.max_size: int = checked_type(max_size, int)
+        self._cache: OrderedDict[tuple, ndarray] = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def left_correlating_matrix(self, rho: ndarray) -> ndarray:
+        rho = np.ascontiguousarray(rho, dtype=float)
+        assert rho.ndim == 2 and rho.shape[0] == rho.shape[1], f"Expected square rho matrix, got {rho.shape}"
+        key = (rho.shape, rho.tobytes())
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        matrix = left_correlating_matrix(rho)
+        matrix.flags.writeable = False
+        self._cache[key] = matrix
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return matrix
+
+    def clear(self):
+        self._cache.clear()
+
+
+# Shared by all path builders
+CORRELATION_FACTORISATIONS = CorrelationFactorisationCache()
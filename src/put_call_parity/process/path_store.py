@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+from numpy import ndarray
+from numpy.lib.format import open_memmap
+from numpy.typing import DTypeLike
+from tp_maths.vector_path.vector_path import VectorPath
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+
+from put_call_parity.process.vector_path_builder import PathBlock, VectorPathBuilder, LognormalPathsBuilder
+from put_call_parity.utils import checked_path
+
+
+def _jsonable(thing):
+    if isinstance(thing, dict):
+        return {str(k): _jsonable(v) for k, v in thing.items()}
+    if isinstance(thing, (list, tuple)):
+        return [_jsonable(x) for x in thing]
+    if isinstance(thing, (ndarray, np.generic)):
+        return thing.tolist()
+    return thing
+
+
+class PathStore:
+    """
+    A (factor x time x path) cube of path values on disk, as a .npy file that is reopened
+    memory-mapped, with its times and a JSON metadata file describing how it was generated.
+    Many processes can open the same store read-only without copying it into memory.
+    """
+    PATHS_FILE = "paths.npy"
+    TIMES_FILE = "times.npy"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, directory: Union[Path, str]):
+        self.directory: Path = checked_path(directory)
+
+    @property
+    def metadata(self) -> dict:
+        with open(self.directory / self.METADATA_FILE, "rt") as f:
+            return json.load(f)
+
+    @property
+    def times(self) -> ndarray:
+        return np.load(self.directory / self.TIMES_FILE)
+
+    def open(self, writeable: bool = False) -> VectorPath:
+        path = np.load(self.directory / self.PATHS_FILE, mmap_mode="r+" if writeable else "r")
+        return VectorPath(self.times, path)
+
+    @staticmethod
+    def _create(directory: Union[Path, str], times: ndarray, shape: tuple, dtype: DTypeLike,
+                metadata: Optional[dict]) -> ndarray:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / PathStore.TIMES_FILE, times)
+        with open(directory / PathStore.METADATA_FILE, "wt") as f:
+            json.dump(_jsonable(metadata or {}), f, indent=2)
+        return open_memmap(directory / PathStore.PATHS_FILE, mode="w+", dtype=dtype, shape=shape)
+
+    @staticmethod
+    def write(directory: Union[Path, str], vector_path: VectorPath, metadata: Optional[dict] = None) -> 'PathStore':
+        stored = PathStore._create(directory, vector_path.times, vector_path.path.shape, vector_path.path.dtype,
+                                   metadata)
+        stored[...] = vector_path.path
+        stored.flush()
+        return PathStore(directory)
+
+    @staticmethod
+    def write_blocks(directory: Union[Path, str], times: ndarray, n_factors: int, n_paths: int,
+                     blocks: Iterable[PathBlock], metadata: Optional[dict] = None,
+                     dtype: DTypeLike = np.float64) -> 'PathStore':
+        """Writes blocks, e.g. from VectorPathBuilder.build_blocks, as they are generated"""
+        stored = PathStore._create(directory, times, (n_factors, len(times), n_paths), dtype, metadata)
+        i_time = 0
+        for block_times, block in blocks:
+            stored[:, i_time:i_time + len(block_times), :] = block
+            i_time += len(block_times)
+        assert i_time == len(times), f"Expected {len(times)} times, got {i_time}"
+        stored.flush()
+        return PathStore(directory)
+
+    @staticmethod
+    def write_from_builder(directory: Union[Path, str], bldr: VectorPathBuilder, seed: int, n_paths: int,
+                           steps_per_block: int = 1, metadata: Optional[dict] = None,
+                           dtype: DTypeLike = np.float64) -> 'PathStore':
+        """
+        Generates and writes paths from `bldr`, one block at a time. The seed and, for lognormal
+        builders, the prices, vols, drifts and correlations are recorded in the metadata.
+        """
+        full_metadata = {"seed": seed, "n_paths": n_paths, "builder": type(bldr).__name__}
+        if isinstance(bldr, LognormalPathsBuilder):
+            full_metadata.update(
+                prices=bldr.prices,
+                vols=bldr.vols,
+                drifts=bldr.drifts,
+                rho_matrix=bldr.rho_matrix,
+            )
+        full_metadata.update(metadata or {})
+        blocks = bldr.build_blocks(RandomNumberGenerator(seed=seed), n_paths, steps_per_block)
+        return PathStore.write_blocks(directory, bldr.times, bldr.n_factors, n_paths, blocks, full_metadata, dtype)
@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+from numpy import ndarray
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_utils.type_utils import checked_type
+
+# A simulation, called as simulation(rng, n_paths=n), returning an array whose last axis is the path axis.
+# It must draw only its paths from rng, with any random model parameters fixed beforehand, or each shard
+# would simulate a different model - e.g. OptionWithFXReplication(...).path_simulation(master_rng, 100)
+Simulation = Callable[..., ndarray]
+
+
+class ShardStatistics:
+    """Running count, mean and sum of squared deviations, mergeable across shards"""
+    def __init__(self, n: int, mean: ndarray, m2: ndarray):
+        self.n: int = n
+        self.mean: ndarray = mean
+        self.m2: ndarray = m2
+
+    @staticmethod
+    def of(samples: ndarray) -> 'ShardStatistics':
+        mean = samples.mean(axis=-1)
+        deviations = samples - mean[..., np.newaxis]
+        return ShardStatistics(samples.shape[-1], mean, np.einsum("...p,...p->...", deviations, deviations))
+
+    def merge(self, other: 'ShardStatistics') -> 'ShardStatistics':
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.n / n
+        m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / n
+        return ShardStatistics(n, mean, m2)
+
+    @property
+    def std(self) -> ndarray:
+        return np.sqrt(self.m2 / self.n)
+
+    @property
+    def std_err(self) -> ndarray:
+        return self.std / np.sqrt(self.n)
+
+
+def _run_shard(simulation: Simulation, seed: int, n_paths: int) -> ndarray:
+    return simulation(RandomNumberGenerator(seed=seed), n_paths=n_paths)
+
+
+def _run_shard_statistics(simulation: Simulation, seed: int, n_paths: int) -> ShardStatistics:
+    return ShardStatistics.of(_run_shard(simulation, seed, n_paths))
+
+
+class ShardedMonteCarloRunner:
+    """
+    Splits a simulation of n_paths into shards of at most `paths_per_shard` paths and runs
+    them on a process pool. Each shard has its own rng, seeded from a stream spawned from
+    `seed`, and results are merged in shard order - so the output depends only on `seed`,
+    `paths_per_shard` and n_paths, never on the number of workers. Shards are merged as
+    draws from one distribution, so the simulation must take only its paths from each
+    shard's rng - see `Simulation`.
+    """
+    def __init__(self, seed: int, paths_per_shard: int = 10_000, max_workers: Optional[int] = None):
+        self.seed: int = checked_type(seed, int)
+        self.paths_per_shard: int = checked_type(paths_per_shard, int)
+        self.max_workers: Optional[int] = max_workers
+        assert paths_per_shard > 0, "paths_per_shard must be positive"
+
+    def shard_sizes(self, n_paths: int) -> list[int]:
+        n_full_shards, remainder = divmod(n_paths, self.paths_per_shard)
+        return [self.paths_per_shard] * n_full_shards + ([remainder] if remainder else [])
+
+    def shard_seeds(self, n_shards: int) -> list[int]:
+        return [
+            int(child.generate_state(1)[0])
+            for child in np.random.SeedSequence(self.seed).spawn(n_shards)
+        ]
+
+    def _map(self, shard_function, simulation: Simulation, n_paths: int) -> list:
+        sizes = self.shard_sizes(n_paths)
+        seeds = self.shard_seeds(len(sizes))
+        simulations = [simulation] * len(sizes)
+        if self.max_workers == 1:
+            return list(map(shard_function, simulations, seeds, sizes))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(shard_function, simulations, seeds, sizes))
+
+    def run(self, simulation: Simulation, n_paths: int) -> ndarray:
+        """Every path's result, concatenated along the last axis"""
+        return np.concatenate(self._map(_run_shard, simulation, n_paths), axis=-1)
+
+    def run_statistics(self, simulation: Simulation, n_paths: int) -> ShardStatistics:
+        """
+        Mean and standard error across all paths. Only per shard statistics are returned
+        from the workers, so the full set of paths is never held in one process.
+        """
+        shard_statistics = self._map(_run_shard_statistics, simulation, n_paths)
+        result = shard_statistics[0]
+        for statistics in shard_statistics[1:]:
+            result = result.merge(statistics)
+        return result
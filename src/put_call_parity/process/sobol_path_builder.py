@@ -0,0 +1,89 @@
+from collections import deque
+
+import numpy as np
+from numpy import ndarray
+from numpy.typing import DTypeLike
+from scipy.special import ndtri
+from scipy.stats import qmc
+from tp_maths.vector_path.vector_path import VectorPath
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_utils.type_utils import checked_type
+
+from put_call_parity.process.vector_path_builder import VectorPathBuilder
+
+BROWNIAN_BRIDGE = "brownian_bridge"
+PCA = "pca"
+
+
+def brownian_bridge_schedule(times: ndarray) -> list[tuple[int, int, int, float, float, float]]:
+    """
+    The order in which a Brownian bridge fills in `times`, coarsest first - the terminal
+    value, then successive midpoints. Each entry is (index, left, right, left_weight,
+    right_weight, std_dev); a left of -1 denotes the origin, where W(0) = 0.
+    """
+    n_times = len(times)
+    schedule = [(n_times - 1, -1, -1, 0.0, 0.0, np.sqrt(times[-1]))]
+    intervals = deque([(-1, n_times - 1)])
+    while intervals:
+        left, right = intervals.popleft()
+        if right - left < 2:
+            continue
+        mid = (left + right) // 2
+        t_left = 0.0 if left < 0 else times[left]
+        t_mid, t_right = times[mid], times[right]
+        width = t_right - t_left
+        schedule.append((
+            mid, left, right,
+            (t_right - t_mid) / width,
+            (t_mid - t_left) / width,
+            np.sqrt((t_mid - t_left) * (t_right - t_mid) / width)
+        ))
+        intervals.append((left, mid))
+        intervals.append((mid, right))
+    return schedule
+
+
+class SobolBrownianPathBuilder(VectorPathBuilder):
+    """
+    Uncorrelated Brownian paths driven by scrambled Sobol points, one Sobol dimension per
+    (factor, time). Dimensions are allocated so the first few - where Sobol sequences are
+    most uniform - drive the largest scale features of the paths, either by Brownian bridge
+    construction (terminal values, then midpoints) or by principal components of the
+    Brownian covariance across `times`.
+    """
+    def __init__(self, times: ndarray, n_factors: int, construction: str = BROWNIAN_BRIDGE, scramble: bool = True):
+        super().__init__(times, n_factors)
+        assert construction in [BROWNIAN_BRIDGE, PCA], f"Unexpected construction {construction}"
+        assert np.all(np.diff(times) > 0) and times[0] >= 0, "Expected increasing, non-negative times"
+        self.construction: str = checked_type(construction, str)
+        self.scramble: bool = checked_type(scramble, bool)
+        if construction == BROWNIAN_BRIDGE:
+            self.bridge_schedule = brownian_bridge_schedule(times)
+        else:
+            covariance = np.minimum.outer(times, times)
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+            order = np.argsort(eigenvalues)[::-1]
+            self.pca_matrix: ndarray = eigenvectors[:, order] * np.sqrt(np.maximum(eigenvalues[order], 0.0))
+
+    def _normals(self, rng: RandomNumberGenerator, n_paths: int) -> ndarray:
+        """Sobol normals of shape (factor, dimension, path), dimension ordered by importance"""
+        sobol = qmc.Sobol(d=self.n_factors * self.n_times, scramble=self.scramble, seed=rng.randint(2 ** 31 - 1))
+        uniforms = sobol.random(n_paths)
+        # Unscrambled sequences start at exactly 0, whose inverse normal is infinite
+        np.clip(uniforms, 1e-12, 1 - 1e-12, out=uniforms)
+        normals = ndtri(uniforms)
+        return normals.reshape(n_paths, self.n_times, self.n_factors).transpose(2, 1, 0)
+
+    def build(self, rng: RandomNumberGenerator, n_paths: int, dtype: DTypeLike = np.float64):
+        normals = self._normals(rng, n_paths)
+        if self.construction == PCA:
+            Z = np.einsum("tk,fkp->ftp", self.pca_matrix, normals)
+        else:
+            Z = np.empty((self.n_factors, self.n_times, n_paths))
+            for i_dimension, (index, left, right, left_weight, right_weight, std_dev) in enumerate(self.bridge_schedule):
+                Z[:, index, :] = normals[:, i_dimension, :] * std_dev
+                if right >= 0:
+                    Z[:, index, :] += Z[:, right, :] * right_weight
+                if left >= 0:
+                    Z[:, index, :] += Z[:, left, :] * left_weight
+        return VectorPath(self.times, Z.astype(dtype, copy=False))
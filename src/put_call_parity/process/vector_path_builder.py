@@ -1,14 +1,55 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
 
 import numpy as np
 from numpy import ndarray
-from numpy.linalg import svd
+from numpy.typing import DTypeLike
 from tp_maths.vector_path.vector_path import VectorPath
 from tp_random_tests.random_number_generator import RandomNumberGenerator
-from tp_utils.type_utils import checked_type
+from tp_utils.type_utils import checked_type, checked_optional_type
+
+from put_call_parity.process.correlation import CORRELATION_FACTORISATIONS
 
 # from put_call_parity.process.vector_path import VectorPath
 
+# A block of consecutive observation times, shape (time,), and the path values at them, shape (factor, time, path)
+PathBlock = tuple[ndarray, ndarray]
+
+
+def antithetic_normals(rng: RandomNumberGenerator, n_factors: int, n_times: int, n_paths: int,
+                       dtype: DTypeLike = np.float64) -> ndarray:
+    """
+    Standard normals of shape (factor, time, path), drawn in one call. The second half of the
+    paths are the negation of the first; when n_paths is odd the final path is an unpaired draw.
+    """
+    half_paths = n_paths // 2
+    result = np.empty((n_factors, n_times, n_paths), dtype=dtype)
+    result[:, :, :half_paths] = rng.normal(size=(n_factors, n_times, half_paths))
+    np.negative(result[:, :, :half_paths], out=result[:, :, half_paths:2 * half_paths])
+    if n_paths % 2 == 1:
+        result[:, :, -1] = rng.normal(size=(n_factors, n_times))
+    return result
+
+
+# Bound on the (factor x time x path) temporary used when correlating paths in place
+MAX_CORRELATION_CHUNK_ELEMENTS = 1_000_000
+
+
+def correlate_in_place(matrix: ndarray, Z: ndarray):
+    """
+    Z[k, t, p] <- sum_f matrix[k, f] Z[f, t, p], a few paths at a time so that the only
+    temporary is a bounded chunk of Z.
+    """
+    n_factors, n_times, n_paths = Z.shape
+    if n_factors == 1:
+        Z *= matrix[0, 0]
+        return
+    paths_per_chunk = max(1, MAX_CORRELATION_CHUNK_ELEMENTS // (n_factors * n_times))
+    matrix = matrix.astype(Z.dtype, copy=False)
+    for i_start in range(0, n_paths, paths_per_chunk):
+        chunk = Z[:, :, i_start:i_start + paths_per_chunk]
+        chunk[...] = np.einsum('kf,ftp->ktp', matrix, chunk)
+
 
 class VectorPathBuilder(ABC):
     def __init__(self, times: ndarray, n_factors: int):
@@ -23,43 +64,63 @@ class VectorPathBuilder(ABC):
     def build(self, rng: RandomNumberGenerator, n_paths: int):
         raise ValueError("implement 'build'")
 
+    def build_blocks(self, rng: RandomNumberGenerator, n_paths: int, steps_per_block: int = 1) -> Iterator[PathBlock]:
+        """
+        Paths distributed as those of `build`, yielded `steps_per_block` observation times at a
+        time. This default slices a single `build`, so gives its paths exactly. Subclasses
+        override it to generate each block on demand, so that only one block and the current
+        state are ever held in memory - their random draws are then made block by block, so
+        the paths differ from `build`'s for the same rng.
+        """
+        path = self.build(rng, n_paths).path
+        for i_start in range(0, self.n_times, steps_per_block):
+            i_end = i_start + steps_per_block
+            yield self.times[i_start:i_end], path[:, i_start:i_end, :]
+
 
 class BrownianPathBuilder(VectorPathBuilder):
     def __init__(self, times: ndarray, n_factors: int):
         super().__init__(times, n_factors)
 
-    def build(self, rng: RandomNumberGenerator, n_paths: int):
-        def antithetics():
-            half_paths = int(np.floor(n_paths / 2))
-            part1 = rng.normal(size=(self.n_factors, half_paths))
-            part2 = part1 * -1
-            result = np.concat([part1, part2], axis=1)
-            return result
-
-        num_times = len(self.times)
-        time_steps = [self.times[0]] + [self.times[i + 1] - self.times[i] for i in range(num_times - 1)]
-
-        dZ = np.stack(
-            [antithetics() * np.sqrt(dt) for dt in time_steps],
-            axis=1
-        )
-        Z = np.zeros(shape=(self.n_factors, num_times, n_paths))
-        Z[:, 0, :] = dZ[:, 0, :]
-        for i_t in range(1, num_times):
-            Z[:, i_t, :] = Z[:, i_t - 1, :] + dZ[:, i_t, :]
+    def build(self, rng: RandomNumberGenerator, n_paths: int, dtype: DTypeLike = np.float64):
+        time_steps = np.diff(self.times, prepend=0.0)
+        Z = antithetic_normals(rng, self.n_factors, self.n_times, n_paths, dtype)
+        Z *= np.sqrt(time_steps).astype(dtype)[np.newaxis, :, np.newaxis]
+        np.cumsum(Z, axis=1, out=Z)
         return VectorPath(self.times, Z)
 
+    def build_blocks(self, rng: RandomNumberGenerator, n_paths: int, steps_per_block: int = 1,
+                     dtype: DTypeLike = np.float64) -> Iterator[PathBlock]:
+        Z = np.zeros(shape=(self.n_factors, n_paths), dtype=dtype)
+        previous_time = 0.0
+        for i_start in range(0, self.n_times, steps_per_block):
+            times = self.times[i_start:i_start + steps_per_block]
+            time_steps = np.diff(times, prepend=previous_time)
+            block = antithetic_normals(rng, self.n_factors, len(times), n_paths, dtype)
+            block *= np.sqrt(time_steps).astype(dtype)[np.newaxis, :, np.newaxis]
+            np.cumsum(block, axis=1, out=block)
+            block += Z[:, np.newaxis, :]
+            # A copy, as consumers may transform the yielded block in place
+            Z = block[:, -1, :].copy()
+            previous_time = times[-1]
+            yield times, block
+
 class CorrelatedNormalPathsBuilder(VectorPathBuilder):
-    def __init__(self, times: ndarray, rho_matrix: ndarray):
+    def __init__(self, times: ndarray, rho_matrix: ndarray, brownian_bldr: Optional[VectorPathBuilder] = None):
+        """
+        `brownian_bldr` supplies the uncorrelated Brownians, e.g. a SobolBrownianPathBuilder.
+        Defaults to pseudo-random antithetic paths.
+        """
         super().__init__(times, n_factors=rho_matrix.shape[0])
-        self.brownian_bldr = BrownianPathBuilder(times, self.n_factors)
+        self.brownian_bldr: VectorPathBuilder = checked_optional_type(brownian_bldr, VectorPathBuilder) or \
+            BrownianPathBuilder(times, self.n_factors)
+        assert self.brownian_bldr.n_factors == self.n_factors, "Brownian builder has the wrong number of factors"
 
         self.rho_matrix: ndarray = checked_type(rho_matrix, ndarray)
         assert self.rho_matrix.ndim == 2, "Expected square rho matrix"
         assert self.rho_matrix.shape == (self.n_factors, self.n_factors), "Expected square rho matrix"
 
-        U, S, _ = svd(self.rho_matrix)
-        self.left_correlating_matrix: ndarray = np.matmul(U, np.diag(np.sqrt(S)))
+        self.left_correlating_matrix: ndarray = CORRELATION_FACTORISATIONS.left_correlating_matrix(self.rho_matrix)
 
 
     def build(self, rng: RandomNumberGenerator, n_paths: int):
@@ -68,6 +129,10 @@ class CorrelatedNormalPathsBuilder(VectorPathBuilder):
         bar = np.einsum('kf,ftp->ktp', self.left_correlating_matrix, foo)
         return VectorPath(uncorrelated_brownians.times, bar)
 
+    def build_blocks(self, rng: RandomNumberGenerator, n_paths: int, steps_per_block: int = 1) -> Iterator[PathBlock]:
+        for times, block in self.brownian_bldr.build_blocks(rng, n_paths, steps_per_block):
+            yield times, np.einsum('kf,ftp->ktp', self.left_correlating_matrix, block)
+
 class LognormalPathsBuilder(VectorPathBuilder):
     def __init__(
             self,
@@ -76,24 +141,40 @@ class LognormalPathsBuilder(VectorPathBuilder):
             rho_matrix:
             ndarray, drifts: ndarray,
             vols: ndarray,
+            brownian_bldr: Optional[VectorPathBuilder] = None,
     ):
         super().__init__(times, n_factors=rho_matrix.shape[0])
-        self.correlated_normals_builder = CorrelatedNormalPathsBuilder(times, rho_matrix)
+        self.correlated_normals_builder = CorrelatedNormalPathsBuilder(times, rho_matrix, brownian_bldr)
         self.rho_matrix = checked_type(rho_matrix, ndarray)
         self.prices: ndarray = checked_type(prices, ndarray)    # (factor)
         self.drifts: ndarray = checked_type(drifts, ndarray)    # (factor)
         self.vols: ndarray = checked_type(vols, ndarray)        # (factor)
 
-    def build(self, rng: RandomNumberGenerator, n_paths: int):
-        brownian_paths = VectorPath.brownian_paths(self.n_factors, self.times, n_paths)
-        correlated_paths = brownian_paths.correlated(self.rho_matrix)
-        # correlated_paths = self.correlated_normals_builder.build(rng, n_paths).path     # (ftp)
-        scaled_paths = correlated_paths.scaled(self.vols)
-        paths_with_drift = scaled_paths.with_drifts(self.drifts)
-        # scaled_paths = np.einsum("f,ftp->ftp", self.vols, correlated_paths)             # (ftp)
-        # drift_matrix = np.expand_dims(np.einsum("t, f -> ft", self.times, self.drifts), axis=2)
-        # drift_matrix2 = np.broadcast_to(drift_matrix, (self.n_factors, self.n_times, n_paths))
-        # paths_with_drift = scaled_paths + drift_matrix2
-        result = paths_with_drift.exp()
-        result = np.einsum("f, ftp -> ftp", self.prices, np.exp(paths_with_drift))
-        return VectorPath(self.times, result)
+    @property
+    def _log_drifts(self) -> ndarray:
+        """Drift of log prices, Ito corrected so that each price grows at its drift rate"""
+        return self.drifts - 0.5 * self.vols * self.vols
+
+    def _to_prices_in_place(self, times: ndarray, Z: ndarray):
+        """Turns correlated, vol scaled Brownians Z of shape (factor, time, path) into prices"""
+        Z += np.multiply.outer(self._log_drifts, times).astype(Z.dtype)[:, :, np.newaxis]
+        np.exp(Z, out=Z)
+        Z *= self.prices.astype(Z.dtype)[:, np.newaxis, np.newaxis]
+
+    def build(self, rng: RandomNumberGenerator, n_paths: int, dtype: DTypeLike = np.float64):
+        """
+        Correlation, vol scaling, drift, exponentiation and spot scaling are all applied in
+        place to the uncorrelated Brownian cube, so that is the only full size allocation.
+        """
+        brownian_bldr = self.correlated_normals_builder.brownian_bldr
+        Z = brownian_bldr.build(rng, n_paths, dtype=dtype).path     # (ftp)
+        scaled_correlating_matrix = self.vols[:, np.newaxis] * self.correlated_normals_builder.left_correlating_matrix
+        correlate_in_place(scaled_correlating_matrix, Z)
+        self._to_prices_in_place(self.times, Z)
+        return VectorPath(self.times, Z)
+
+    def build_blocks(self, rng: RandomNumberGenerator, n_paths: int, steps_per_block: int = 1) -> Iterator[PathBlock]:
+        for times, block in self.correlated_normals_builder.build_blocks(rng, n_paths, steps_per_block):
+            block *= self.vols[:, np.newaxis, np.newaxis]
+            self._to_prices_in_place(times, block)
+            yield times, block
@@ -1,3 +1,5 @@
+import weakref
+
 from put_call_parity.ref_data.unit_of_account import UnitOfAccount
 from tp_utils.type_utils import checked_type
 from tp_quantity.uom import UOM, USD, MT
@@ -5,16 +7,31 @@ from tp_quantity.quantity import Qty
 
 
 class Commodity(UnitOfAccount):
-    def __init__(self, name: str, price_uom: UOM):
-        super().__init__(name)
-        self.price_uom: UOM = checked_type(price_uom, UOM)
-        assert price_uom.numerator.is_ccy, f"Price uom {price_uom} should have a ccy numerator"
+    """Interned - constructing a commodity that's still referenced returns the original"""
+    __slots__ = ("price_uom",)
+    _interned: weakref.WeakValueDictionary[tuple[str, UOM], 'Commodity'] = weakref.WeakValueDictionary()
+
+    def __new__(cls, name: str, price_uom: UOM):
+        key = (name, price_uom)
+        commodity = cls._interned.get(key)
+        if commodity is None:
+            checked_type(price_uom, UOM)
+            assert price_uom.numerator.is_ccy, f"Price uom {price_uom} should have a ccy numerator"
+            commodity = super().__new__(cls, name, hash(key))
+            commodity._set("price_uom", price_uom)
+            cls._interned[key] = commodity
+        return commodity
+
+    def __reduce__(self):
+        return Commodity, (self.name, self.price_uom)
 
     def __eq__(self, other):
-        return isinstance(other, Commodity) and self.name == other.name and self.price_uom == other.price_uom
+        return self is other or (
+            isinstance(other, Commodity) and self.name == other.name and self.price_uom == other.price_uom
+        )
 
     def __hash__(self):
-        return hash((self.name, self.price_uom))
+        return self._hash
 
     @property
     def ccy(self):
@@ -1,3 +1,5 @@
+import weakref
+
 from tp_quantity.uom import UOM
 
 from put_call_parity.ref_data.unit_of_account import UnitOfAccount
@@ -5,13 +7,25 @@ from tp_utils.type_utils import checked_type
 
 
 class Currency(UnitOfAccount):
-    def __init__(self, ccy: UOM):
-        super().__init__(f"CCY: {ccy}")
-        self.ccy: UOM = checked_type(ccy, UOM)
-        assert ccy.is_ccy, f"{ccy} is not a currency"
+    """Interned - constructing a currency that's still referenced returns the original"""
+    __slots__ = ("ccy",)
+    _interned: weakref.WeakValueDictionary[UOM, 'Currency'] = weakref.WeakValueDictionary()
+
+    def __new__(cls, ccy: UOM):
+        currency = cls._interned.get(ccy)
+        if currency is None:
+            checked_type(ccy, UOM)
+            assert ccy.is_ccy, f"{ccy} is not a currency"
+            currency = super().__new__(cls, f"CCY: {ccy}", hash(ccy))
+            currency._set("ccy", ccy)
+            cls._interned[ccy] = currency
+        return currency
+
+    def __reduce__(self):
+        return Currency, (self.ccy,)
 
     def __eq__(self, other):
-        return isinstance(other, Currency) and self.ccy == other.ccy
+        return self is other or (isinstance(other, Currency) and self.ccy == other.ccy)
 
     def __hash__(self):
-        return hash(self.ccy)
+        return self._hash
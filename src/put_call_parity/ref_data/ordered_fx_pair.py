@@ -1,23 +1,47 @@
-from tp_quantity.uom import UOM
+import weakref
+
+from tp_quantity.uom import UOM, USD
 from tp_utils.type_utils import checked_type
 
 
 class OrderedFxPair:
-    def __init__(self, from_ccy: UOM, to_ccy: UOM):
-        from_ccy.assert_is_ccy()
-        to_ccy.assert_is_ccy()
+    """
+    Immutable and interned - constructing a pair that's still referenced returns the
+    original, which compares by identity and has its hash precomputed
+    """
+    __slots__ = ("from_ccy", "to_ccy", "_hash", "__weakref__")
+    _interned: weakref.WeakValueDictionary[tuple[UOM, UOM], 'OrderedFxPair'] = weakref.WeakValueDictionary()
+
+    def __new__(cls, from_ccy: UOM, to_ccy: UOM):
+        key = (from_ccy, to_ccy)
+        pair = cls._interned.get(key)
+        if pair is None:
+            from_ccy.assert_is_ccy()
+            to_ccy.assert_is_ccy()
+
+            pair = super().__new__(cls)
+            object.__setattr__(pair, "from_ccy", checked_type(from_ccy, UOM))
+            object.__setattr__(pair, "to_ccy", checked_type(to_ccy, UOM))
+            object.__setattr__(pair, "_hash", hash(key))
+            cls._interned[key] = pair
+        return pair
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError("OrderedFxPair is immutable")
 
-        self.from_ccy = checked_type(from_ccy, UOM)
-        self.to_ccy = checked_type(to_ccy, UOM)
+    def __reduce__(self):
+        return OrderedFxPair, (self.from_ccy, self.to_ccy)
 
     def __str__(self):
         return f"{self.from_ccy}{self.to_ccy}"
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.from_ccy == other.from_ccy and self.to_ccy == other.to_ccy
+        return self is other or (
+            isinstance(other, self.__class__) and self.from_ccy == other.from_ccy and self.to_ccy == other.to_ccy
+        )
 
     def __hash__(self):
-        return hash((self.from_ccy, self.to_ccy))
+        return self._hash
 
     @property
     def inverse(self) -> 'OrderedFxPair':
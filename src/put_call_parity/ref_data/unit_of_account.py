@@ -2,12 +2,30 @@ from tp_utils.type_utils import checked_type
 
 
 class UnitOfAccount:
-    def __init__(self, name: str):
-        self.name = checked_type(name, str)
+    """
+    Immutable, slotted and hashed once. Subclasses intern their instances, weakly so that
+    ad hoc ones can be collected, so equal units of account are the same object and equality
+    is usually decided by identity.
+    """
+    __slots__ = ("name", "_hash", "__weakref__")
 
+    def __new__(cls, name: str, hash_value=None):
+        unit_of_account = super().__new__(cls)
+        unit_of_account._set("name", checked_type(name, str))
+        unit_of_account._set("_hash", hash(name) if hash_value is None else hash_value)
+        return unit_of_account
+
+    def _set(self, attribute: str, value):
+        object.__setattr__(self, attribute, value)
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return type(self), (self.name,)
 
     def __hash__(self):
-        return self.name.__hash__()
+        return self._hash
 
     def __eq__(self, other):
-        return type(self) == type(other) and self.name == other.name
+        return self is other or (type(self) == type(other) and self.name == other.name)
@@ -1,12 +1,22 @@
+import math
+from numbers import Number
 from typing import Optional, Tuple
 
+import numpy as np
+from numpy import ndarray
 from tp_maths.brownians.uniform_generator import UniformGenerator
 from tp_maths.vector_path.vector_path import VectorPath
 from tp_quantity.quantity import Qty
 from tp_utils.type_utils import checked_type, checked_optional_type
 
-from put_call_parity.portfolio.tradeable import OptionTrade, Cash, CommodityTrade, Tradeable
+from put_call_parity.models import VectorBlackScholes, CALL
+from put_call_parity.models.vector_black_scholes import INTRINSIC_VOL_TIME
+from put_call_parity.portfolio.risk_engine import NumericRiskEngine, NumericRisk
+from put_call_parity.portfolio.hedging_strategy import HedgingStrategy, EveryStepStrategy, HedgeStep, DeltaBandStrategy
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel
+from put_call_parity.portfolio.tradeable import OptionTrade, Cash, CommodityTrade, Tradeable, TradeRisk
 from put_call_parity.ref_data.commodity import Commodity
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
 from put_call_parity.valuation_context.valuation_context import ValuationContext
 
 
@@ -29,15 +39,22 @@ class VanillaOptionPortfolio:
     def gamma(self, vc: ValuationContext, commodity: Commodity) -> Qty:
         return Qty.sum([t.gamma(vc, commodity) for t in self.trades])
 
+    def risk(self, vc: ValuationContext) -> TradeRisk:
+        """Analytic value, delta, gamma and theta on this portfolio's commodity, pricing the option once"""
+        return TradeRisk.sum([t.risk(vc, self.commodity) for t in self.trades])
+
+    def numeric_risk(self, vc: ValuationContext, dt: Optional[float] = None) -> NumericRisk:
+        """All numeric risks on this portfolio's commodity, from one shared set of bumped contexts"""
+        return NumericRiskEngine([self.commodity], dt=dt).risk(self.trades, vc)
+
     def numeric_delta(self, vc: ValuationContext, commodity: Commodity) -> Qty:
-        return Qty.sum([t.numeric_delta(vc, commodity) for t in self.trades])
+        return NumericRiskEngine([commodity]).risk(self.trades, vc).delta(commodity)
 
     def numeric_gamma(self, vc: ValuationContext, commodity: Commodity) -> Qty:
-        return Qty.sum([t.numeric_gamma(vc, commodity) for t in self.trades])
-
+        return NumericRiskEngine([commodity]).risk(self.trades, vc).gamma(commodity)
 
     def numeric_theta(self, vc: ValuationContext, dt: float) -> Qty:
-        return Qty.sum([t.numeric_theta(vc, dt) for t in self.trades])
+        return self.numeric_risk(vc, dt).theta
 
     def rehedge(self, vc: ValuationContext) -> 'VanillaOptionPortfolio':
         delta = self.delta(vc, self.commodity)
@@ -54,6 +71,147 @@ class VanillaOptionPortfolio:
         return hedged_portfolio
 
 
+def _norm_cdf(x: float) -> float:
+    return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+
+class IncrementalHedgingBook:
+    """
+    A VanillaOptionPortfolio for a single path, with the option's terms, its hedge and cash
+    all held as floats so that rehedging is a few float operations, updating the hedge in
+    place. Units are checked once on construction - commodity amounts are in the
+    commodity's quantity uom, cash in its currency. Rehedges only happen when the absolute
+    portfolio delta exceeds `delta_band`. VanillaOptionReplicator.replicate_incremental
+    hedges many paths this way at once.
+    """
+    def __init__(self, portfolio: VanillaOptionPortfolio, vol: float, delta_band: float = 0.0):
+        self.option: OptionTrade = portfolio.option
+        self.commodity: Commodity = portfolio.commodity
+        self.vol: float = checked_type(vol, Number)
+        self.delta_band: float = checked_type(delta_band, Number)
+        self.is_call: bool = self.option.right == CALL
+        self.option_amount: float = self.option.amount.checked_value(self.commodity.quantity_uom)
+        self.strike: float = self.option.strike.checked_value(self.commodity.price_uom)
+        self.expiry_time: float = self.option.expiry_time
+        self.commodity_amount: float = portfolio.commodity_trade.amount.checked_value(self.commodity.quantity_uom)
+        self.cash_amount: float = portfolio.cash.amount.checked_value(self.commodity.ccy)
+        self.n_rehedges: int = 0
+
+    def _call_probabilities(self, price: float, time: float) -> Tuple[float, float]:
+        """N(d1) and N(d2) for a call, or its in the money indicator where worth intrinsic"""
+        T = self.expiry_time - time
+        if self.vol * T < INTRINSIC_VOL_TIME:
+            in_the_money = 1.0 if price > self.strike else 0.0
+            return in_the_money, in_the_money
+        std_dev = self.vol * math.sqrt(T)
+        d1 = math.log(price / self.strike) / std_dev + 0.5 * std_dev
+        return _norm_cdf(d1), _norm_cdf(d1 - std_dev)
+
+    def value(self, price: float, time: float) -> float:
+        """Portfolio value in the commodity's currency"""
+        N1, N2 = self._call_probabilities(price, time)
+        # Puts by put-call parity, which also holds where worth intrinsic
+        option_price = price * N1 - self.strike * N2 + (0.0 if self.is_call else self.strike - price)
+        return option_price * self.option_amount + self.commodity_amount * price + self.cash_amount
+
+    def delta(self, price: float, time: float) -> float:
+        """Portfolio delta in the commodity's quantity uom"""
+        N1, _ = self._call_probabilities(price, time)
+        option_delta = N1 if self.is_call else N1 - 1.0
+        return option_delta * self.option_amount + self.commodity_amount
+
+    def rehedge(self, price: float, time: float) -> bool:
+        delta = self.delta(price, time)
+        if abs(delta) <= self.delta_band:
+            return False
+        self.commodity_amount -= delta
+        self.cash_amount += delta * price
+        self.n_rehedges += 1
+        return True
+
+    def to_portfolio(self) -> VanillaOptionPortfolio:
+        return VanillaOptionPortfolio(
+            self.option,
+            CommodityTrade(self.commodity, Qty(self.commodity_amount, self.commodity.quantity_uom)),
+            Cash(Qty(self.cash_amount, self.commodity.ccy)),
+        )
+
+
+class VanillaOptionPortfolioArray:
+    """
+    The positions of one VanillaOptionPortfolio per path, held as arrays. Units are checked
+    once on construction - commodity amounts are in the commodity's quantity uom, cash
+    amounts in its currency. Transaction costs are paid from cash, and their running total
+    per path kept in `cost_amounts`.
+    """
+    def __init__(self, option: OptionTrade, commodity_amounts: ndarray, cash_amounts: ndarray,
+                 cost_amounts: Optional[ndarray] = None):
+        self.option: OptionTrade = checked_type(option, OptionTrade)
+        self.commodity: Commodity = option.commodity
+        self.option_amount: float = option.amount.checked_value(self.commodity.quantity_uom)
+        self.strike: float = option.strike.checked_value(self.commodity.price_uom)
+        self.commodity_amounts: ndarray = checked_type(commodity_amounts, ndarray)
+        self.cash_amounts: ndarray = checked_type(cash_amounts, ndarray)
+        assert commodity_amounts.shape == cash_amounts.shape, \
+            f"Mismatched shapes {commodity_amounts.shape}, {cash_amounts.shape}"
+        self.cost_amounts: ndarray = np.zeros(cash_amounts.shape) if cost_amounts is None \
+            else checked_type(cost_amounts, ndarray)
+        self.n_rehedges: ndarray = np.zeros(cash_amounts.shape, dtype=int)
+
+    @staticmethod
+    def from_portfolio(portfolio: VanillaOptionPortfolio, n_paths: int) -> 'VanillaOptionPortfolioArray':
+        commodity = portfolio.commodity
+        commodity_amount = portfolio.commodity_trade.amount.checked_value(commodity.quantity_uom)
+        cash_amount = portfolio.cash.amount.checked_value(commodity.ccy)
+        return VanillaOptionPortfolioArray(
+            portfolio.option,
+            np.full(n_paths, commodity_amount),
+            np.full(n_paths, cash_amount),
+        )
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.cash_amounts)
+
+    def _black_scholes(self, prices: ndarray, vol: float, time: float) -> VectorBlackScholes:
+        return VectorBlackScholes(self.option.right, prices, self.strike, vol, self.option.expiry_time - time)
+
+    def values(self, prices: ndarray, vol: float, time: float) -> ndarray:
+        """Portfolio value per path, in the commodity's currency"""
+        option_values = self._black_scholes(prices, vol, time).value * self.option_amount
+        return option_values + self.commodity_amounts * prices + self.cash_amounts
+
+    def deltas(self, prices: ndarray, vol: float, time: float) -> ndarray:
+        """Portfolio delta per path, in the commodity's quantity uom"""
+        return self._black_scholes(prices, vol, time).delta * self.option_amount + self.commodity_amounts
+
+    def trade(self, prices: ndarray, quantities: ndarray, cost_model: Optional[TransactionCostModel] = None):
+        """Buys `quantities` of the commodity on each path at mid `prices`, paying any costs"""
+        self.cash_amounts -= quantities * prices
+        self.commodity_amounts = self.commodity_amounts + quantities
+        if cost_model is not None:
+            self.pay_costs(prices, quantities, cost_model)
+
+    def pay_costs(self, prices: ndarray, quantities: ndarray, cost_model: TransactionCostModel):
+        """Pays the transaction costs of trades already reflected in the positions"""
+        costs = cost_model.costs(prices, quantities)
+        self.cash_amounts -= costs
+        self.cost_amounts += costs
+
+    def rehedge(self, prices: ndarray, vol: float, time: float, dt: float, strategy: Optional[HedgingStrategy] = None,
+                cost_model: Optional[TransactionCostModel] = None):
+        """
+        Rebalances every path's commodity position as `strategy` decides, by default to zero
+        delta. `dt` is the time since the previous rehedge.
+        """
+        strategy = strategy or EveryStepStrategy()
+        bs = self._black_scholes(prices, strategy.hedge_vol(vol, dt), time)
+        step = HedgeStep(time, dt, prices, self.commodity_amounts, bs, self.option_amount)
+        quantities = strategy.rehedge(step) - self.commodity_amounts
+        self.n_rehedges += quantities != 0
+        self.trade(prices, quantities, cost_model)
+
+
 class VanillaOptionReplicator:
     def __init__(self, portfolio: VanillaOptionPortfolio, initial_vc: ValuationContext, price_paths: VectorPath):
         self.portfolio: VanillaOptionPortfolio = checked_type(portfolio, VanillaOptionPortfolio)
@@ -99,3 +257,60 @@ class VanillaOptionReplicator:
             ]
             portfolios = rehedged_portfolios
         return portfolios, vcs
+
+    def replicate_batch(self, n_time_steps: int, strategy: Optional[HedgingStrategy] = None,
+                        cost_model: Optional[TransactionCostModel] = None) -> ndarray:
+        """
+        As `replicate`, but with every path's positions held in arrays and rehedged together,
+        by default at every step. Returns the terminal portfolio value per path, net of any
+        transaction costs, in the initial context's valuation ccy.
+        """
+        return self.replicate_batch_with_costs(n_time_steps, strategy, cost_model)[0]
+
+    def replicate_batch_with_costs(self, n_time_steps: int, strategy: Optional[HedgingStrategy] = None,
+                                   cost_model: Optional[TransactionCostModel] = None) -> Tuple[ndarray, ndarray]:
+        """
+        As `replicate_batch`, also returning the transaction costs paid on each path, including
+        those of the initial hedge, in the initial context's valuation ccy.
+        """
+        portfolios = self._replicate_array(n_time_steps, strategy, cost_model)
+        prices = self.price_paths.path[0]   # (time, path)
+        fx_pair = OrderedFxPair(self.commodity.ccy, self.initial_vc.valuation_ccy)
+        fx_rate = self.initial_vc.fx_rate(fx_pair).checked_value(fx_pair.uom)
+        terminal_values = portfolios.values(prices[n_time_steps], self.vol.checked_scalar_value,
+                                            self.price_paths.times[n_time_steps])
+        return terminal_values * fx_rate, portfolios.cost_amounts * fx_rate
+
+    def _replicate_array(self, n_time_steps: int, strategy: Optional[HedgingStrategy],
+                         cost_model: Optional[TransactionCostModel]) -> VanillaOptionPortfolioArray:
+        """Every path's positions after hedging over `n_time_steps` steps as `strategy` decides"""
+        times = self.price_paths.times
+        prices = self.price_paths.path[0]   # (time, path)
+        vol = self.vol.checked_scalar_value
+        n_paths = prices.shape[1]
+        hedged_portfolio = self.portfolio.rehedge(self.initial_vc)
+        portfolios = VanillaOptionPortfolioArray.from_portfolio(hedged_portfolio, n_paths)
+        if cost_model is not None:
+            uom = self.commodity.quantity_uom
+            initial_trade = hedged_portfolio.commodity_trade.amount.checked_value(uom) - \
+                self.portfolio.commodity_trade.amount.checked_value(uom)
+            portfolios.pay_costs(self.F.checked_value(self.commodity.price_uom), np.full(n_paths, initial_trade),
+                                 cost_model)
+        for i_time_step in range(n_time_steps):
+            portfolios.rehedge(
+                prices[i_time_step + 1],
+                vol,
+                times[i_time_step + 1],
+                dt=times[i_time_step + 1] - times[i_time_step],
+                strategy=strategy,
+                cost_model=cost_model
+            )
+        return portfolios
+
+    def replicate_incremental(self, n_time_steps: int, delta_band: float = 0.0) -> VanillaOptionPortfolioArray:
+        """
+        As `replicate`, but rehedging a path only when its delta leaves `delta_band`, as an
+        IncrementalHedgingBook would - every path at once, by masking those outside the band.
+        Returns each path's terminal positions, and its number of rehedges.
+        """
+        return self._replicate_array(n_time_steps, DeltaBandStrategy(delta_band), None)
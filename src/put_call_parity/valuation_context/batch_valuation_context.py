@@ -0,0 +1,194 @@
+from typing import Optional
+
+import numpy as np
+from numpy import ndarray
+from numpy.typing import ArrayLike
+from tp_quantity.quantity import Qty
+from tp_quantity.uom import UOM
+from tp_utils.type_utils import checked_type
+
+from put_call_parity.ref_data.commodity import Commodity
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.valuation_context.fx_graph import FxGraph
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+
+class BatchValuationContext:
+    """
+    Many valuation scenarios at once. Where ValuationContext holds a Qty per commodity or
+    FX pair, this holds an array over the scenario axis, with units fixed by the key -
+    prices in the commodity's price uom, vols as scalars and FX rates in the pair's uom.
+    Tradeables valued against it return one value per scenario.
+    """
+    def __init__(
+            self,
+            valuation_ccy: UOM,
+            n_scenarios: int,
+            time: ArrayLike,
+            fx_rates: Optional[dict[OrderedFxPair, ArrayLike]] = None,
+            commodity_prices: Optional[dict[Commodity, ArrayLike]] = None,
+            commodity_vols: Optional[dict[Commodity, ArrayLike]] = None,
+    ):
+        self.valuation_ccy: UOM = checked_type(valuation_ccy, UOM)
+        self.n_scenarios: int = checked_type(n_scenarios, int)
+        self.time: ndarray = self._scenario_array(time)
+
+        def checked_arrays(dict_or_none, key_type):
+            return {
+                checked_type(key, key_type): self._scenario_array(values)
+                for key, values in (dict_or_none or {}).items()
+            }
+
+        self.fx_rates: dict[OrderedFxPair, ndarray] = checked_arrays(fx_rates, OrderedFxPair)
+        self.commodity_prices: dict[Commodity, ndarray] = checked_arrays(commodity_prices, Commodity)
+        self.commodity_vols: dict[Commodity, ndarray] = checked_arrays(commodity_vols, Commodity)
+
+        valuation_ccy.assert_is_ccy()
+
+        # Built lazily, and shared with copies whose fx rates are unchanged
+        self._fx_graph: Optional[FxGraph] = None
+        self._conversion_rates: dict[tuple[UOM, UOM], ndarray] = {}
+
+    def _scenario_array(self, values: ArrayLike) -> ndarray:
+        values = np.asarray(values, dtype=float)
+        assert values.shape in [(), (self.n_scenarios,)], \
+            f"Expected a scalar or shape ({self.n_scenarios},), got {values.shape}"
+        return np.broadcast_to(values, (self.n_scenarios,))
+
+    @staticmethod
+    def from_context(vc: ValuationContext, n_scenarios: int) -> 'BatchValuationContext':
+        return BatchValuationContext.from_contexts([vc]).with_n_scenarios(n_scenarios)
+
+    @staticmethod
+    def from_contexts(vcs: list[ValuationContext]) -> 'BatchValuationContext':
+        assert len(vcs) > 0, "No contexts"
+        first = vcs[0]
+        for vc in vcs:
+            assert vc.valuation_ccy == first.valuation_ccy, "Mismatched valuation currencies"
+
+        def stacked(key_values, to_float):
+            return {
+                key: np.fromiter((to_float(key, key_values(vc)[key]) for vc in vcs), dtype=float, count=len(vcs))
+                for key in key_values(first)
+            }
+
+        return BatchValuationContext(
+            first.valuation_ccy,
+            len(vcs),
+            np.fromiter((vc.time for vc in vcs), dtype=float, count=len(vcs)),
+            fx_rates=stacked(lambda vc: vc.fx_rates, lambda pair, rate: rate.checked_value(pair.uom)),
+            commodity_prices=stacked(
+                lambda vc: vc.commodity_prices,
+                lambda commodity, price: price.checked_value(commodity.price_uom)
+            ),
+            commodity_vols=stacked(lambda vc: vc.commodity_vols, lambda _, vol: vol.checked_scalar_value),
+        )
+
+    def scenario(self, i_scenario: int) -> ValuationContext:
+        return ValuationContext(
+            self.valuation_ccy,
+            float(self.time[i_scenario]),
+            fx_rates={pair: Qty(float(rates[i_scenario]), pair.uom) for pair, rates in self.fx_rates.items()},
+            commodity_prices={
+                commodity: Qty(float(prices[i_scenario]), commodity.price_uom)
+                for commodity, prices in self.commodity_prices.items()
+            },
+            commodity_vols={
+                commodity: Qty.to_qty(float(vols[i_scenario]))
+                for commodity, vols in self.commodity_vols.items()
+            },
+        )
+
+    def fx_rate(self, pair: OrderedFxPair) -> ndarray:
+        return self.conversion_rate(pair.from_ccy, pair.to_ccy)
+
+    @property
+    def fx_graph(self) -> FxGraph:
+        if self._fx_graph is None:
+            self._fx_graph = FxGraph(self.fx_rates)
+        return self._fx_graph
+
+    def conversion_rate(self, from_ccy: UOM, to_ccy: UOM) -> ndarray:
+        """
+        The rates, in to_ccy / from_ccy, triangulated as ValuationContext.conversion_rate
+        does. Cached, so read only.
+        """
+        key = (from_ccy, to_ccy)
+        rates = self._conversion_rates.get(key)
+        if rates is None:
+            rates = self._conversion_rates[key] = self._triangulated_rates(from_ccy, to_ccy)
+        return rates
+
+    def _triangulated_rates(self, from_ccy: UOM, to_ccy: UOM) -> ndarray:
+        if from_ccy == to_ccy:
+            return np.broadcast_to(1.0, (self.n_scenarios,))
+        chain = self.fx_graph.chain(from_ccy, to_ccy)
+        if chain is None:
+            raise ValueError(f"no fx rates for {from_ccy}{to_ccy}")
+        rates = None
+        for pair, inverted in chain:
+            step = 1.0 / self.fx_rates[pair] if inverted else self.fx_rates[pair]
+            rates = step if rates is None else rates * step
+        rates.flags.writeable = False
+        return rates
+
+    def price(self, commodity: Commodity) -> ndarray:
+        return self.commodity_prices[commodity]
+
+    def vol(self, commodity: Commodity) -> ndarray:
+        if commodity not in self.commodity_vols:
+            raise ValueError(f"No vol for {commodity.name}")
+        return self.commodity_vols[commodity]
+
+    def copy(
+            self,
+            n_scenarios: Optional[int] = None,
+            time: Optional[ArrayLike] = None,
+            fx_rates: Optional[dict[OrderedFxPair, ArrayLike]] = None,
+            commodity_prices: Optional[dict[Commodity, ArrayLike]] = None,
+            commodity_vols: Optional[dict[Commodity, ArrayLike]] = None,
+    ) -> 'BatchValuationContext':
+        vc = BatchValuationContext(
+            self.valuation_ccy,
+            self.n_scenarios if n_scenarios is None else n_scenarios,
+            self.time if time is None else time,
+            self.fx_rates if fx_rates is None else fx_rates,
+            self.commodity_prices if commodity_prices is None else commodity_prices,
+            self.commodity_vols if commodity_vols is None else commodity_vols,
+        )
+        if fx_rates is None and n_scenarios is None:
+            vc._fx_graph, vc._conversion_rates = self.fx_graph, self._conversion_rates
+        return vc
+
+    def with_n_scenarios(self, n_scenarios: int) -> 'BatchValuationContext':
+        """Repeats a single scenario n_scenarios times"""
+        assert self.n_scenarios == 1, "Can only expand a single scenario"
+
+        def first(arrays):
+            return {key: values[0] for key, values in arrays.items()}
+
+        return self.copy(
+            n_scenarios=n_scenarios,
+            time=self.time[0],
+            fx_rates=first(self.fx_rates),
+            commodity_prices=first(self.commodity_prices),
+            commodity_vols=first(self.commodity_vols),
+        )
+
+    def with_time(self, time: ArrayLike) -> 'BatchValuationContext':
+        return self.copy(time=time)
+
+    def with_prices(self, commodity: Commodity, prices: ArrayLike) -> 'BatchValuationContext':
+        new_prices = self.commodity_prices.copy()
+        new_prices[commodity] = prices
+        return self.copy(commodity_prices=new_prices)
+
+    def with_vols(self, commodity: Commodity, vols: ArrayLike) -> 'BatchValuationContext':
+        new_vols = self.commodity_vols.copy()
+        new_vols[commodity] = vols
+        return self.copy(commodity_vols=new_vols)
+
+    def with_fx_rates(self, pair: OrderedFxPair, rates: ArrayLike) -> 'BatchValuationContext':
+        new_rates = self.fx_rates.copy()
+        new_rates[pair] = rates
+        return self.copy(fx_rates=new_rates)
@@ -0,0 +1,41 @@
+from collections import deque
+from typing import Iterable, Optional
+
+from tp_quantity.uom import UOM
+
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+
+
+class FxGraph:
+    """
+    Currencies linked by quoted FX pairs, each usable in either direction. Conversions between
+    two currencies triangulate along the shortest chain of quoted pairs, through whichever
+    pivot currencies connect them. Searches are breadth first from the source currency and
+    cached, as one search gives the chain to every reachable currency.
+    """
+    def __init__(self, quoted_pairs: Iterable[OrderedFxPair]):
+        self._neighbours: dict[UOM, list[tuple[UOM, OrderedFxPair, bool]]] = {}
+        for pair in quoted_pairs:
+            self._neighbours.setdefault(pair.from_ccy, []).append((pair.to_ccy, pair, False))
+            self._neighbours.setdefault(pair.to_ccy, []).append((pair.from_ccy, pair, True))
+        self._chains: dict[UOM, dict[UOM, list[tuple[OrderedFxPair, bool]]]] = {}
+
+    def chain(self, from_ccy: UOM, to_ccy: UOM) -> Optional[list[tuple[OrderedFxPair, bool]]]:
+        """
+        The quoted pairs converting `from_ccy` into `to_ccy`, each flagged if its rate is to
+        be inverted, or None if they aren't connected
+        """
+        if from_ccy not in self._chains:
+            self._chains[from_ccy] = self._shortest_chains(from_ccy)
+        return self._chains[from_ccy].get(to_ccy)
+
+    def _shortest_chains(self, from_ccy: UOM) -> dict[UOM, list[tuple[OrderedFxPair, bool]]]:
+        chains = {from_ccy: []}
+        queue = deque([from_ccy])
+        while queue:
+            ccy = queue.popleft()
+            for neighbour, pair, inverted in self._neighbours.get(ccy, []):
+                if neighbour not in chains:
+                    chains[neighbour] = chains[ccy] + [(pair, inverted)]
+                    queue.append(neighbour)
+        return chains
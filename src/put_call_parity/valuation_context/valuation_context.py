@@ -1,17 +1,38 @@
+from collections import ChainMap
 from numbers import Number
-from typing import Optional
+from typing import Optional, Mapping
 
 from tp_random_tests.random_number_generator import RandomNumberGenerator
 
 from put_call_parity.ref_data.commodity import Commodity
 from tp_quantity.quantity import Qty
-from tp_quantity.uom import UOM, USD
+from tp_quantity.uom import UOM
 from tp_utils.type_utils import checked_type, checked_dict_type
 
 from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.valuation_context.fx_graph import FxGraph
+
+_MAX_OVERLAY_DEPTH = 8
+
+
+def _overlay(parent: Mapping, changes: dict) -> ChainMap:
+    """
+    `changes` layered over `parent`, which is shared rather than copied. Deep stacks of
+    layers, which would slow lookups, are collapsed.
+    """
+    if isinstance(parent, ChainMap):
+        if len(parent.maps) >= _MAX_OVERLAY_DEPTH:
+            return ChainMap(changes, dict(parent))
+        return parent.new_child(changes)
+    return ChainMap(changes, parent)
 
 
 class ValuationContext:
+    """
+    Market data at a point in time. Contexts are treated as immutable - copies and shifts
+    share the unchanged parts of their parent, and validate only what is new, so bumping
+    one price is cheap however many a context holds.
+    """
     def __init__(
             self,
             valuation_ccy: UOM,
@@ -27,29 +48,55 @@ class ValuationContext:
         def dict_if_none(dict_or_none):
             return dict() if dict_or_none is None else dict_or_none
 
-        self.fx_rates: dict[OrderedFxPair, Qty] = checked_dict_type(dict_if_none(fx_rates), OrderedFxPair, UOM)
-        self.zero_rates = checked_dict_type(dict_if_none(zero_rates), UOM, Qty)
-        self.commodity_prices = checked_dict_type(dict_if_none(commodity_prices), Commodity, Qty)
-        self.commodity_vols = checked_dict_type(dict_if_none(commodity_vols), Commodity, Qty)
+        self.fx_rates: Mapping[OrderedFxPair, Qty] = checked_dict_type(dict_if_none(fx_rates), OrderedFxPair, Qty)
+        self.zero_rates: Mapping[UOM, Qty] = checked_dict_type(dict_if_none(zero_rates), UOM, Qty)
+        self.commodity_prices: Mapping[Commodity, Qty] = checked_dict_type(
+            dict_if_none(commodity_prices), Commodity, Qty
+        )
+        self.commodity_vols: Mapping[Commodity, Qty] = checked_dict_type(dict_if_none(commodity_vols), Commodity, Qty)
 
         valuation_ccy.assert_is_ccy()
         for ccy in self.zero_rates:
             ccy.assert_is_ccy()
 
+        # Built lazily, and shared with copies and shifts whose fx rates are unchanged
+        self._fx_graph: Optional[FxGraph] = None
+        self._conversion_rates: dict[tuple[UOM, UOM], Qty] = {}
+
     def zero_rate(self, ccy: UOM) -> Qty:
         return self.zero_rates[ccy]
 
     def fx_rate(self, pair: OrderedFxPair) -> Qty:
-        if pair.is_degenerate:
+        return self.conversion_rate(pair.from_ccy, pair.to_ccy)
+
+    @property
+    def fx_graph(self) -> FxGraph:
+        if self._fx_graph is None:
+            self._fx_graph = FxGraph(self.fx_rates)
+        return self._fx_graph
+
+    def conversion_rate(self, from_ccy: UOM, to_ccy: UOM) -> Qty:
+        """
+        The rate, in to_ccy / from_ccy, triangulated from quoted fx rates through any pivot
+        currencies and cached
+        """
+        key = (from_ccy, to_ccy)
+        rate = self._conversion_rates.get(key)
+        if rate is None:
+            rate = self._conversion_rates[key] = self._triangulated_rate(from_ccy, to_ccy)
+        return rate
+
+    def _triangulated_rate(self, from_ccy: UOM, to_ccy: UOM) -> Qty:
+        if from_ccy == to_ccy:
             return Qty.to_qty(1)
-        if not pair.is_usd_pair:
-            uom = pair.uom
-            return self.fx_rate(OrderedFxPair.from_uom(uom.numerator / USD)) * self.fx_rate(USD / uom.denominator)
-        if pair in self.fx_rates:
-            return self.fx_rates[pair]
-        if pair.inverse in self.fx_rates:
-            return self.fx_rates[pair.inverse].inverse
-        raise ValueError(f"no fx rates for {pair}")
+        chain = self.fx_graph.chain(from_ccy, to_ccy)
+        if chain is None:
+            raise ValueError(f"no fx rates for {from_ccy}{to_ccy}")
+        rate = None
+        for pair, inverted in chain:
+            step = self.fx_rates[pair].inverse if inverted else self.fx_rates[pair]
+            rate = step if rate is None else rate * step
+        return rate
 
     def price(self, commodity: Commodity) -> Qty:
         return self.commodity_prices[commodity]
@@ -59,6 +106,12 @@ class ValuationContext:
             raise ValueError(f"No vol for {commodity.name}")
         return self.commodity_vols[commodity]
 
+    def _with(self, **changes) -> 'ValuationContext':
+        """A shallow copy with some attributes changed, which the caller has validated"""
+        vc = object.__new__(ValuationContext)
+        vc.__dict__.update(self.__dict__, **changes)
+        return vc
+
     def copy(
             self,
             time: Optional[Number] = None,
@@ -66,25 +119,33 @@ class ValuationContext:
             zero_rates: Optional[dict[UOM, Qty]] = None,
             commodity_prices: Optional[dict[Commodity, Qty]] = None,
             commodity_vols: Optional[dict[Commodity, Qty]] = None,
-    ):
-        return ValuationContext(
-            self.valuation_ccy,
-            time or self.time,
-            fx_rates or self.fx_rates,
-            zero_rates or self.zero_rates,
-            commodity_prices or self.commodity_prices,
-            commodity_vols or self.commodity_vols
-        )
+    ) -> 'ValuationContext':
+        """Replaces whichever of time and the dicts are given, sharing the rest"""
+        changes = {}
+        if time is not None:
+            changes["time"] = checked_type(time, Number)
+        if fx_rates:
+            changes["fx_rates"] = checked_dict_type(fx_rates, OrderedFxPair, Qty)
+            changes["_fx_graph"], changes["_conversion_rates"] = None, {}
+        if zero_rates:
+            changes["zero_rates"] = checked_dict_type(zero_rates, UOM, Qty)
+            for ccy in zero_rates:
+                ccy.assert_is_ccy()
+        if commodity_prices:
+            changes["commodity_prices"] = checked_dict_type(commodity_prices, Commodity, Qty)
+        if commodity_vols:
+            changes["commodity_vols"] = checked_dict_type(commodity_vols, Commodity, Qty)
+        return self._with(**changes)
 
     def with_price(self, commodity: Commodity, price: Qty) -> 'ValuationContext':
-        new_prices = self.commodity_prices.copy()
-        new_prices[commodity] = price
-        return self.copy(commodity_prices=new_prices)
+        checked_type(commodity, Commodity)
+        checked_type(price, Qty)
+        return self._with(commodity_prices=_overlay(self.commodity_prices, {commodity: price}))
 
     def with_vol(self, commodity: Commodity, vol: Qty) -> 'ValuationContext':
-        new_vols = self.commodity_vols.copy()
-        new_vols[commodity] = vol
-        return self.copy(commodity_vols=new_vols)
+        checked_type(commodity, Commodity)
+        checked_type(vol, Qty)
+        return self._with(commodity_vols=_overlay(self.commodity_vols, {commodity: vol}))
 
     def shift_price(self, commodity: Commodity, dP: Qty) -> 'ValuationContext':
         return self.with_price(commodity, self.price(commodity) + dP)
@@ -55,3 +55,22 @@ class BlackScholesTestCase(TestCase, QtyTestUtils):
         numeric_gamma = (c_up.value - 2 * call.value + c_dn.value) / (dF * dF)
         # print(f"{call.gamma:1.6f}, {numeric_gamma:1.6f}")
         self.assertAlmostEqual(call.gamma, numeric_gamma, delta = 1e-4)
+
+    @RandomisedTest(number_of_runs=30)
+    def test_greeks_match_properties(self, rng):
+        F, K = [rng.uniform(90, 110) for _ in range(2)]
+        vol = rng.choice(0.0, rng.uniform(0.05, 0.5))
+        T = rng.uniform()
+        bs = BlackScholes(rng.choice(CALL, PUT), F=F, K=K, vol=vol, T=T)
+        greeks = bs.greeks
+        for expected, actual in [
+            (bs.value, greeks.value),
+            (bs.delta, greeks.delta),
+            (bs.gamma, greeks.gamma),
+            (bs.theta, greeks.theta),
+        ]:
+            self.assertAlmostEqual(expected, actual, delta=1e-12)
+        if vol > 0:
+            self.assertAlmostEqual(bs.vega, greeks.vega, delta=1e-12)
+            self.assertAlmostEqual(bs.N1, greeks.N1, delta=1e-12)
+            self.assertAlmostEqual(bs.N2, greeks.N2, delta=1e-12)
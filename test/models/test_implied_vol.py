@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import VectorBlackScholes, CALL, PUT, implied_vol
+
+
+class ImpliedVolTestCase(TestCase):
+    @RandomisedTest(number_of_runs=20)
+    def test_recovers_vols(self, rng):
+        n = 200
+        right = rng.choice(CALL, PUT)
+        F = np.asarray([rng.uniform(50, 150) for _ in range(n)])
+        K = rng.uniform(80, 120)
+        vols = np.asarray([rng.uniform(0.05, 1.0) for _ in range(n)])
+        T = np.asarray([rng.uniform(0.01, 3.0) for _ in range(n)])
+        prices = VectorBlackScholes(right, F, K, vols, T).value
+        implied_vols = implied_vol(right, prices, F, K, T)
+        self.assertFalse(np.isnan(implied_vols).any())
+        np.testing.assert_allclose(VectorBlackScholes(right, F, K, implied_vols, T).value, prices, atol=1e-9)
+        # Vols are only identifiable where the option has some meaningful time value
+        vegas = VectorBlackScholes(right, F, K, vols, T).vega
+        identifiable = vegas > 1e-4
+        np.testing.assert_allclose(implied_vols[identifiable], vols[identifiable], atol=1e-6)
+
+    def test_intrinsic_and_unattainable_prices(self):
+        F = np.asarray([110.0, 90.0, 110.0, 110.0, 100.0, 100.0])
+        prices = np.asarray([10.0, 0.0, 9.0, 111.0, 1.0, 1.0])
+        T = np.asarray([1.0, 1.0, 1.0, 1.0, 0.0, 1e-8])
+        vols = implied_vol(CALL, prices, F, 100.0, T)
+        np.testing.assert_array_equal(vols[:2], [0.0, 0.0])
+        # Below intrinsic, above the underlying, time value at expiry, and time value
+        # only attainable where vol * T is small enough to be valued at intrinsic
+        self.assertTrue(np.isnan(vols[2:]).all())
+
+    def test_broadcasts(self):
+        F = np.linspace(90, 110, 5).reshape(5, 1)
+        T = np.linspace(0.5, 1.5, 3)
+        prices = VectorBlackScholes(PUT, F, 100.0, 0.2, T).value
+        vols = implied_vol(PUT, prices, F, 100.0, T)
+        self.assertEqual((5, 3), vols.shape)
+        np.testing.assert_allclose(vols, 0.2, atol=1e-8)
@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import BlackScholes, VectorBlackScholes, CALL, PUT
+
+
+class VectorBlackScholesTestCase(TestCase):
+
+    @RandomisedTest(number_of_runs=30)
+    def test_matches_scalar_model(self, rng):
+        n = 20
+        right = rng.choice(CALL, PUT)
+        F = np.asarray([rng.uniform(90, 110) for _ in range(n)])
+        K = rng.uniform(90, 110)
+        vols = np.asarray([rng.choice(0.0, rng.uniform(0.05, 0.5)) for _ in range(n)])
+        T = np.asarray([rng.choice(0.0, rng.uniform(0.05, 2.0)) for _ in range(n)])
+        vbs = VectorBlackScholes(right, F, K, vols, T)
+        for i in range(n):
+            bs = BlackScholes(right, F[i], K, vols[i], T[i])
+            self.assertAlmostEqual(bs.value, vbs.value[i], delta=1e-9)
+            self.assertAlmostEqual(bs.delta, vbs.delta[i], delta=1e-9)
+            self.assertAlmostEqual(bs.gamma, vbs.gamma[i], delta=1e-9)
+            self.assertAlmostEqual(bs.theta, vbs.theta[i], delta=1e-9)
+            if not bs._is_worth_intrinsic:
+                self.assertAlmostEqual(bs.vega, vbs.vega[i], delta=1e-9)
+                self.assertAlmostEqual(bs.N1, vbs.N1[i], delta=1e-9)
+                self.assertAlmostEqual(bs.N2, vbs.N2[i], delta=1e-9)
+
+    def test_broadcasting(self):
+        F = np.linspace(90, 110, 5).reshape(5, 1)
+        T = np.linspace(0.0, 1.0, 3)
+        vbs = VectorBlackScholes(CALL, F, 100.0, 0.2, T)
+        self.assertEqual((5, 3), vbs.value.shape)
+        self.assertEqual((5, 3), vbs.delta.shape)
+        np.testing.assert_allclose(vbs.value[:, 0], np.maximum(F[:, 0] - 100.0, 0))
+
+    @RandomisedTest(number_of_runs=10)
+    def test_vanna(self, rng):
+        right = rng.choice(CALL, PUT)
+        F = np.asarray([rng.uniform(80, 120) for _ in range(20)])
+        vol, T, dV = rng.uniform(0.1, 0.5), rng.uniform(0.1, 2.0), 1e-6
+        vbs = VectorBlackScholes(right, F, 100.0, vol, T)
+        numeric_vanna = (vbs.shift_vol(dV).delta - vbs.shift_vol(-dV).delta) / (2 * dV)
+        np.testing.assert_allclose(vbs.vanna, numeric_vanna, atol=1e-6)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_delta_matches_finite_difference(self, rng):
+        F = np.asarray([rng.uniform(80, 120) for _ in range(20)])
+        dF = 1e-5
+        # Live options, then ones worth intrinsic
+        for vol, T in [(rng.uniform(0.1, 0.5), rng.uniform(0.1, 2.0)), (0.0, 1.0)]:
+            for right in [CALL, PUT]:
+                def value(F_):
+                    return VectorBlackScholes(right, F_, 100.0, vol, T).value
+                numeric_delta = (value(F + dF) - value(F - dF)) / (2 * dF)
+                np.testing.assert_allclose(VectorBlackScholes(right, F, 100.0, vol, T).delta, numeric_delta, atol=1e-6)
+
+    def test_delta_is_safe_to_modify(self):
+        for right in (CALL, PUT):
+            bs = VectorBlackScholes(right, np.asarray([90.0, 100.0, 110.0]), 100.0, 0.3, 1.0)
+            value, N1 = bs.value, bs.N1.copy()
+            delta = bs.delta
+            np.negative(delta, out=delta)
+            np.testing.assert_array_equal(N1, bs.N1)
+            np.testing.assert_array_equal(value, bs.value)
+
+    def test_put_delta(self):
+        self.assertAlmostEqual(-0.440382, float(VectorBlackScholes(PUT, 100.0, 100.0, 0.3, 1.0).delta), delta=1e-6)
+        self.assertAlmostEqual(-0.440382, BlackScholes(PUT, 100.0, 100.0, 0.3, 1.0).delta, delta=1e-6)
+        self.assertEqual(-1.0, float(VectorBlackScholes(PUT, 90.0, 100.0, 0.0, 1.0).delta))
+        self.assertEqual(-1.0, BlackScholes(PUT, 90.0, 100.0, 0.0, 1.0).delta)
@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT, BlackScholes
+from put_call_parity.portfolio.delta_hedge_simulator import DeltaHedgeSimulator
+from put_call_parity.portfolio.hedging_strategy import DeltaBandStrategy
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel
+from put_call_parity.process.vector_path_builder import LognormalPathsBuilder
+
+
+class DeltaHedgeSimulatorTestCase(TestCase):
+    @staticmethod
+    def _per_path_pnl(right, K, vol, T, times, prices):
+        n_times, n_paths = prices.shape
+        pnls = []
+        for i_path in range(n_paths):
+            position = -BlackScholes(right, prices[0, i_path], K, vol, T - times[0]).delta
+            cash = -position * prices[0, i_path]
+            for i_time in range(1, n_times):
+                price = prices[i_time, i_path]
+                new_position = -BlackScholes(right, price, K, vol, T - times[i_time]).delta
+                cash -= (new_position - position) * price
+                position = new_position
+            terminal_price = prices[-1, i_path]
+            pnls.append(terminal_price * position + cash + right.intrinsic(terminal_price, K))
+        return np.asarray(pnls)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_matches_per_path_hedge(self, rng):
+        right = rng.choice(CALL, PUT)
+        K = rng.uniform(90, 110)
+        vol = rng.uniform(0.1, 0.5)
+        T = rng.uniform(0.1, 1.0)
+        n_time_steps, n_paths = 20, 30
+        times = np.linspace(0, T, n_time_steps + 1)
+        prices = 100.0 * np.exp(np.cumsum(rng.normal(size=(n_time_steps + 1, n_paths)) * 0.05, axis=0))
+        simulator = DeltaHedgeSimulator(right, K, vol, T)
+        np.testing.assert_allclose(
+            simulator.simulate(times, prices),
+            self._per_path_pnl(right, K, vol, T, times, prices),
+            atol=1e-9
+        )
+
+    @RandomisedTest(number_of_runs=5)
+    def test_blocks_match_full_grid(self, rng):
+        K = rng.uniform(90, 110)
+        T = rng.uniform(0.1, 1.0)
+        n_time_steps, n_paths = 20, 30
+        times = np.linspace(0, T, n_time_steps + 1)
+        bldr = LognormalPathsBuilder(prices=np.asarray([100.0]), times=times, rho_matrix=np.identity(1),
+                                     drifts=np.asarray([0.0]), vols=np.asarray([0.3]))
+        blocks = list(bldr.build_blocks(rng, n_paths, steps_per_block=rng.choice(1, 3, 7)))
+        prices = np.concatenate([block[0] for _, block in blocks], axis=0)
+        simulator = DeltaHedgeSimulator(CALL, K, 0.3, T)
+        np.testing.assert_allclose(
+            simulator.simulate_blocks((block_times, block[0]) for block_times, block in blocks),
+            simulator.simulate(times, prices),
+            atol=1e-9
+        )
+
+    @RandomisedTest(number_of_runs=5)
+    def test_put_hedge_error_matches_call(self, rng):
+        K = rng.uniform(90, 110)
+        vol = rng.uniform(0.1, 0.5)
+        T = rng.uniform(0.1, 1.0)
+        times = np.linspace(0, T, 51)
+        bldr = LognormalPathsBuilder(prices=np.asarray([100.0]), times=times, rho_matrix=np.identity(1),
+                                     drifts=np.asarray([0.0]), vols=np.asarray([vol]))
+        prices = bldr.build(rng, 1000).path[0]
+        call_pnl = DeltaHedgeSimulator(CALL, K, vol, T).simulate(times, prices)
+        put_pnl = DeltaHedgeSimulator(PUT, K, vol, T).simulate(times, prices)
+        # A hedged call less a hedged put is a forward hedged with one unit, so the two hedging
+        # errors differ only by the constant K - F0 on every path
+        np.testing.assert_allclose(put_pnl - call_pnl, K - prices[0], atol=1e-8)
+        self.assertAlmostEqual(put_pnl.std(), call_pnl.std(), delta=1e-8)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_costs_are_paid_from_pnl(self, rng):
+        right = rng.choice(CALL, PUT)
+        K = rng.uniform(90, 110)
+        T = rng.uniform(0.1, 1.0)
+        times = np.linspace(0, T, 21)
+        prices = 100.0 * np.exp(np.cumsum(rng.normal(size=(21, 30)) * 0.05, axis=0))
+        strategy = rng.choice(None, DeltaBandStrategy(0.05))
+        cost_model = TransactionCostModel(proportional_rate=0.001, fixed_cost=0.01, spread=0.002)
+        gross_pnl = DeltaHedgeSimulator(right, K, 0.3, T, strategy).simulate(times, prices)
+        pnl, costs = DeltaHedgeSimulator(right, K, 0.3, T, strategy, cost_model).simulate_with_costs(times, prices)
+        self.assertTrue(np.all(costs > 0))
+        np.testing.assert_allclose(pnl + costs, gross_pnl, atol=1e-9)
+
+        # The initial hedge alone, when the grid has no later times
+        _, initial_costs = DeltaHedgeSimulator(right, K, 0.3, T, strategy, cost_model).simulate_with_costs(
+            times[:1], prices[:1])
+        initial_position = DeltaHedgeSimulator(right, K, 0.3, T).deltas(prices[0], times[0])
+        np.testing.assert_allclose(initial_costs, cost_model.costs(prices[0], initial_position))
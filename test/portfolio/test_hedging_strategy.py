@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT, VectorBlackScholes
+from put_call_parity.portfolio.delta_hedge_simulator import DeltaHedgeSimulator
+from put_call_parity.portfolio.hedging_strategy import DeltaBandStrategy, TimeBasedStrategy, \
+    WhalleyWilmottStrategy, HedgeStep, LelandStrategy, GammaScaledBandStrategy
+from put_call_parity.process.vector_path_builder import LognormalPathsBuilder
+
+
+class HedgingStrategyTestCase(TestCase):
+    @staticmethod
+    def _prices(rng: RandomNumberGenerator, times: np.ndarray, n_paths: int, vol: float) -> np.ndarray:
+        bldr = LognormalPathsBuilder(prices=np.asarray([100.0]), times=times, rho_matrix=np.identity(1),
+                                     drifts=np.asarray([0.0]), vols=np.asarray([vol]))
+        return bldr.build(rng, n_paths).path[0]
+
+    @RandomisedTest(number_of_runs=5)
+    def test_zero_band_matches_every_step(self, rng: RandomNumberGenerator):
+        right = rng.choice(CALL, PUT)
+        K, vol, T = rng.uniform(90, 110), rng.uniform(0.1, 0.5), rng.uniform(0.1, 1.0)
+        times = np.linspace(0.0, T, 21)
+        prices = self._prices(rng, times, 50, vol)
+        every_step = DeltaHedgeSimulator(right, K, vol, T)
+        zero_band = DeltaHedgeSimulator(right, K, vol, T, DeltaBandStrategy(0.0))
+        np.testing.assert_allclose(every_step.simulate(times, prices), zero_band.simulate(times, prices), atol=1e-9)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_time_based_rehedge_times(self, rng: RandomNumberGenerator):
+        T = rng.uniform(0.1, 1.0)
+        n_intervals, steps_per_interval = rng.choice(2, 4, 5), rng.choice(3, 10)
+        times = np.linspace(0.0, T, n_intervals * steps_per_interval + 1)
+        prices = self._prices(rng, times, 50, 0.3)
+        simulator = DeltaHedgeSimulator(CALL, 100.0, 0.3, T, TimeBasedStrategy(T / n_intervals))
+        state = simulator.initial_state(times[0], prices[0])
+        rehedge_indices = []
+        for i_time in range(1, len(times)):
+            previous_position = state.position
+            state.rehedge(times[i_time:i_time + 1], prices[i_time:i_time + 1])
+            if np.any(state.position != previous_position):
+                rehedge_indices.append(i_time)
+                np.testing.assert_allclose(state.position, -simulator.deltas(prices[i_time], times[i_time]))
+        self.assertEqual([steps_per_interval * i for i in range(1, n_intervals + 1)], rehedge_indices)
+        np.testing.assert_array_equal(state.n_rehedges, n_intervals)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_bands_are_respected(self, rng: RandomNumberGenerator):
+        prices = np.asarray([rng.uniform(80, 120) for _ in range(100)])
+        bs = VectorBlackScholes(CALL, prices, 100.0, 0.3, 0.5)
+        positions = -bs.delta + np.asarray([rng.uniform(-0.2, 0.2) for _ in range(100)])
+        step = HedgeStep(0.1, 0.01, prices, positions, bs)
+
+        band = 0.1
+        new_positions = DeltaBandStrategy(band).rehedge(step)
+        outside = np.abs(positions - step.target_positions) > band
+        np.testing.assert_allclose(new_positions[outside], step.target_positions[outside])
+        np.testing.assert_allclose(new_positions[~outside], positions[~outside])
+
+        strategy = WhalleyWilmottStrategy(cost_rate=0.01, risk_aversion=1.0)
+        ww_band = np.cbrt(1.5 * 0.01 * prices * step.gamma ** 2)
+        deviations = strategy.rehedge(step) - step.target_positions
+        self.assertTrue(np.all(np.abs(deviations) <= ww_band + 1e-12))
+
+        self.assertEqual((100,), GammaScaledBandStrategy(1.0).rehedge(step).shape)
+
+    def test_leland_vol_increases_with_cost(self):
+        self.assertEqual(0.2, LelandStrategy(0.0).hedge_vol(0.2, 0.01))
+        self.assertGreater(LelandStrategy(0.01).hedge_vol(0.2, 0.01), 0.2)
+
+    def test_leland_vol_needs_positive_dt(self):
+        for dt in (0.0, np.asarray([0.01, 0.0])):
+            with self.assertRaises(AssertionError):
+                LelandStrategy(0.01).hedge_vol(0.2, dt)
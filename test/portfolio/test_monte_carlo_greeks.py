@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT
+from put_call_parity.portfolio.delta_hedge_simulator import DeltaHedgeSimulator
+from put_call_parity.portfolio.monte_carlo_greeks import PARAMETERS
+from put_call_parity.portfolio.option_with_fx_replication import OptionWithFXReplication
+
+
+class MonteCarloGreeksTestCase(TestCase):
+    @RandomisedTest(number_of_runs=5)
+    def test_pathwise_sensitivities_match_finite_differences(self, rng: RandomNumberGenerator):
+        right = rng.choice(CALL, PUT)
+        K, vol, T = rng.uniform(95, 105), rng.uniform(0.1, 0.5), rng.uniform(0.5, 1.0)
+        n_times, n_paths = 6, 20
+        # Stop short of expiry, where the hedge's gamma is unbounded
+        times = np.linspace(0, T * 0.9, n_times)
+        prices = 100.0 * np.exp(np.cumsum(rng.normal(size=(n_times, n_paths)) * 0.05, axis=0))
+        simulator = DeltaHedgeSimulator(right, K, vol, T)
+        pnl, price_derivatives, vol_derivatives = simulator.pathwise_sensitivities(times, prices)
+        np.testing.assert_allclose(pnl, simulator.simulate(times, prices), atol=1e-9)
+
+        h = 1e-5
+        for i_time in range(n_times):
+            up_prices, dn_prices = prices.copy(), prices.copy()
+            up_prices[i_time] += h
+            dn_prices[i_time] -= h
+            finite_difference = (simulator.simulate(times, up_prices) - simulator.simulate(times, dn_prices)) / (2 * h)
+            np.testing.assert_allclose(price_derivatives[i_time], finite_difference, atol=1e-5)
+        finite_difference = (DeltaHedgeSimulator(right, K, vol + h, T).simulate(times, prices)
+                             - DeltaHedgeSimulator(right, K, vol - h, T).simulate(times, prices)) / (2 * h)
+        np.testing.assert_allclose(vol_derivatives, finite_difference, atol=1e-4)
+
+    @staticmethod
+    def _replication(F=100.0, FX=1.1, F_vol=0.3, FX_vol=0.2, rho=-0.5):
+        return OptionWithFXReplication(CALL, 110.0, F, FX, F_vol, FX_vol, rho, 0.5)
+
+    @RandomisedTest(number_of_runs=3)
+    def test_pathwise_greeks_match_bumped_simulations(self, rng: RandomNumberGenerator):
+        seed = rng.randint(99999)
+        n_time_steps, n_paths = 20, 200
+        greeks = self._replication().simulation_greeks(RandomNumberGenerator(seed=seed), n_time_steps, n_paths)
+        base_parameters = dict(F=100.0, FX=1.1, F_vol=0.3, FX_vol=0.2, rho=-0.5)
+        h = 1e-5
+        for parameter in PARAMETERS:
+            def pnl(shift):
+                parameters = dict(base_parameters, **{parameter: base_parameters[parameter] + shift})
+                return self._replication(**parameters).simulation(RandomNumberGenerator(seed=seed), n_time_steps,
+                                                                  n_paths)
+            finite_difference = (pnl(h) - pnl(-h)) / (2 * h)
+            self.assertAlmostEqual(finite_difference.mean(), greeks.pathwise_greek(parameter), delta=1e-2)
+
+    def test_likelihood_ratio_agrees_with_pathwise(self):
+        n_paths = 20_000
+        greeks = self._replication().simulation_greeks(RandomNumberGenerator(seed=1234), 10, n_paths)
+        for parameter in PARAMETERS:
+            differences = greeks.likelihood_ratio[parameter] - greeks.pathwise[parameter]
+            std_err = differences.std() / np.sqrt(n_paths)
+            self.assertLess(abs(differences.mean()), 4 * std_err, parameter)
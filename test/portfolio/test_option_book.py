@@ -0,0 +1,103 @@
+import unittest
+
+from tp_quantity.quantity import Qty
+from tp_quantity.quantity_test_utils import QtyTestUtils
+from tp_quantity.uom import MT, USD, EUR, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT
+from put_call_parity.portfolio.option_book import OptionBook
+from put_call_parity.portfolio.tradeable import OptionTrade
+from put_call_parity.ref_data.commodity import WTI, Commodity
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+BRENT = Commodity("BRENT", USD / MT)
+TTF = Commodity("TTF", EUR / MT)
+
+
+class OptionBookTestCase(unittest.TestCase, QtyTestUtils):
+    @staticmethod
+    def _random_options(rng: RandomNumberGenerator) -> list[OptionTrade]:
+        return [
+            OptionTrade(
+                rng.choice(WTI, BRENT),
+                Qty(rng.uniform(-200, 200), MT),
+                rng.choice(CALL, PUT),
+                strike=Qty(rng.uniform(90, 110), USD / MT),
+                # Some already expired, so worth intrinsic
+                expiry_time=rng.uniform(-0.1, 1.0)
+            )
+            for _ in range(50)
+        ]
+
+    @RandomisedTest(number_of_runs=20)
+    def test_matches_option_trades(self, rng: RandomNumberGenerator):
+        options = self._random_options(rng)
+        vc = ValuationContext(
+            valuation_ccy=USD,
+            time=0.0,
+            commodity_prices={c: Qty(rng.uniform(95, 105), USD / MT) for c in [WTI, BRENT]},
+            commodity_vols={c: Qty(rng.uniform(0.1, 0.5), SCALAR) for c in [WTI, BRENT]},
+        )
+        book = OptionBook.from_trades(options)
+        self.assertVeryClose(Qty.sum([t.value(vc) for t in options]), book.value(vc))
+        self.assertVeryClose(Qty.sum([t.theta(vc) for t in options]), book.theta(vc))
+        for commodity in [WTI, BRENT]:
+            self.assertVeryClose(Qty.sum([t.delta(vc, commodity) for t in options]), book.delta(vc, commodity))
+            self.assertVeryClose(Qty.sum([t.gamma(vc, commodity) for t in options]), book.gamma(vc, commodity))
+        self.assertEqual(Qty(0, MT), book.delta(vc, Commodity("GASOIL", USD / MT)))
+
+    @RandomisedTest(number_of_runs=20)
+    def test_foreign_commodities_match_option_trades(self, rng: RandomNumberGenerator):
+        options = [
+            OptionTrade(
+                commodity,
+                Qty(rng.uniform(-200, 200), MT),
+                rng.choice(CALL, PUT),
+                strike=Qty(rng.uniform(90, 110), commodity.price_uom),
+                expiry_time=rng.uniform(0.1, 1.0)
+            )
+            for commodity in [rng.choice(WTI, TTF) for _ in range(20)]
+        ]
+        vc = ValuationContext(
+            valuation_ccy=USD,
+            time=0.0,
+            fx_rates={OrderedFxPair(EUR, USD): Qty(rng.uniform(1.0, 1.2), USD / EUR)},
+            commodity_prices={c: Qty(rng.uniform(95, 105), c.price_uom) for c in [WTI, TTF]},
+            commodity_vols={c: Qty(rng.uniform(0.1, 0.5), SCALAR) for c in [WTI, TTF]},
+        )
+        book = OptionBook.from_trades(options)
+        self.assertVeryClose(Qty.sum([t.value(vc) for t in options]), book.value(vc))
+        self.assertVeryClose(Qty.sum([t.theta(vc) for t in options]), book.theta(vc))
+        for commodity in [WTI, TTF]:
+            self.assertVeryClose(
+                Qty.sum([t.delta(vc, commodity) for t in options if t.commodity == commodity] or [Qty(0, MT)]),
+                book.delta(vc, commodity)
+            )
+
+    @RandomisedTest(number_of_runs=20)
+    def test_delta_matches_finite_difference(self, rng: RandomNumberGenerator):
+        options = [o for o in self._random_options(rng) if o.expiry_time > 0.05]
+        vc = ValuationContext(
+            valuation_ccy=USD,
+            time=0.0,
+            commodity_prices={c: Qty(rng.uniform(95, 105), USD / MT) for c in [WTI, BRENT]},
+            commodity_vols={c: Qty(rng.uniform(0.1, 0.5), SCALAR) for c in [WTI, BRENT]},
+        )
+        book = OptionBook.from_trades(options)
+        dP = Qty(1e-4, USD / MT)
+        for commodity in [WTI, BRENT]:
+            price = vc.price(commodity)
+            value_up = book.value(vc.with_price(commodity, price + dP))
+            value_down = book.value(vc.with_price(commodity, price - dP))
+            numeric_delta = (value_up - value_down).checked_value(USD) / (2 * dP.checked_value(USD / MT))
+            self.assertAlmostEqual(numeric_delta, book.delta(vc, commodity).checked_value(MT), delta=1e-4)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_round_trip(self, rng: RandomNumberGenerator):
+        options = self._random_options(rng)
+        for original, round_tripped in zip(options, OptionBook.from_trades(options).to_trades()):
+            self.assertTrue(original.is_nettable(round_tripped))
+            self.assertEqual(original.amount, round_tripped.amount)
@@ -1,10 +1,15 @@
 import unittest
+from unittest import mock
 
+from put_call_parity.models import CALL, PUT
 from put_call_parity.portfolio.portfolio import Portfolio
-from put_call_parity.portfolio.tradeable import CommodityTrade
+from put_call_parity.portfolio.tradeable import CommodityTrade, OptionTrade, Cash
 from put_call_parity.ref_data.commodity import Commodity, WTI
+from put_call_parity.ref_data.currency import Currency
+from put_call_parity.valuation_context.valuation_context import ValuationContext
 from tp_quantity.quantity import Qty
-from tp_quantity.uom import USD, MT
+from tp_quantity.uom import USD, MT, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
 from tp_random_tests.random_test_case import RandomisedTest
 
 
@@ -18,4 +23,115 @@ class PortfolioTestCase(unittest.TestCase):
         self.assertEqual(
             tradeable.amount,
             portfolio.volume(WTI)
-        )
\ No newline at end of file
+        )
+
+    @RandomisedTest(number_of_runs=10)
+    def test_bulk_netting(self, rng: RandomNumberGenerator):
+        strikes = [Qty(k, USD / MT) for k in [90, 100, 110]]
+        fills = [
+            OptionTrade(WTI, Qty(rng.uniform(-10, 10), MT), rng.choice(CALL, PUT), rng.choice(*strikes), 1.0)
+            for _ in range(200)
+        ] + [CommodityTrade(WTI, Qty(rng.uniform(-10, 10), MT)) for _ in range(50)] + \
+            [Cash(Qty(rng.uniform(-10, 10), USD)) for _ in range(50)]
+        portfolio = Portfolio.empty()
+        portfolio.add_all(fills)
+
+        self.assertEqual(8, len(portfolio))
+        for trade in portfolio:
+            expected = sum(f.amount.value for f in fills if f.is_nettable(trade))
+            self.assertAlmostEqual(expected, trade.amount.value, delta=1e-9)
+        self.assertAlmostEqual(
+            sum(f.amount.value for f in fills if isinstance(f, Cash)),
+            portfolio.volume(Currency(USD)).checked_value(USD),
+            delta=1e-9
+        )
+        self.assertIsNone(portfolio.volume(Commodity("BRENT", USD / MT)))
+
+    @RandomisedTest(number_of_runs=10)
+    def test_delta_follows_trades(self, rng: RandomNumberGenerator):
+        vc = ValuationContext(
+            USD, time=0.0,
+            commodity_prices={WTI: Qty(rng.uniform(90, 110), USD / MT)},
+            commodity_vols={WTI: Qty(rng.uniform(0.1, 0.5), SCALAR)},
+        )
+        option = OptionTrade(WTI, Qty(rng.uniform(10, 100), MT), rng.choice(CALL, PUT), Qty(100, USD / MT), 1.0)
+        portfolio = Portfolio([option])
+        delta = portfolio.delta(vc, WTI)
+        self.assertAlmostEqual(option.delta(vc, WTI).checked_value(MT), delta.checked_value(MT), delta=1e-9)
+
+        hedged = portfolio + CommodityTrade(WTI, -option.delta(vc, WTI))
+        self.assertEqual(1, len(portfolio))
+        self.assertAlmostEqual(delta.checked_value(MT), portfolio.delta(vc, WTI).checked_value(MT), delta=1e-9)
+        self.assertAlmostEqual(0.0, hedged.delta(vc, WTI).checked_value(MT), delta=1e-9)
+
+        portfolio += CommodityTrade(WTI, Qty(1, MT))
+        self.assertAlmostEqual(delta.checked_value(MT) + 1, portfolio.delta(vc, WTI).checked_value(MT), delta=1e-9)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_addition_leaves_original_unchanged(self, rng: RandomNumberGenerator):
+        strikes = [Qty(k, USD / MT) for k in [90, 100, 110]]
+
+        def random_trade():
+            return rng.choice(
+                OptionTrade(WTI, Qty(rng.uniform(-10, 10), MT), rng.choice(CALL, PUT), rng.choice(*strikes), 1.0),
+                CommodityTrade(WTI, Qty(rng.uniform(-10, 10), MT)),
+                Cash(Qty(rng.uniform(-10, 10), USD)),
+            )
+
+        def amounts(trades):
+            netted = {}
+            for trade in trades:
+                key = trade.netting_key
+                netted[key] = netted[key] + trade.amount.value if key in netted else trade.amount.value
+            return netted
+
+        portfolios = [(Portfolio.empty(), [])]
+        for _ in range(100):
+            i_portfolio = rng.randint(len(portfolios))
+            portfolio, fills = portfolios[i_portfolio]
+            trade = random_trade()
+            if rng.uniform() < 0.5:
+                portfolios.append((portfolio + trade, fills + [trade]))
+            else:
+                portfolio += trade
+                portfolios[i_portfolio] = (portfolio, fills + [trade])
+            portfolio, fills = rng.choice(*portfolios)
+            expected = amounts(fills)
+            self.assertEqual(len(expected), len(portfolio))
+            for trade in portfolio:
+                self.assertAlmostEqual(expected[trade.netting_key], trade.amount.value, delta=1e-9)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_netting_key_matches_is_nettable(self, rng: RandomNumberGenerator):
+        def random_option():
+            return OptionTrade(
+                rng.choice(WTI, Commodity("BRENT", USD / MT)),
+                Qty(rng.uniform(-10, 10), MT),
+                rng.choice(CALL, PUT),
+                Qty(rng.choice(90, 100), USD / MT),
+                rng.choice(0.5, 1.0)
+            )
+
+        for _ in range(20):
+            option, other = random_option(), random_option()
+            self.assertEqual(option.is_nettable(other), option.netting_key == other.netting_key)
+            if option.is_nettable(other):
+                self.assertEqual(hash(option.netting_key), hash(other.netting_key))
+
+    @RandomisedTest(number_of_runs=10)
+    def test_risk_prices_each_option_once(self, rng: RandomNumberGenerator):
+        vc = ValuationContext(
+            USD, time=0.0,
+            commodity_prices={WTI: Qty(rng.uniform(90, 110), USD / MT)},
+            commodity_vols={WTI: Qty(rng.uniform(0.1, 0.5), SCALAR)},
+        )
+        options = [
+            OptionTrade(WTI, Qty(rng.uniform(10, 100), MT), right, Qty(strike, USD / MT), 1.0)
+            for right, strike in [(CALL, 90), (PUT, 100), (CALL, 110)]
+        ]
+        portfolio = Portfolio(options + [CommodityTrade(WTI, Qty(-10, MT)), Cash(Qty(100, USD))])
+        with mock.patch.object(OptionTrade, "_model", autospec=True, side_effect=OptionTrade._model) as model:
+            risk = portfolio.risk(vc, WTI)
+        self.assertEqual(len(options), model.call_count)
+        self.assertAlmostEqual(portfolio.value(vc).checked_value(USD), risk.value.checked_value(USD), delta=1e-9)
+        self.assertAlmostEqual(portfolio.delta(vc, WTI).checked_value(MT), risk.delta.checked_value(MT), delta=1e-9)
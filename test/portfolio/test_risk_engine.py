@@ -0,0 +1,69 @@
+import unittest
+
+from tp_quantity.quantity import Qty
+from tp_quantity.quantity_test_utils import QtyTestUtils
+from tp_quantity.uom import MT, USD, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT
+from put_call_parity.portfolio.risk_engine import NumericRiskEngine
+from put_call_parity.portfolio.tradeable import OptionTrade, Cash, CommodityTrade
+from put_call_parity.ref_data.commodity import WTI, Commodity
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+BRENT = Commodity("BRENT", USD / MT)
+
+
+class NumericRiskEngineTestCase(unittest.TestCase, QtyTestUtils):
+    @staticmethod
+    def _random_trades(rng: RandomNumberGenerator) -> list:
+        options = [
+            OptionTrade(
+                rng.choice(WTI, BRENT),
+                Qty(rng.uniform(-200, 200), MT),
+                rng.choice(CALL, PUT),
+                strike=Qty(rng.uniform(95, 105), USD / MT),
+                expiry_time=rng.uniform(0.1, 1.0)
+            )
+            for _ in range(10)
+        ]
+        return options + [CommodityTrade(WTI, Qty(rng.uniform(-100, 100), MT)), Cash(Qty(rng.uniform(-10, 10), USD))]
+
+    @staticmethod
+    def _random_vc(rng: RandomNumberGenerator) -> ValuationContext:
+        return ValuationContext(
+            valuation_ccy=USD,
+            time=0.0,
+            commodity_prices={c: Qty(rng.uniform(95, 105), USD / MT) for c in [WTI, BRENT]},
+            commodity_vols={c: Qty(rng.uniform(0.1, 0.5), SCALAR) for c in [WTI, BRENT]},
+        )
+
+    @RandomisedTest(number_of_runs=10)
+    def test_matches_per_trade_numeric_risk(self, rng: RandomNumberGenerator):
+        trades = self._random_trades(rng)
+        vc = self._random_vc(rng)
+        dt = 0.001
+        risk = NumericRiskEngine([WTI, BRENT], dt=dt).risk(trades, vc)
+        self.assertVeryClose(Qty.sum([t.value(vc) for t in trades]), risk.value)
+        for commodity in [WTI, BRENT]:
+            self.assertVeryClose(Qty.sum([t.numeric_delta(vc, commodity) for t in trades]), risk.delta(commodity))
+            self.assertVeryClose(Qty.sum([t.numeric_gamma(vc, commodity) for t in trades]), risk.gamma(commodity),
+                                 delta=Qty(1e-4, MT * MT / USD))
+            self.assertVeryClose(Qty.sum([t.numeric_vega(vc, commodity) for t in trades]), risk.vega(commodity))
+        self.assertVeryClose(Qty.sum([t.numeric_theta(vc, dt) for t in trades]), risk.theta)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_cross_gammas(self, rng: RandomNumberGenerator):
+        trades = self._random_trades(rng)
+        vc = self._random_vc(rng)
+        risk = NumericRiskEngine([WTI, BRENT], cross_gammas=True).risk(trades, vc)
+        # No trade depends on both prices
+        self.assertVeryClose(Qty(0, MT * MT / USD), risk.cross_gamma(WTI, BRENT), delta=Qty(1e-4, MT * MT / USD))
+        self.assertEqual(risk.cross_gamma(WTI, BRENT), risk.cross_gamma(BRENT, WTI))
+        self.assertEqual(risk.gamma(WTI), risk.cross_gamma(WTI, WTI))
+
+    def test_scenario_count(self):
+        scenarios = NumericRiskEngine([WTI, BRENT], dt=0.01).scenarios(self._random_vc(RandomNumberGenerator(seed=1)))
+        # base, 2 per price, 1 per vol and 1 for time
+        self.assertEqual(8, scenarios.n_scenarios)
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from tp_quantity.quantity import Qty
+from tp_quantity.uom import MT, USD, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT
+from put_call_parity.portfolio.risk_ladder import RiskLadder, PriceShifts, VolShifts, TimeShifts
+from put_call_parity.portfolio.tradeable import OptionTrade, CommodityTrade, Cash
+from put_call_parity.ref_data.commodity import WTI
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+
+class RiskLadderTestCase(unittest.TestCase):
+    @RandomisedTest(number_of_runs=5)
+    def test_matches_scalar_valuation(self, rng: RandomNumberGenerator):
+        vc = ValuationContext(
+            valuation_ccy=USD,
+            time=0.1,
+            commodity_prices={WTI: Qty(rng.uniform(95, 105), USD / MT)},
+            commodity_vols={WTI: Qty(rng.uniform(0.1, 0.5), SCALAR)},
+        )
+        option = OptionTrade(
+            WTI,
+            Qty(rng.uniform(100, 200), MT),
+            rng.choice(CALL, PUT),
+            strike=Qty(rng.uniform(95, 105), USD / MT),
+            expiry_time=rng.uniform(0.5, 1.0)
+        )
+        trades = [option, CommodityTrade(WTI, Qty(rng.uniform(-100, 100), MT)), Cash(Qty(rng.uniform(), USD))]
+        price_shifts, vol_shifts, time_shifts = [-5.0, 0.0, 5.0], [-0.05, 0.0, 0.05, 0.1], [0.0, 0.2]
+        ladder = RiskLadder([PriceShifts(WTI, price_shifts), VolShifts(WTI, vol_shifts), TimeShifts(time_shifts)])
+        grid = ladder.evaluate(trades, vc)
+        self.assertEqual((3, 4, 2), grid.value.shape)
+        for i, dP in enumerate(price_shifts):
+            for j, dVol in enumerate(vol_shifts):
+                for k, dt in enumerate(time_shifts):
+                    shifted_vc = vc.shift_price(WTI, Qty(dP, USD / MT)).shift_vol(WTI, Qty(dVol, SCALAR))
+                    shifted_vc = shifted_vc.copy(time=vc.time + dt)
+                    self.assertAlmostEqual(
+                        sum(t.value(shifted_vc).checked_value(USD) for t in trades), grid.value[i, j, k], delta=1e-9)
+                    self.assertAlmostEqual(
+                        sum(t.delta(shifted_vc, WTI).checked_value(MT) for t in trades), grid.delta(WTI)[i, j, k],
+                        delta=1e-9)
+                    self.assertAlmostEqual(
+                        option.gamma(shifted_vc, WTI).checked_value(MT * MT / USD), grid.gamma(WTI)[i, j, k],
+                        delta=1e-9)
+                    self.assertAlmostEqual(
+                        option.theta(shifted_vc).checked_value(USD), grid.theta[i, j, k], delta=1e-9)
+
+        at_time = grid.value.sel({"time": 0.2, "WTI vol": 0.05})
+        self.assertEqual(["WTI price"], at_time.dims)
+        np.testing.assert_array_equal(at_time.values, grid.value[:, 2, 1])
@@ -1,10 +1,13 @@
 import unittest
+from unittest import mock
 
+import numpy as np
 from tp_quantity.quantity_test_utils import QtyTestUtils
 
-from put_call_parity.models import CALL
+from put_call_parity.models import CALL, PUT
 from put_call_parity.portfolio.tradeable import OptionTrade
 from put_call_parity.ref_data.commodity import WTI
+from put_call_parity.valuation_context.batch_valuation_context import BatchValuationContext
 from put_call_parity.valuation_context.valuation_context import ValuationContext
 from tp_quantity.quantity import Qty
 from tp_quantity.uom import MT, USD, SCALAR
@@ -71,3 +74,75 @@ class TradeableTestCase(unittest.TestCase, QtyTestUtils):
         numeric_theta = option.numeric_theta(vc, dt)
         tol = (option.value(vc) * 0.001).max(numeric_theta.abs * 0.001)
         self.assertVeryClose(bs_theta, numeric_theta, delta=tol)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_batch_and_scalar_routing(self, rng: RandomNumberGenerator):
+        n_scenarios = 4
+        prices = [rng.uniform(95, 105) for _ in range(n_scenarios)]
+        vols = [rng.uniform(0.1, 0.5) for _ in range(n_scenarios)]
+        batch_vc = BatchValuationContext(
+            valuation_ccy=USD,
+            n_scenarios=n_scenarios,
+            time=0.0,
+            commodity_prices={WTI: prices},
+            commodity_vols={WTI: vols},
+        )
+        for right in (CALL, PUT):
+            option = OptionTrade(
+                WTI,
+                Qty(rng.uniform(100, 200), MT),
+                right,
+                strike=Qty(rng.uniform(95, 105), USD / MT),
+                expiry_time=rng.uniform(0.1, 0.5)
+            )
+            batch_risks = [option.value(batch_vc), option.delta(batch_vc, WTI), option.gamma(batch_vc, WTI),
+                           option.theta(batch_vc)]
+            for batch_risk in batch_risks:
+                self.assertIsInstance(batch_risk, np.ndarray)
+                self.assertEqual(batch_risk.shape, (n_scenarios,))
+            for i in range(n_scenarios):
+                vc = ValuationContext(
+                    valuation_ccy=USD,
+                    time=0.0,
+                    commodity_prices={WTI: Qty(prices[i], USD / MT)},
+                    commodity_vols={WTI: Qty(vols[i], SCALAR)},
+                )
+                scalar_risks = [
+                    option.value(vc).checked_value(USD),
+                    option.delta(vc, WTI).checked_value(MT),
+                    option.gamma(vc, WTI).checked_value(MT * MT / USD),
+                    option.theta(vc).checked_value(USD),
+                ]
+                for batch_risk, scalar_risk in zip(batch_risks, scalar_risks):
+                    self.assertAlmostEqual(batch_risk[i], scalar_risk, delta=1e-9 * max(1.0, abs(scalar_risk)))
+
+    @RandomisedTest(number_of_runs=10)
+    def test_risk_prices_once(self, rng: RandomNumberGenerator):
+        option = OptionTrade(
+            WTI,
+            Qty(rng.uniform(100, 200), MT),
+            rng.choice(CALL, PUT),
+            strike=Qty(rng.uniform(95, 105), USD / MT),
+            expiry_time=rng.uniform(0.1, 0.5)
+        )
+        vc = ValuationContext(
+            valuation_ccy=USD,
+            time=0.0,
+            commodity_prices={WTI: Qty(rng.uniform(95, 105), USD / MT)},
+            commodity_vols={WTI: Qty(rng.uniform(0.1, 0.5), SCALAR)},
+        )
+        batch_vc = BatchValuationContext.from_context(vc, 3)
+        for context in (vc, batch_vc):
+            with mock.patch.object(OptionTrade, "_model", autospec=True, side_effect=OptionTrade._model) as model:
+                risk = option.risk(context, WTI)
+            self.assertEqual(1, model.call_count)
+            for risk_value, single_value in [
+                (risk.value, option.value(context)),
+                (risk.delta, option.delta(context, WTI)),
+                (risk.gamma, option.gamma(context, WTI)),
+                (risk.theta, option.theta(context)),
+            ]:
+                if context is vc:
+                    self.assertVeryClose(single_value, risk_value)
+                else:
+                    np.testing.assert_allclose(single_value, risk_value)
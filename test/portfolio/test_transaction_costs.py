@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel, LinearImpact, SquareRootImpact
+
+
+class TransactionCostModelTestCase(TestCase):
+    @RandomisedTest(number_of_runs=10)
+    def test_matches_scalar_costs(self, rng: RandomNumberGenerator):
+        rate, fixed, spread = rng.uniform(0, 0.01), rng.uniform(0, 1), rng.uniform(0, 0.02)
+        impact_coefficient = rng.uniform(0, 0.001)
+        impact = rng.choice(None, LinearImpact(impact_coefficient), SquareRootImpact(impact_coefficient))
+        model = TransactionCostModel(rate, fixed, spread, impact)
+        prices = np.asarray([rng.uniform(50, 150) for _ in range(20)])
+        quantities = np.asarray([rng.choice(0.0, rng.uniform(-2, 2)) for _ in range(20)])
+        for price, quantity, cost in zip(prices, quantities, model.costs(prices, quantities)):
+            q = abs(quantity)
+            expected = (rate + spread / 2) * q * price + (fixed if q > 0 else 0.0)
+            if isinstance(impact, LinearImpact):
+                expected += impact_coefficient * price * q * q
+            elif isinstance(impact, SquareRootImpact):
+                expected += impact_coefficient * price * q ** 1.5
+            self.assertAlmostEqual(expected, cost, delta=1e-9)
+
+    def test_no_trade_costs_nothing(self):
+        model = TransactionCostModel(0.01, 1.0, 0.02, LinearImpact(0.1))
+        np.testing.assert_array_equal(model.costs(np.full(3, 100.0), np.zeros(3)), np.zeros(3))
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_maths.random.random_correlation_matrix import RandomCorrelationMatrix
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.process.correlation import CorrelationFactorisationCache, left_correlating_matrix, \
+    nearest_correlation_matrix
+
+
+class CorrelationTestCase(TestCase):
+    @RandomisedTest(number_of_runs=10)
+    def test_factorisation(self, rng: RandomNumberGenerator):
+        rho = RandomCorrelationMatrix.truly_random(rng, 1 + rng.randint(5))
+        L = left_correlating_matrix(rho)
+        np.testing.assert_allclose(L @ L.T, rho, atol=1e-10)
+
+    def test_semi_definite_factorisation(self):
+        rho = np.ones((3, 3))
+        L = left_correlating_matrix(rho)
+        np.testing.assert_allclose(L @ L.T, rho, atol=1e-10)
+
+    def test_invalid_matrix_is_repaired(self):
+        rho = np.asarray([
+            [1.0, 0.9, 0.9],
+            [0.9, 1.0, -0.9],
+            [0.9, -0.9, 1.0],
+        ])
+        repaired = nearest_correlation_matrix(rho)
+        np.testing.assert_allclose(np.diag(repaired), np.ones(3), atol=1e-10)
+        self.assertGreater(np.linalg.eigvalsh(repaired).min(), -1e-8)
+        L = left_correlating_matrix(rho)
+        np.testing.assert_allclose(L @ L.T, repaired, atol=1e-6)
+
+    def test_cache_eviction(self):
+        cache = CorrelationFactorisationCache(max_size=2)
+        rhos = [np.asarray([[1.0, r], [r, 1.0]]) for r in [0.1, 0.2, 0.3]]
+        first = cache.left_correlating_matrix(rhos[0])
+        self.assertIs(first, cache.left_correlating_matrix(rhos[0].copy()))
+        cache.left_correlating_matrix(rhos[1])
+        cache.left_correlating_matrix(rhos[2])
+        self.assertEqual(2, len(cache))
+        self.assertIsNot(first, cache.left_correlating_matrix(rhos[0]))
@@ -0,0 +1,37 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.process.path_store import PathStore
+from put_call_parity.process.vector_path_builder import LognormalPathsBuilder
+
+
+class PathStoreTestCase(TestCase):
+    @RandomisedTest(number_of_runs=3)
+    def test_round_trip(self, rng: RandomNumberGenerator):
+        times = np.linspace(0.0, 1.0, 9)
+        rho = rng.uniform(-0.9, 0.9)
+        bldr = LognormalPathsBuilder(
+            prices=np.asarray([100.0, 1.2]),
+            times=times,
+            rho_matrix=np.asarray([[1.0, rho], [rho, 1.0]]),
+            drifts=np.zeros(2),
+            vols=np.asarray([0.3, 0.1]),
+        )
+        seed = rng.randint(99999)
+        with tempfile.TemporaryDirectory() as directory:
+            store = PathStore.write_from_builder(Path(directory) / "paths", bldr, seed, n_paths=101, steps_per_block=4)
+            expected = np.concatenate(
+                [block for _, block in bldr.build_blocks(RandomNumberGenerator(seed=seed), 101, steps_per_block=4)],
+                axis=1
+            )
+            vector_path = store.open()
+            np.testing.assert_array_equal(times, vector_path.times)
+            np.testing.assert_array_equal(expected, vector_path.path)
+            self.assertEqual(seed, store.metadata["seed"])
+            self.assertAlmostEqual(rho, store.metadata["rho_matrix"][0][1], delta=1e-12)
+            del vector_path
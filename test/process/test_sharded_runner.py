@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT
+from put_call_parity.portfolio.option_with_fx_replication import OptionWithFXReplication
+from put_call_parity.process.sharded_runner import ShardedMonteCarloRunner
+
+
+def _normal_simulation(rng: RandomNumberGenerator, n_paths: int) -> np.ndarray:
+    return rng.normal(size=n_paths)
+
+
+class ShardedMonteCarloRunnerTestCase(TestCase):
+    @RandomisedTest(number_of_runs=3)
+    def test_independent_of_worker_count(self, rng: RandomNumberGenerator):
+        seed = rng.randint(99999)
+        n_paths = 1000 + rng.randint(1000)
+        single = ShardedMonteCarloRunner(seed, paths_per_shard=300, max_workers=1).run(_normal_simulation, n_paths)
+        pooled = ShardedMonteCarloRunner(seed, paths_per_shard=300, max_workers=2).run(_normal_simulation, n_paths)
+        self.assertEqual((n_paths,), single.shape)
+        np.testing.assert_array_equal(single, pooled)
+
+    @RandomisedTest(number_of_runs=3)
+    def test_statistics_match_samples(self, rng: RandomNumberGenerator):
+        runner = ShardedMonteCarloRunner(rng.randint(99999), paths_per_shard=300, max_workers=1)
+        n_paths = 1000 + rng.randint(1000)
+        samples = runner.run(_normal_simulation, n_paths)
+        statistics = runner.run_statistics(_normal_simulation, n_paths)
+        self.assertEqual(n_paths, statistics.n)
+        self.assertAlmostEqual(samples.mean(), statistics.mean, delta=1e-12)
+        self.assertAlmostEqual(samples.std() / np.sqrt(n_paths), statistics.std_err, delta=1e-12)
+
+    @RandomisedTest(number_of_runs=3)
+    def test_shards_simulate_one_model(self, rng: RandomNumberGenerator):
+        replication = OptionWithFXReplication(rng.choice(CALL, PUT), 110.0, 100.0, 1.1, 0.3, 0.2, -0.5, 0.5)
+        simulation = replication.path_simulation(rng, n_time_steps=10)
+        runner = ShardedMonteCarloRunner(rng.randint(99999), paths_per_shard=50, max_workers=1)
+        sharded = runner.run(simulation, 120)
+        # Each shard is the one model's simulation of its own paths
+        expected = np.concatenate([
+            replication.hedge_simulator.simulate(
+                simulation.args[0].times,
+                replication._hedged_prices(simulation.args[0].build(RandomNumberGenerator(seed=seed), n).path)
+            )
+            for seed, n in zip(runner.shard_seeds(3), runner.shard_sizes(120))
+        ])
+        np.testing.assert_array_equal(expected, sharded)
@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.process.sobol_path_builder import SobolBrownianPathBuilder, BROWNIAN_BRIDGE, PCA
+from put_call_parity.process.vector_path_builder import LognormalPathsBuilder
+
+
+class SobolBrownianPathBuilderTestCase(TestCase):
+    @RandomisedTest(number_of_runs=5)
+    def test_covariance(self, rng: RandomNumberGenerator):
+        times = np.cumsum([rng.uniform(0.05, 0.5) for _ in range(7)])
+        bldr = SobolBrownianPathBuilder(times, n_factors=2, construction=rng.choice(BROWNIAN_BRIDGE, PCA))
+        path = bldr.build(rng, n_paths=4096).path
+        self.assertEqual((2, 7, 4096), path.shape)
+        for i_factor in range(2):
+            np.testing.assert_allclose(np.cov(path[i_factor]), np.minimum.outer(times, times), atol=0.05)
+        np.testing.assert_allclose(np.mean(path[0] * path[1], axis=1), np.zeros(7), atol=0.05)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_lognormal_forward_is_recovered(self, rng: RandomNumberGenerator):
+        vol = rng.uniform(0.1, 0.5)
+        times = np.linspace(0.0, 1.0, 13)
+        bldr = LognormalPathsBuilder(
+            prices=np.asarray([100.0]),
+            times=times,
+            rho_matrix=np.identity(1),
+            drifts=np.asarray([0.0]),
+            vols=np.asarray([vol]),
+            brownian_bldr=SobolBrownianPathBuilder(times, n_factors=1)
+        )
+        terminal_prices = bldr.build(rng, n_paths=1024).path[0, -1]
+        self.assertAlmostEqual(100.0, terminal_prices.mean(), delta=0.2)
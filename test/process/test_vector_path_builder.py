@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+import numpy as np
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.process.vector_path_builder import BrownianPathBuilder
+
+
+class BrownianPathBuilderTestCase(TestCase):
+    @RandomisedTest(number_of_runs=5)
+    def test_odd_number_of_paths(self, rng: RandomNumberGenerator):
+        times = np.asarray([0.1, 0.25, 0.5, 1.0])
+        n_paths = 2 * rng.randint(100) + 1
+        path = BrownianPathBuilder(times, n_factors=2).build(rng, n_paths).path
+        self.assertEqual((2, 4, n_paths), path.shape)
+        half = n_paths // 2
+        np.testing.assert_allclose(path[:, :, :half], -path[:, :, half:2 * half])
+
+    @RandomisedTest(number_of_runs=5)
+    def test_variance(self, rng: RandomNumberGenerator):
+        times = np.asarray([0.0, 0.25, 0.5, 1.0])
+        dtype = rng.choice(np.float32, np.float64)
+        n_paths = 40_000
+        path = BrownianPathBuilder(times, n_factors=1).build(rng, n_paths, dtype=dtype).path
+        self.assertEqual(dtype, path.dtype)
+        variances = path[0].var(axis=1)
+        np.testing.assert_allclose(variances, times, atol=4 * np.sqrt(2 / n_paths) * times.max())
+
+    @RandomisedTest(number_of_runs=5)
+    def test_blocks_unaffected_by_consumer(self, rng: RandomNumberGenerator):
+        times = np.linspace(0.1, 1.0, 10)
+        seed = rng.randint(1000)
+        bldr = BrownianPathBuilder(times, n_factors=2)
+        expected = np.concatenate(
+            [block.copy() for _, block in bldr.build_blocks(RandomNumberGenerator(seed=seed), 11, steps_per_block=3)],
+            axis=1
+        )
+        blocks = []
+        for _, block in bldr.build_blocks(RandomNumberGenerator(seed=seed), 11, steps_per_block=3):
+            blocks.append(block.copy())
+            block *= 2.0
+        np.testing.assert_array_equal(expected, np.concatenate(blocks, axis=1))
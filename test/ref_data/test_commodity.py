@@ -0,0 +1,34 @@
+import gc
+import pickle
+import unittest
+import weakref
+
+from tp_quantity.uom import USD, MT, EUR
+
+from put_call_parity.ref_data.commodity import Commodity, WTI
+from put_call_parity.ref_data.currency import Currency
+
+
+class CommodityTestCase(unittest.TestCase):
+    def test_interned(self):
+        self.assertIs(WTI, Commodity("WTI", USD / MT))
+        self.assertIsNot(WTI, Commodity("WTI", EUR / MT))
+        self.assertNotEqual(WTI, Commodity("WTI", EUR / MT))
+        self.assertIs(Currency(USD), Currency(USD))
+        self.assertNotEqual(Currency(USD), Currency(EUR))
+
+    def test_pickling_preserves_identity(self):
+        self.assertIs(WTI, pickle.loads(pickle.dumps(WTI)))
+        self.assertIs(Currency(USD), pickle.loads(pickle.dumps(Currency(USD))))
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            WTI.name = "BRENT"
+        with self.assertRaises(AttributeError):
+            Currency(USD).ccy = EUR
+
+    def test_unreferenced_commodities_are_collected(self):
+        commodity_ref = weakref.ref(Commodity("AD_HOC", USD / MT))
+        gc.collect()
+        self.assertIsNone(commodity_ref())
+        self.assertEqual(Commodity("AD_HOC", USD / MT), Commodity("AD_HOC", USD / MT))
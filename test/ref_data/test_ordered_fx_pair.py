@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
@@ -10,3 +11,11 @@ class OrderedFXPairTestCase(unittest.TestCase):
             pair = OrderedFxPair.from_uom(uom)
             self.assertEqual(uom, pair.uom)
 
+
+    def test_interned_and_immutable(self):
+        pair = OrderedFxPair(EUR, USD)
+        self.assertIs(pair, OrderedFxPair(EUR, USD))
+        self.assertIs(pair, pair.inverse.inverse)
+        self.assertIs(pair, pickle.loads(pickle.dumps(pair)))
+        with self.assertRaises(AttributeError):
+            pair.from_ccy = USD
@@ -1,12 +1,15 @@
 import unittest
+from unittest import mock
 
 import numpy as np
 from tp_maths.vector_path.vector_path import VectorPath
 
-from put_call_parity.models import CALL
+from put_call_parity.models import CALL, PUT
 from put_call_parity.portfolio.tradeable import OptionTrade
+from put_call_parity.portfolio.transaction_costs import TransactionCostModel
 from put_call_parity.ref_data.commodity import WTI
-from put_call_parity.replicator.vanilla_option_replicator import VanillaOptionPortfolio, VanillaOptionReplicator
+from put_call_parity.replicator.vanilla_option_replicator import VanillaOptionPortfolio, VanillaOptionReplicator, \
+    IncrementalHedgingBook
 from put_call_parity.valuation_context.valuation_context import ValuationContext
 from tp_maths.brownians.uniform_generator import PseudoUniformGenerator, SOBOL_UNIFORM_GENERATOR
 from tp_quantity.quantity import Qty
@@ -49,6 +52,17 @@ class VanillaOptionReplicatorTestCase(unittest.TestCase, QtyTestUtils):
             Qty(0, MT),
         )
 
+    @RandomisedTest()
+    def test_risk_prices_option_once(self, rng: RandomNumberGenerator):
+        vc = self._random_vc(rng)
+        portfolio = VanillaOptionPortfolio(self._random_option(rng)).rehedge(vc)
+        with mock.patch.object(OptionTrade, "_model", autospec=True, side_effect=OptionTrade._model) as model:
+            risk = portfolio.risk(vc)
+        self.assertEqual(1, model.call_count)
+        self.assertVeryClose(portfolio.value(vc), risk.value)
+        self.assertVeryClose(portfolio.delta(vc, WTI), risk.delta)
+        self.assertVeryClose(portfolio.gamma(vc, WTI), risk.gamma)
+
     @RandomisedTest()
     def test_replicated_value(self, rng: RandomNumberGenerator):
         option = self._random_option(rng)
@@ -99,3 +113,121 @@ class VanillaOptionReplicatorTestCase(unittest.TestCase, QtyTestUtils):
         print(f"\nInitial value {initial_value}")
         print(f"Average value {terminal_values.mean()}")
 
+
+    @RandomisedTest(number_of_runs=5)
+    def test_batch_replication_matches_per_path(self, rng: RandomNumberGenerator):
+        option = self._random_option(rng)
+        vc = self._random_vc(rng)
+        vol = vc.vol(option.commodity)
+        portfolio = VanillaOptionPortfolio(option).rehedge(vc)
+        n_time_steps = 20
+        n_paths = 50
+        times = np.asarray(
+            [i * option.expiry_time / n_time_steps for i in range(n_time_steps + 1)]
+        )
+        vols = np.asarray([vol.checked_scalar_value])
+        paths = (VectorPath.brownian_paths(
+            n_variables=1,
+            times=times,
+            n_paths=n_paths,
+            uniform_generator=PseudoUniformGenerator(seed=rng.randint(99999))
+        ).scaled(vols)
+                 .with_lognormal_adjustments(vols)
+                 .exp()
+                 .with_prices([vc.price(option.commodity)]))
+        replicator = VanillaOptionReplicator(portfolio, vc, paths)
+        portfolios, vcs = replicator.replicate(
+            PseudoUniformGenerator(seed=rng.randint(999999)),
+            n_time_steps,
+            n_paths
+        )
+        expected = np.asarray([p.value(vc).checked_value(USD) for p, vc in zip(portfolios, vcs)])
+        np.testing.assert_allclose(replicator.replicate_batch(n_time_steps), expected, atol=1e-6)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_incremental_book_matches_portfolio_rehedge(self, rng: RandomNumberGenerator):
+        option = self._random_option(rng)
+        vc = self._random_vc(rng)
+        portfolio = VanillaOptionPortfolio(option).rehedge(vc)
+        book = IncrementalHedgingBook(portfolio, vc.vol(WTI).checked_scalar_value)
+        for i_step in range(1, 10):
+            time = option.expiry_time * i_step / 10
+            price = rng.uniform(90, 110)
+            step_vc = vc.copy(time=time).with_price(WTI, Qty(price, USD / MT))
+            portfolio = portfolio.rehedge(step_vc)
+            book.rehedge(price, time)
+            self.assertAlmostEqual(portfolio.value(step_vc).checked_value(USD), book.value(price, time), delta=1e-6)
+        self.assertVeryClose(portfolio.value(step_vc), book.to_portfolio().value(step_vc))
+
+    @RandomisedTest(number_of_runs=5)
+    def test_delta_band_limits_rehedges(self, rng: RandomNumberGenerator):
+        option = self._random_option(rng)
+        vc = self._random_vc(rng)
+        portfolio = VanillaOptionPortfolio(option).rehedge(vc)
+        vol = vc.vol(WTI).checked_scalar_value
+        band = option.amount.checked_value(MT) * 0.05
+        always, banded = IncrementalHedgingBook(portfolio, vol), IncrementalHedgingBook(portfolio, vol, band)
+        for i_step in range(1, 50):
+            time = option.expiry_time * i_step / 50
+            price = rng.uniform(95, 105)
+            always.rehedge(price, time)
+            banded.rehedge(price, time)
+            self.assertLessEqual(abs(banded.delta(price, time)), band + 1e-9)
+        self.assertLessEqual(banded.n_rehedges, always.n_rehedges)
+
+    @RandomisedTest(number_of_runs=5)
+    def test_incremental_replication_matches_books(self, rng: RandomNumberGenerator):
+        option = self._random_option(rng)
+        option = OptionTrade(WTI, option.amount, rng.choice(CALL, PUT), option.strike, option.expiry_time)
+        vc = self._random_vc(rng)
+        vol = vc.vol(WTI).checked_scalar_value
+        band = option.amount.checked_value(MT) * rng.uniform(0.1)
+        n_time_steps, n_paths = 20, 10
+        times = np.asarray(
+            [i * option.expiry_time / n_time_steps for i in range(n_time_steps + 1)]
+        )
+        paths = (VectorPath.brownian_paths(
+            n_variables=1,
+            times=times,
+            n_paths=n_paths,
+            uniform_generator=PseudoUniformGenerator(seed=rng.randint(99999))
+        ).scaled(np.asarray([vol]))
+                 .with_lognormal_adjustments(np.asarray([vol]))
+                 .exp()
+                 .with_prices([vc.price(WTI)]))
+        replicator = VanillaOptionReplicator(VanillaOptionPortfolio(option), vc, paths)
+        portfolios = replicator.replicate_incremental(n_time_steps, band)
+        initial_portfolio = VanillaOptionPortfolio(option).rehedge(vc)
+        prices = paths.path[0]
+        for i_path in range(n_paths):
+            book = IncrementalHedgingBook(initial_portfolio, vol, band)
+            for i_time_step in range(1, n_time_steps + 1):
+                book.rehedge(float(prices[i_time_step, i_path]), float(times[i_time_step]))
+            self.assertAlmostEqual(book.commodity_amount, portfolios.commodity_amounts[i_path], delta=1e-6)
+            self.assertAlmostEqual(book.cash_amount, portfolios.cash_amounts[i_path], delta=1e-4)
+            self.assertEqual(book.n_rehedges, portfolios.n_rehedges[i_path])
+
+    @RandomisedTest(number_of_runs=5)
+    def test_batch_replication_costs(self, rng: RandomNumberGenerator):
+        option = self._random_option(rng)
+        vc = self._random_vc(rng)
+        vol = vc.vol(option.commodity)
+        n_time_steps, n_paths = 20, 50
+        times = np.asarray(
+            [i * option.expiry_time / n_time_steps for i in range(n_time_steps + 1)]
+        )
+        vols = np.asarray([vol.checked_scalar_value])
+        paths = (VectorPath.brownian_paths(
+            n_variables=1,
+            times=times,
+            n_paths=n_paths,
+            uniform_generator=PseudoUniformGenerator(seed=rng.randint(99999))
+        ).scaled(vols)
+                 .with_lognormal_adjustments(vols)
+                 .exp()
+                 .with_prices([vc.price(option.commodity)]))
+        replicator = VanillaOptionReplicator(VanillaOptionPortfolio(option), vc, paths)
+        cost_model = TransactionCostModel(proportional_rate=0.001, fixed_cost=0.1, spread=0.002)
+        values, costs = replicator.replicate_batch_with_costs(n_time_steps, cost_model=cost_model)
+        self.assertTrue(np.all(costs > 0))
+        np.testing.assert_allclose(values + costs, replicator.replicate_batch(n_time_steps), atol=1e-6)
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+from tp_quantity.quantity import Qty
+from tp_quantity.uom import MT, USD, EUR, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.models import CALL, PUT
+from put_call_parity.portfolio.tradeable import OptionTrade, CommodityTrade, Cash
+from put_call_parity.ref_data.commodity import WTI, Commodity
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.valuation_context.batch_valuation_context import BatchValuationContext
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+
+class BatchValuationContextTestCase(unittest.TestCase):
+    def _random_vc(self, rng: RandomNumberGenerator) -> ValuationContext:
+        return ValuationContext(
+            valuation_ccy=USD,
+            time=rng.uniform(0.0, 0.5),
+            commodity_prices={WTI: Qty(rng.uniform(95, 105), USD / MT)},
+            commodity_vols={WTI: Qty(rng.uniform(0.1, 0.5), SCALAR)},
+        )
+
+    @RandomisedTest(number_of_runs=10)
+    def test_matches_scalar_valuation(self, rng: RandomNumberGenerator):
+        vcs = [self._random_vc(rng) for _ in range(20)]
+        batch_vc = BatchValuationContext.from_contexts(vcs)
+        option = OptionTrade(
+            WTI,
+            Qty(rng.uniform(100, 200), MT),
+            rng.choice(CALL, PUT),
+            strike=Qty(rng.uniform(95, 105), USD / MT),
+            expiry_time=rng.uniform(0.5, 1.0)
+        )
+        trades = [option, CommodityTrade(WTI, Qty(rng.uniform(-100, 100), MT)), Cash(Qty(rng.uniform(), USD))]
+        for trade in trades:
+            np.testing.assert_allclose(
+                trade.value(batch_vc),
+                [trade.value(vc).checked_value(USD) for vc in vcs],
+                atol=1e-9
+            )
+        np.testing.assert_allclose(
+            option.delta(batch_vc, WTI),
+            [option.delta(vc, WTI).checked_value(MT) for vc in vcs],
+            atol=1e-9
+        )
+        np.testing.assert_allclose(
+            option.gamma(batch_vc, WTI),
+            [option.gamma(vc, WTI).checked_value(MT * MT / USD) for vc in vcs],
+            atol=1e-9
+        )
+
+    @RandomisedTest(number_of_runs=10)
+    def test_foreign_commodity_matches_scalar_valuation(self, rng: RandomNumberGenerator):
+        ttf = Commodity("TTF", EUR / MT)
+        vc = ValuationContext(
+            valuation_ccy=USD,
+            time=rng.uniform(0.0, 0.5),
+            fx_rates={OrderedFxPair(EUR, USD): Qty(rng.uniform(1.0, 1.2), USD / EUR)},
+            commodity_prices={ttf: Qty(rng.uniform(95, 105), EUR / MT)},
+            commodity_vols={ttf: Qty(rng.uniform(0.1, 0.5), SCALAR)},
+        )
+        batch_vc = BatchValuationContext.from_contexts([vc])
+        option = OptionTrade(
+            ttf,
+            Qty(rng.uniform(100, 200), MT),
+            rng.choice(CALL, PUT),
+            strike=Qty(rng.uniform(95, 105), EUR / MT),
+            expiry_time=rng.uniform(0.5, 1.0)
+        )
+        trades = [option, CommodityTrade(ttf, Qty(rng.uniform(-100, 100), MT)), Cash(Qty(rng.uniform(), EUR))]
+        for trade in trades:
+            np.testing.assert_allclose(trade.value(batch_vc), [trade.value(vc).checked_value(USD)], atol=1e-9)
+            np.testing.assert_allclose(trade.theta(batch_vc), [trade.theta(vc).checked_value(USD)], atol=1e-9)
+
+    @RandomisedTest()
+    def test_scenario_round_trip(self, rng: RandomNumberGenerator):
+        vc = self._random_vc(rng)
+        prices = np.asarray([rng.uniform(90, 110) for _ in range(5)])
+        batch_vc = BatchValuationContext.from_context(vc, 5).with_prices(WTI, prices)
+        for i in range(5):
+            scenario = batch_vc.scenario(i)
+            self.assertEqual(vc.time, scenario.time)
+            self.assertAlmostEqual(prices[i], scenario.price(WTI).checked_value(USD / MT), delta=1e-12)
+            self.assertEqual(vc.vol(WTI), scenario.vol(WTI))
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from tp_quantity.quantity import Qty
+from tp_quantity.uom import USD, EUR, MT, SCALAR
+from tp_random_tests.random_number_generator import RandomNumberGenerator
+from tp_random_tests.random_test_case import RandomisedTest
+
+from put_call_parity.portfolio.tradeable import Cash
+from put_call_parity.ref_data.commodity import WTI
+from put_call_parity.ref_data.ordered_fx_pair import OrderedFxPair
+from put_call_parity.valuation_context.batch_valuation_context import BatchValuationContext
+from put_call_parity.valuation_context.fx_graph import FxGraph
+from put_call_parity.valuation_context.valuation_context import ValuationContext
+
+
+class ValuationContextTestCase(unittest.TestCase):
+    def test_fx_graph_chains(self):
+        pair = OrderedFxPair(EUR, USD)
+        graph = FxGraph([pair])
+        self.assertEqual([(pair, False)], graph.chain(EUR, USD))
+        self.assertEqual([(pair, True)], graph.chain(USD, EUR))
+        self.assertEqual([], graph.chain(USD, USD))
+        self.assertIsNone(FxGraph([]).chain(USD, EUR))
+
+    @RandomisedTest(number_of_runs=10)
+    def test_fx_rates_either_way_round(self, rng: RandomNumberGenerator):
+        rate = Qty(rng.uniform(0.8, 1.2), USD / EUR)
+        vc = ValuationContext(USD, time=0.0, fx_rates={OrderedFxPair(EUR, USD): rate})
+        self.assertEqual(rate, vc.fx_rate(OrderedFxPair(EUR, USD)))
+        self.assertAlmostEqual(
+            1.0 / rate.value,
+            vc.fx_rate(OrderedFxPair(USD, EUR)).checked_value(EUR / USD),
+            delta=1e-12
+        )
+        self.assertEqual(Qty.to_qty(1), vc.fx_rate(OrderedFxPair(EUR, EUR)))
+        self.assertAlmostEqual(rate.value * 100, Cash(Qty(100, EUR)).value(vc).checked_value(USD), delta=1e-9)
+
+    def test_missing_fx_rate(self):
+        vc = ValuationContext(USD, time=0.0)
+        with self.assertRaises(ValueError):
+            vc.fx_rate(OrderedFxPair(EUR, USD))
+
+    def test_conversions_are_cached_and_shared_with_copies(self):
+        vc = ValuationContext(
+            USD, time=0.0,
+            fx_rates={OrderedFxPair(EUR, USD): Qty(1.1, USD / EUR)},
+            commodity_prices={WTI: Qty(100, USD / MT)},
+            commodity_vols={WTI: Qty(0.3, SCALAR)},
+        )
+        rate = vc.conversion_rate(USD, EUR)
+        self.assertIs(rate, vc.conversion_rate(USD, EUR))
+        self.assertIs(rate, vc.shift_price(WTI, Qty(1, USD / MT)).conversion_rate(USD, EUR))
+
+        repriced = vc.copy(fx_rates={OrderedFxPair(EUR, USD): Qty(1.2, USD / EUR)})
+        self.assertAlmostEqual(1 / 1.2, repriced.conversion_rate(USD, EUR).checked_value(EUR / USD), delta=1e-12)
+
+    @RandomisedTest(number_of_runs=10)
+    def test_batch_fx_rates_match_scalar(self, rng: RandomNumberGenerator):
+        vcs = [
+            ValuationContext(USD, time=0.0, fx_rates={OrderedFxPair(USD, EUR): Qty(rng.uniform(0.8, 1.2), EUR / USD)})
+            for _ in range(5)
+        ]
+        batch_vc = BatchValuationContext.from_contexts(vcs)
+        for from_ccy, to_ccy in [(USD, EUR), (EUR, USD), (EUR, EUR)]:
+            np.testing.assert_allclose(
+                batch_vc.conversion_rate(from_ccy, to_ccy),
+                [vc.conversion_rate(from_ccy, to_ccy).checked_value(to_ccy / from_ccy) for vc in vcs],
+                atol=1e-12
+            )
+
+    @RandomisedTest(number_of_runs=10)
+    def test_shifts_leave_their_parent_unchanged(self, rng: RandomNumberGenerator):
+        price, vol = Qty(rng.uniform(90, 110), USD / MT), Qty(rng.uniform(0.1, 0.5), SCALAR)
+        vc = ValuationContext(USD, time=0.5, commodity_prices={WTI: price}, commodity_vols={WTI: vol})
+        shifted = vc
+        for _ in range(20):
+            shifted = shifted.shift_price(WTI, Qty(1, USD / MT)).shift_vol(WTI, Qty(0.01, SCALAR))
+        self.assertAlmostEqual(price.value + 20, shifted.price(WTI).checked_value(USD / MT), delta=1e-9)
+        self.assertAlmostEqual(vol.value + 0.2, shifted.vol(WTI).checked_scalar_value, delta=1e-9)
+        self.assertEqual(price, vc.price(WTI))
+        self.assertEqual(vol, vc.vol(WTI))
+        self.assertIs(vc.fx_rates, shifted.fx_rates)
+
+    def test_copy_to_time_zero(self):
+        vc = ValuationContext(USD, time=0.5)
+        self.assertEqual(0.0, vc.copy(time=0.0).time)
+        self.assertEqual(0.5, vc.time)